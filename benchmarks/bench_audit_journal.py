@@ -0,0 +1,94 @@
+"""
+Audit journal cost: how long AuditJournal.append() holds the GUI thread, how
+many fsyncs a run of scans costs, how far the disk lags the log, and how long
+a log download takes as a journal export against a CSV written from memory:
+
+    python benchmarks/bench_audit_journal.py --rows 1000000 --rate 520
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import constants
+from services.audit_journal import AuditJournal
+from services.log_store import LOG_FIELDS, LogStore
+
+
+def paced(journal, rows, rate):
+    """Append ``rows`` scans at ``rate`` a second, sampling how far the disk lags."""
+    fsync = os.fsync
+    syncs = [0]
+
+    def counted(fd):
+        syncs[0] += 1
+        fsync(fd)
+
+    worst_append = worst_lag = 0.0
+    with mock.patch("os.fsync", counted):
+        started = due = time.perf_counter()
+        for i in range(rows):
+            due += 1 / rate
+            time.sleep(max(0.0, due - time.perf_counter()))
+            t0 = time.perf_counter()
+            journal.append("12:00:00.000", f"8991871040{i:010d}", f"8991871040{i:010d}", "OK")
+            worst_append = max(worst_append, time.perf_counter() - t0)
+            worst_lag = max(worst_lag, (journal.records - journal.synced) / rate)
+        journal.flush()
+        elapsed = time.perf_counter() - started
+    print(f"{rows} scans at {rate:g}/s: {syncs[0]} fsyncs ({syncs[0] / elapsed:.1f}/s), "
+          f"worst append {worst_append * 1e6:.0f} us, worst durability lag about {worst_lag * 1e3:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit journal benchmark.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows for the append and export runs (default: 1000000).")
+    parser.add_argument("--paced", type=int, default=2000, help="Scans in the line-rate run (default: 2000).")
+    parser.add_argument("--rate", type=float, default=520, help="Line-rate scans per second (default: 520).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = AuditJournal(directory, "bench", constants.JOURNAL_SYNC_RECORDS,
+                               constants.JOURNAL_SYNC_INTERVAL_MS / 1000, constants.JOURNAL_MAX_BYTES)
+        paced(journal, args.paced, args.rate)
+        journal.close()
+
+        journal = AuditJournal(directory, "bench", constants.JOURNAL_SYNC_RECORDS,
+                               constants.JOURNAL_SYNC_INTERVAL_MS / 1000, constants.JOURNAL_MAX_BYTES)
+        store = LogStore()
+        stamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        started = time.perf_counter()
+        for i in range(args.rows):
+            code = f"8991871040{i:010d}"
+            journal.append(stamp, code, code, "OK")
+        appended = time.perf_counter() - started
+        journal.flush()
+        print(f"{args.rows} appends: {appended / args.rows * 1e6:.2f} us each on the caller, "
+              f"{len(journal.paths)} journal files")
+        for i in range(args.rows):
+            code = f"8991871040{i:010d}"
+            store.append(stamp, code, code, "OK")
+
+        path = os.path.join(directory, "memory.csv")
+        started = time.perf_counter()
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=LOG_FIELDS)
+            writer.writeheader()
+            writer.writerows(store)
+        from_memory = time.perf_counter() - started
+        path = os.path.join(directory, "journal.csv")
+        started = time.perf_counter()
+        journal.export(path)
+        exported = time.perf_counter() - started
+        print(f"download of {args.rows} rows: {from_memory * 1e3:.0f} ms from memory, "
+              f"{exported * 1e3:.0f} ms as a journal export ({os.path.getsize(path) >> 20} MiB)")
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Preview and start-card dialogs over a large job: time to open them, the
+one-off cost of CardFinder's sorted orders (built on a background thread
+after loading) and the cost of a jump-to lookup:
+
+    python benchmarks/bench_card_finder.py --cards 10000000
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from PyQt6.QtWidgets import QApplication, QWidget
+
+from bench_card_sequence import luhn_digit
+from gui.ui.preview_window import PreviewWindow
+from gui.ui.select_start_card_dialog import SelectStartCardDialog
+from services.card_finder import CardFinder, ICCID_PREFIX, ICCID_SUFFIX, NUMCARD
+from services.card_sequence import CardSequence
+from services.range_sequence import RangeSequence
+
+
+def build_sequence(cards, shuffled):
+    """One run of consecutive ICCIDs, or with ``shuffled`` a CardSequence in random order."""
+    bodies = np.arange(108429276, 108429276 + cards).astype("S9")
+    if shuffled:
+        np.random.default_rng(1).shuffle(bodies)
+    sequence = CardSequence()
+    for n, body in enumerate(bodies):
+        body = "8991871040" + body.decode()
+        sequence.append(str(n + 1), body + luhn_digit(body))
+    return sequence if shuffled else RangeSequence.from_sequence(sequence)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CardFinder and card dialog benchmark.")
+    parser.add_argument("--cards", type=int, default=1_000_000, help="Number of cards (default: 1000000).")
+    parser.add_argument("--shuffled", action="store_true", help="ICCIDs in random order, as a CardSequence.")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    parent = QWidget()
+    started = time.perf_counter()
+    sequence = build_sequence(args.cards, args.shuffled)
+    print(f"{sequence} built in {time.perf_counter() - started:.1f} s")
+
+    finder = CardFinder(sequence)
+    for label, dialog in (("PreviewWindow", PreviewWindow), ("SelectStartCardDialog", SelectStartCardDialog)):
+        started = time.perf_counter()
+        window = dialog(sequence, parent, finder)
+        window.show()
+        app.processEvents()
+        print(f"{label} open: {(time.perf_counter() - started) * 1e3:.1f} ms")
+        window.close()
+
+    # Orders sorted on a background thread while a 10 ms GUI timer measures the stall
+    lag = 0.0
+    thread = threading.Thread(target=finder.prepare)
+    started = last = time.perf_counter()
+    thread.start()
+    while thread.is_alive():
+        time.sleep(0.01)
+        app.processEvents()
+        now = time.perf_counter()
+        lag = max(lag, now - last - 0.01)
+        last = now
+    print(f"prepare() on a background thread: {time.perf_counter() - started:.2f} s, "
+          f"worst GUI thread stall {lag * 1e3:.0f} ms")
+
+    rng = random.Random(1)
+    for kind in (NUMCARD, ICCID_PREFIX, ICCID_SUFFIX):
+        times = []
+        for _ in range(200):
+            position = rng.randrange(len(sequence))
+            iccid = sequence.iccid(position)
+            query = {NUMCARD: sequence.numcard(position), ICCID_PREFIX: iccid[:-1], ICCID_SUFFIX: iccid[-8:]}[kind]
+            started = time.perf_counter()
+            matches = finder.find(kind, query)
+            times.append(time.perf_counter() - started)
+            assert position in (matches.position(i) for i in range(matches.count))
+        times.sort()
+        print(f"{kind} lookup: median {times[len(times) // 2] * 1e6:.0f} us, max {times[-1] * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
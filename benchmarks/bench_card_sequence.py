@@ -0,0 +1,110 @@
+"""
+Compare RAM and load time of CardSequence against the old list-of-pairs parser.
+
+Generates a synthetic CPD with the same column layout as data/sample.CPD and
+parses it both ways:
+
+    python benchmarks/bench_card_sequence.py --rows 5000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from services.file_service import parse_cpd_cards
+
+HEADER = ("NUMCARD;MAXCARD;DATAFILE;ICCID;IMSI;MSISDN;GPD_RJIL_MSN;GPD_RJIL_SKUCODE;GPD_RJIL_PO;"
+          "GPD_RJIL_Circle;GPD_QTY_500;GPD_RIL_ICCID_Start_500;GPD_RIL_ICCID_End_500;GPD_RJIL_MSC;"
+          "GPD_QTY_5000;GPD_RIL_ICCID_End_5000;GPD_RIL_ICCID_Strt_5000")
+
+
+def luhn_digit(body):
+    total = 0
+    for i, ch in enumerate(reversed(body)):
+        d = int(ch)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+def write_cpd(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("CPDv2\nERP_WO_NBR;ERP_PART\nXXXX;TP01\n")
+        f.write(HEADER + "\n")
+        for n in range(1, rows + 1):
+            body = f"8991871040{108429276 + n:09d}"
+            iccid = body + luhn_digit(body)
+            f.write(f"{n};{rows};RILQ9986.00.IMA;{iccid};0894058711{21233968 + n:08d};;"
+                    f"UGE99001186577LNE8;499001186;450061577;UE;500;FFFFFFFFFFFFFFFFFFFF;"
+                    f"FFFFFFFFFFFFFFFFFFFF;UGE99001186577IZ47;5000;FFFFFFFFFFFFFFFFFFFF;"
+                    f"FFFFFFFFFFFFFFFFFFFF\n")
+
+
+def parse_cpd_pairs(file_path):
+    """The parser as it was before CardSequence: tuples plus eager pairs."""
+    card_data = []
+    start_reading = False
+    with open(file_path, mode='r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("NUMCARD;MAXCARD;DATAFILE;ICCID;IMSI"):
+                start_reading = True
+                header = line.split(";")
+                numcard_idx = header.index("NUMCARD")
+                iccid_idx = header.index("ICCID")
+                continue
+            if start_reading and line:
+                parts = line.split(";")
+                card_data.append((parts[numcard_idx], parts[iccid_idx]))
+    paired_cards = []
+    for i in range(len(card_data)):
+        next_card = card_data[i + 1] if i + 1 < len(card_data) else None
+        paired_cards.append((card_data[i], next_card))
+    return paired_cards
+
+
+def load_legacy(path):
+    # What ModernCardValidator.load_expected_cards kept before the change
+    parsed = parse_cpd_pairs(path)
+    return [card for card, _ in parsed]
+
+
+def measure(label, loader, path):
+    gc.collect()
+    start = time.perf_counter()
+    result = loader(path)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = loader(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:<14} load {elapsed:8.2f} s   retained {retained / 2**20:9.1f} MiB   "
+          f"peak {peak / 2**20:9.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CardSequence vs list-of-pairs benchmark.")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Number of card rows (default: 5000000).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.cpd")
+        write_cpd(path, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 2**20:.1f} MiB CPD")
+        measure("list of pairs", load_legacy, path)
+        measure("CardSequence", parse_cpd_cards, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+ComPortReader idle CPU, per-scan latency and stop time, over a pseudo-terminal
+standing in for the scanner's COM port (POSIX only):
+
+    python benchmarks/bench_com_reader.py --scans 2000
+"""
+import argparse
+import os
+import pty
+import sys
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logic.com_reader import ComPortReader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ComPortReader benchmark.")
+    parser.add_argument("--scans", type=int, default=2000, help="Scans to send (default: 2000).")
+    parser.add_argument("--idle", type=float, default=2.0, help="Seconds to measure idle CPU over (default: 2).")
+    args = parser.parse_args()
+
+    scanner, port = pty.openpty()
+    tty.setraw(port)
+    received = []
+    arrived = threading.Event()
+
+    def callback(code):
+        received.append((time.perf_counter(), code))
+        arrived.set()
+
+    reader = ComPortReader(os.ttyname(port), callback=callback, error_callback=print)
+    reader.start_reading()
+    time.sleep(0.2)  # Let it open the port
+
+    cpu = time.process_time()
+    time.sleep(args.idle)
+    idle = (time.process_time() - cpu) / args.idle
+    print(f"idle CPU: {idle * 100:.1f}% of a core")
+
+    latencies = []
+    for n in range(args.scans):
+        code = f"8991871040{108429276 + n:09d}0"
+        arrived.clear()
+        sent = time.perf_counter()
+        os.write(scanner, code.encode() + b"\r\n")
+        if not arrived.wait(1.0):
+            print(f"scan {n} not received")
+            break
+        latencies.append(received[-1][0] - sent)
+    latencies.sort()
+    if latencies:
+        print(f"{len(latencies)} scans: latency median {latencies[len(latencies) // 2] * 1e3:.3f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.3f} ms")
+
+    # A burst: many frames in one write
+    received.clear()
+    burst = b"".join(f"8991871040{n:09d}0\r\n".encode() for n in range(args.scans))
+    started = time.perf_counter()
+    os.write(scanner, burst)
+    while len(received) < args.scans and time.perf_counter() - started < 10:
+        time.sleep(0.001)
+    print(f"burst of {args.scans} frames framed in {(received[-1][0] - started) * 1e3:.1f} ms"
+          if received else "burst not received")
+
+    started = time.perf_counter()
+    reader.stop_reading()
+    print(f"stop_reading() returned in {(time.perf_counter() - started) * 1e3:.1f} ms")
+    os.close(scanner)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+The headless validator in a fresh process, on a pseudo-terminal standing in
+for the scanner's COM port (Linux only, for /proc): wall time from launch to
+its "ready" line, the latency of the first verdicts (a scan of the expected
+card, then a jump, which waits for the job's index), and its resident memory
+after a run of scans, against the GUI's with the same job loaded:
+
+    python benchmarks/bench_headless.py --cards 1000000 --scans 2000
+"""
+import argparse
+import json
+import os
+import pty
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import tty
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from bench_card_sequence import luhn_digit, write_cpd
+
+GUI = r"""
+import os, sys
+sys.path.insert(0, {root!r})
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import gui.main as main
+from logic.file_parser import parse_file, prepare_sequence
+window = main.ModernCardValidator()
+window.sequence_validator.load(*prepare_sequence(parse_file({job!r})))
+window.show()
+for _ in range(50):
+    app.processEvents()
+print(open("/proc/self/status").read())
+window.close()
+"""
+
+
+def iccid(n):
+    body = f"8991871040{108429276 + n:09d}"
+    return body + luhn_digit(body)
+
+
+def memory(status):
+    """VmRSS and VmHWM of a /proc/<pid>/status text, in MiB."""
+    fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+    return [int(fields[name].split()[0]) / 1024 for name in ("VmRSS", "VmHWM")]
+
+
+def run(job, log, scans, env):
+    scanner, port = pty.openpty()
+    tty.setraw(port)
+    started = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-m", "services.headless_validator", job, "--port", os.ttyname(port), "--log", log,
+         "--keep-going"],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    ready = json.loads(child.stdout.readline())
+    ready_time = time.perf_counter() - started
+
+    def verdict(code):
+        sent = time.perf_counter()
+        os.write(scanner, code.encode() + b"\r\n")
+        line = json.loads(child.stdout.readline())
+        return line, time.perf_counter() - sent
+
+    first, first_time = verdict(iccid(1))
+    jump, jump_time = verdict(iccid(6))
+    for n in range(7, 7 + scans):
+        os.write(scanner, iccid(n).encode() + b"\r\n")
+        child.stdout.readline()
+    with open(f"/proc/{child.pid}/status") as file:
+        rss, peak = memory(file.read())
+    child.send_signal(signal.SIGINT)
+    stopped = json.loads(child.stdout.readlines()[-1])
+    child.wait()
+    os.close(scanner)
+    os.close(port)
+    print(f"ready in {ready_time * 1e3:.0f} ms (startup_ms {ready['startup_ms']}), "
+          f"first verdict {first['status']} in {first_time * 1e3:.1f} ms, "
+          f"{jump['status']} in {jump_time * 1e3:.1f} ms; after {stopped['scans']} scans "
+          f"RSS {rss:.1f} MiB (peak {peak:.1f} MiB)")
+    return rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless validator benchmark.")
+    parser.add_argument("--cards", type=int, default=1_000_000, help="Cards in the job (default: 1000000).")
+    parser.add_argument("--scans", type=int, default=2000, help="Scans sent after the first two (default: 2000).")
+    parser.add_argument("--runs", type=int, default=3, help="Runs with the sequence cache warm (default: 3).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        job = os.path.join(directory, "job.cpd")
+        write_cpd(job, args.cards)
+        env = dict(os.environ, CARD_VALIDATOR_CACHE_DIR=os.path.join(directory, "cache"),
+                   CARD_VALIDATOR_PROFILE="0")
+        log = os.path.join(directory, "job_log.csv")
+        print("cold cache:", end=" ")
+        run(job, log, args.scans, env)
+        for _ in range(args.runs):
+            print("warm cache:", end=" ")
+            rss = run(job, log, args.scans, env)
+        with open(log, encoding="utf-8") as file:
+            print(f"log: {sum(1 for _ in file) - 1} rows appended over {args.runs + 1} runs")
+
+        status = subprocess.run([sys.executable, "-c", GUI.format(root=ROOT, job=job)], env=env,
+                                capture_output=True, text=True, check=True).stdout
+        gui_rss, gui_peak = memory(status)
+        print(f"GUI with the job loaded: RSS {gui_rss:.1f} MiB (peak {gui_peak:.1f} MiB); "
+              f"headless uses {rss / gui_rss:.0%} of it")
+
+
+if __name__ == "__main__":
+    main()
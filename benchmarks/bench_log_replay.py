@@ -0,0 +1,70 @@
+"""
+Offline log replay: SequenceValidator per scan vs the vectorised replay.
+
+Builds a shift's worth of scans with missing cards, misreads and truncated
+reads, checks both give the same verdicts, then times them:
+
+    python benchmarks/bench_log_replay.py --cards 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bench_card_sequence import luhn_digit
+from services.card_sequence import CardSequence
+from services.iccid_check import IccidCheck
+from services.log_replay import replay
+from services.sequence_index import SequenceIndex
+from services.sequence_validator import SequenceValidator
+
+
+def make_scans(sequence, rng):
+    """In-order scans with about 1 in 1000 cards missed, misread or read truncated."""
+    scans = []
+    for i in range(len(sequence)):
+        roll = rng.random()
+        if roll < 0.001:
+            continue                                # Missing card
+        if roll < 0.0015:
+            scans.append("00" + sequence.iccid(i)[2:])  # Misread
+        elif roll < 0.002:
+            scans.append(sequence.iccid(i)[2:])     # Truncated read
+        else:
+            scans.append(sequence.iccid(i))
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log replay benchmark.")
+    parser.add_argument("--cards", type=int, default=1_000_000, help="Number of cards (default: 1000000).")
+    parser.add_argument("--check", action="store_true", help="Reject malformed reads with the job's IccidCheck.")
+    args = parser.parse_args()
+
+    sequence = CardSequence()
+    for n in range(args.cards):
+        body = f"8991871040{108429276 + n:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+    index = SequenceIndex(sequence, substring_lengths=(18,))
+    scans = make_scans(sequence, random.Random(3))
+
+    check = IccidCheck.from_sequence(sequence) if args.check else None
+    validator = SequenceValidator(sequence, index, check)
+    start = time.perf_counter()
+    expected = [validator.scan(code) for code in scans]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = replay(sequence, scans, index=index, check=check)
+    replay_time = time.perf_counter() - start
+
+    print(f"{len(scans)} scans over {args.cards} cards: {result.counts()}")
+    print(f"SequenceValidator loop  {len(scans) / loop_time / 1e6:6.2f} M scans/s")
+    print(f"vectorised replay       {len(scans) / replay_time / 1e6:6.2f} M scans/s")
+    print(f"identical={list(result.verdicts()) == expected and result.final_cursor == validator.cursor}")
+
+
+if __name__ == "__main__":
+    main()
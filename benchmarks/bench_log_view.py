@@ -0,0 +1,102 @@
+"""
+Scan log memory and view cost: the LogStore behind LogTableModel against the
+list of dicts the log used to be, and a QTableView scrolled over many rows:
+
+    python benchmarks/bench_log_view.py --rows 10000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PyQt6.QtWidgets import QApplication, QHeaderView, QTableView
+
+from gui.log_table_model import LogTableModel
+from services.log_store import LogStore
+
+STATUSES = ["OK"] * 97 + ["NOT OK", "SKIPPED", "DUPLICATE"]
+
+
+def log_rows(count):
+    for n in range(count):
+        iccid = f"8991871040{108429276 + n:09d}0"
+        ms = n * 50 % 86_400_000
+        timestamp = f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+        yield timestamp, iccid, iccid, STATUSES[n % len(STATUSES)]
+
+
+def measure_memory(count):
+    tracemalloc.start()
+    store = LogStore()
+    for row in log_rows(count):
+        store.append(*row)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    dicts = []
+    for index, (timestamp, scanned, expected, status) in enumerate(log_rows(count), 1):
+        dicts.append({"index": index, "timestamp": timestamp, "scanned_code": scanned,
+                      "expected_code": expected, "status": status})
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{count} rows: LogStore {store_bytes / count:.0f} bytes/row, list of dicts {dict_bytes / count:.0f} bytes/row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log view benchmark.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the scrolled view (default: 1000000).")
+    parser.add_argument("--memory-rows", type=int, default=100_000, help="Rows for the memory comparison (default: 100000).")
+    args = parser.parse_args()
+    measure_memory(args.memory_rows)
+
+    app = QApplication(sys.argv)
+    store = LogStore()
+    started = time.perf_counter()
+    for row in log_rows(args.rows):
+        store.append(*row)
+    print(f"appended {args.rows} rows in {time.perf_counter() - started:.1f} s ({store.nbytes() / args.rows:.0f} bytes/row)")
+
+    model = LogTableModel(store)
+    view = QTableView()
+    view.setModel(model)
+    view.verticalHeader().setVisible(False)  # As in the main window
+    view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    view.resize(900, 600)
+    view.show()
+    started = time.perf_counter()
+    model.flush()
+    app.processEvents()
+    print(f"first flush of {args.rows} rows: {(time.perf_counter() - started) * 1e3:.0f} ms")
+
+    for label, rows in (("scroll to bottom", [args.rows - 1] * 20),
+                        ("random jumps", [random.randrange(args.rows) for _ in range(200)])):
+        times = []
+        for row in rows:
+            started = time.perf_counter()
+            view.scrollTo(model.index(row, 0))
+            view.viewport().repaint()
+            times.append(time.perf_counter() - started)
+        times.sort()
+        print(f"{label}: median {times[len(times) // 2] * 1e3:.2f} ms, max {times[-1] * 1e3:.2f} ms per repaint")
+
+    # Appending while the view is open: batches of 128 rows, one insert each
+    times = []
+    for batch in range(50):
+        for row in log_rows(128):
+            store.append(*row)
+        started = time.perf_counter()
+        model.flush()
+        view.scrollToBottom()
+        view.viewport().repaint()
+        times.append(time.perf_counter() - started)
+    times.sort()
+    print(f"128-row batch insert + repaint: median {times[len(times) // 2] * 1e3:.2f} ms, max {times[-1] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Multi-lane mode under load: reader threads feeding the GUI thread.
+
+Fake readers stand in for the COM ports and send each lane's cards in order
+at a fixed rate. Reports how much of the GUI thread the lanes use and how
+late scans are validated:
+
+    python benchmarks/bench_multi_lane.py --lanes 4 --rate 20 --seconds 10
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+from bench_card_sequence import luhn_digit
+from gui.ui.multi_lane_window import MultiLaneWindow
+from services.card_sequence import CardSequence
+from services.scan_lanes import split_ranges
+from services.sequence_index import SequenceIndex
+
+
+class FakeReader:
+    """Sends the ICCIDs it is given at ``rate`` per second, like a scanner on a COM port."""
+
+    rate = 20
+    codes = {}
+
+    def __init__(self, port, callback=None, error_callback=None):
+        self.port = port
+        self.callback = callback
+        self.sent = []  # Send time of each scan
+        self.running = False
+        self.thread = None
+
+    def start_reading(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.read_loop, daemon=True)
+        self.thread.start()
+
+    def stop_reading(self, wait=True):
+        self.running = False
+        if wait and self.thread:
+            self.thread.join()
+
+    def read_loop(self):
+        interval = 1 / self.rate
+        due = time.perf_counter()
+        for code in self.codes[self.port]:
+            if not self.running:
+                return
+            due += interval
+            time.sleep(max(0.0, due - time.perf_counter()))
+            self.sent.append(time.perf_counter())
+            self.callback(code)
+
+
+class TimedLaneWindow(MultiLaneWindow):
+    """Times the GUI thread work and how long after sending each scan is validated."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.busy = 0.0
+        self.delays = []
+
+    def handle_lane_data(self, lane_index, scanned_code):
+        start = time.perf_counter()
+        sent = self.readers[lane_index].sent[self.lanes[lane_index].scanned]
+        super().handle_lane_data(lane_index, scanned_code)
+        self.delays.append(start - sent)
+        self.busy += time.perf_counter() - start
+
+    def flush(self):
+        start = time.perf_counter()
+        super().flush()
+        self.busy += time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-lane benchmark.")
+    parser.add_argument("--cards", type=int, default=1_000_000, help="Number of cards (default: 1000000).")
+    parser.add_argument("--lanes", type=int, default=4, help="Lanes (default: 4).")
+    parser.add_argument("--rate", type=float, default=20, help="Scans per second per lane (default: 20).")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration (default: 10).")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    sequence = CardSequence()
+    for n in range(args.cards):
+        body = f"8991871040{108429276 + n:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+    index = SequenceIndex(sequence)
+
+    ports = [f"LANE{i + 1}" for i in range(args.lanes)]
+    window = TimedLaneWindow(sequence, index, reader_factory=FakeReader)
+    per_lane = int(args.rate * args.seconds)
+    FakeReader.rate = args.rate
+    for port, (start, stop) in zip(ports, split_ranges(len(sequence), args.lanes)):  # The lanes' default ranges
+        FakeReader.codes[port] = [sequence.iccid(i) for i in range(start, min(start + per_lane, stop))]
+    window.start_lanes(ports)
+
+    lag = [0.0]  # Worst event loop delay seen by a 10 ms timer
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        lag[0] = max(lag[0], now - last[0] - 0.010)
+        last[0] = now
+
+    ticker = QTimer()
+    ticker.timeout.connect(tick)
+    ticker.start(10)
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds + 0.5:
+        app.processEvents()
+        time.sleep(0.001)
+    window.stop_lanes()
+    elapsed = time.perf_counter() - started
+
+    total = sum(lane.scanned for lane in window.lanes)
+    delays = sorted(window.delays)
+    print(f"{args.lanes} lanes x {args.rate:g} scans/s for {args.seconds:g} s: {total} of "
+          f"{args.lanes * per_lane} scans validated")
+    for lane in window.lanes:
+        print(f"  {lane.name}: {lane.scanned} scans, {lane.counts}")
+    print(f"GUI thread busy {window.busy / elapsed * 100:.2f}% "
+          f"({window.busy / max(total, 1) * 1e6:.0f} us per scan incl. repaint)")
+    if delays:
+        print(f"send-to-validate delay: median {delays[len(delays) // 2] * 1e3:.2f} ms, "
+              f"max {delays[-1] * 1e3:.2f} ms; worst event loop lag {lag[0] * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
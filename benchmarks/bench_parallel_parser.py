@@ -0,0 +1,48 @@
+"""
+Scaling of the parallel CPD parser from 1 to N worker processes.
+
+    python benchmarks/bench_parallel_parser.py --rows 10000000 --max-workers 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bench_card_sequence import write_cpd
+from services.file_service import parse_cpd_cards
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel CPD parser scaling benchmark.")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Number of card rows (default: 2000000).")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count(), help="Largest worker count to try.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.cpd")
+        write_cpd(path, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 2**20:.1f} MiB CPD, {os.cpu_count()} CPUs")
+
+        serial, serial_time = timed(parse_cpd_cards, path)
+        print(f"serial        {serial_time:7.2f} s")
+        expected = [bytes(column) for column in serial.column_buffers()]
+
+        workers = 1
+        while workers <= args.max_workers:
+            result, elapsed = timed(parse_cpd_cards, path, workers)
+            identical = [bytes(column) for column in result.column_buffers()] == expected
+            print(f"workers={workers:<4}  {elapsed:7.2f} s   speedup {serial_time / elapsed:5.2f}x   "
+                  f"identical={identical}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
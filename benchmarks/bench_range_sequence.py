@@ -0,0 +1,58 @@
+"""
+Memory and lookups of a range-compressed sequence vs the packed CardSequence.
+
+    python benchmarks/bench_range_sequence.py --cards 1000000 --breaks 100
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bench_card_sequence import luhn_digit
+from services.card_sequence import CardSequence
+from services.range_sequence import RangeSequence
+from services.sequence_index import SequenceIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RangeSequence benchmark.")
+    parser.add_argument("--cards", type=int, default=1_000_000, help="Number of cards (default: 1000000).")
+    parser.add_argument("--breaks", type=int, default=0, help="Serial number gaps in the job (default: 0).")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    gaps = set(rng.sample(range(1, args.cards), args.breaks))
+    sequence = CardSequence()
+    serial = 108429276
+    for n in range(args.cards):
+        serial += 7 if n in gaps else 1
+        body = f"8991871040{serial:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+
+    start = time.perf_counter()
+    compressed = RangeSequence.from_sequence(sequence)
+    print(f"{args.cards} cards, {args.breaks} breaks: compressed in {time.perf_counter() - start:.2f} s")
+    print(f"  CardSequence  {sequence.nbytes / 2**20:8.2f} MiB")
+    print(f"  RangeSequence {compressed.nbytes / 2**20:8.2f} MiB ({compressed.runs} runs, "
+          f"{compressed.explicit_count} explicit cards)")
+
+    start = time.perf_counter()
+    identical = compressed.iccid_records() == sequence.iccid_records()
+    print(f"  all records regenerated in {time.perf_counter() - start:.2f} s, identical={identical}")
+
+    targets = [rng.randrange(args.cards) for _ in range(10_000)]
+    for label, seq in (("CardSequence", sequence), ("RangeSequence", compressed)):
+        start = time.perf_counter()
+        index = SequenceIndex(seq)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        found = [index.find_next(sequence.iccid(t), -1) for t in targets]
+        lookup = (time.perf_counter() - start) / len(targets)
+        print(f"  {label:<14} index built in {built:.2f} s, exact lookup {lookup * 1e6:7.1f} us, "
+              f"correct={found == targets}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Scan delivery from the reader thread to the main window: one queued Qt
+signal per scan against the ScanQueue drained in batches every
+SCAN_DRAIN_INTERVAL_MS. A fake reader thread sends the scans at serial line
+rate (about 520 ICCID frames a second at 115200 baud), then all at once, as
+a scanner flushing its buffer after a jam. Reports how long the GUI takes to
+validate them and how long its event loop stalls:
+
+    python benchmarks/bench_scan_delivery.py --scans 2000 --rate 520
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+import constants
+from bench_card_sequence import luhn_digit
+from gui.main import ModernCardValidator
+from services.card_sequence import CardSequence
+from services.sequence_index import SequenceIndex
+
+
+class SignalPerScan(QObject):
+    """The delivery the ScanQueue replaced: one queued signal per scan."""
+    scanned = pyqtSignal(str)
+
+
+def run(app, window, codes, send, rate, label):
+    window.sequence_validator.seek(0)
+    window.log_model.clear()
+    lag = [0.0]  # Worst event loop delay seen by a 10 ms timer
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        lag[0] = max(lag[0], now - last[0] - 0.010)
+        last[0] = now
+
+    ticker = QTimer()
+    ticker.timeout.connect(tick)
+    ticker.start(10)
+
+    def paced():
+        due = time.perf_counter()
+        for code in codes:
+            if rate:
+                due += 1 / rate
+                time.sleep(max(0.0, due - time.perf_counter()))
+            send(code)
+
+    sender = threading.Thread(target=paced)
+    started = time.perf_counter()
+    sender.start()
+    while len(window.log_data) < len(codes) and time.perf_counter() - started < 60:
+        app.processEvents()
+    elapsed = time.perf_counter() - started
+    sender.join()
+    ticker.stop()
+    label += f", {rate:g} scans/s" if rate else ", one burst"
+    print(f"{label}: {len(window.log_data)}/{len(codes)} scans validated in {elapsed * 1e3:.0f} ms, "
+          f"worst event loop stall {lag[0] * 1e3:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan delivery benchmark.")
+    parser.add_argument("--cards", type=int, default=100_000, help="Number of cards (default: 100000).")
+    parser.add_argument("--scans", type=int, default=2000, help="Scans sent per run (default: 2000).")
+    parser.add_argument("--rate", type=float, default=520, help="Paced scans per second (default: 520).")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    sequence = CardSequence()
+    for n in range(args.cards):
+        body = f"8991871040{108429276 + n:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+    window = ModernCardValidator()
+    window.sequence_validator.load(sequence, SequenceIndex(sequence))
+    codes = [sequence.iccid(i) for i in range(args.scans)]
+    per_scan = SignalPerScan()
+    per_scan.scanned.connect(window.handle_com_data)
+
+    for rate in (args.rate, 0):
+        run(app, window, codes, per_scan.scanned.emit, rate, "signal per scan")
+        window.scan_queue.reset()
+        window.drain_timer.start(constants.SCAN_DRAIN_INTERVAL_MS)
+        run(app, window, codes, window.scan_queue.put, rate, f"ScanQueue every {constants.SCAN_DRAIN_INTERVAL_MS} ms")
+        window.drain_timer.stop()
+        print(f"  {window.scan_queue}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+ScanHub serving many pseudo-terminals from one thread (POSIX only): threads
+used, idle CPU, per-scan latency, aggregate throughput and runtime
+attach/detach, compared with one ComPortReader thread per port:
+
+    python benchmarks/bench_scan_hub.py --ports 16 --scans 200
+"""
+import argparse
+import os
+import pty
+import sys
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logic.com_reader import ComPortReader
+from logic.scan_hub import ScanHub
+
+
+class Ports:
+    """Pseudo-terminal pairs: the scanner ends are written, the port ends are read."""
+
+    def __init__(self, count):
+        self.scanners, self.names = [], []
+        for _ in range(count):
+            scanner, port = pty.openpty()
+            tty.setraw(port)
+            self.scanners.append(scanner)
+            self.names.append(os.ttyname(port))
+
+
+def measure(label, ports, attach, detach, scans):
+    received = []
+    arrived = threading.Event()
+    lock = threading.Lock()
+
+    def callback(port, scan):
+        with lock:
+            received.append((time.perf_counter(), port, scan))
+        arrived.set()
+
+    threads = threading.active_count()
+    attach(callback)
+    time.sleep(0.3)  # Let the ports open
+    used = threading.active_count() - threads
+
+    cpu = time.process_time()
+    time.sleep(1.0)
+    idle = time.process_time() - cpu
+
+    latencies = []
+    for n in range(scans):
+        scanner = ports.scanners[n % len(ports.scanners)]
+        arrived.clear()
+        sent = time.perf_counter()
+        os.write(scanner, f"8991871040{n:09d}0\r\n".encode())
+        if not arrived.wait(1.0):
+            print(f"{label}: scan {n} not received")
+            break
+        latencies.append(received[-1][0] - sent)
+    latencies.sort()
+
+    # Every port bursting at once
+    received.clear()
+    burst = b"".join(f"8991871040{n:09d}0\r\n".encode() for n in range(scans))
+    total = scans * len(ports.scanners)
+    started = time.perf_counter()
+    for scanner in ports.scanners:
+        os.write(scanner, burst)
+    while len(received) < total and time.perf_counter() - started < 10:
+        time.sleep(0.001)
+    elapsed = received[-1][0] - started if received else float("nan")
+
+    detach()
+    print(f"{label}: {used} thread(s) started, idle CPU {idle * 100:.1f}% of a core, "
+          f"latency median {latencies[len(latencies) // 2] * 1e3:.3f} ms, "
+          f"burst {len(received)}/{total} scans in {elapsed * 1e3:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ScanHub benchmark.")
+    parser.add_argument("--ports", type=int, default=16, help="Ports (default: 16).")
+    parser.add_argument("--scans", type=int, default=200, help="Scans per port (default: 200).")
+    args = parser.parse_args()
+    ports = Ports(args.ports)
+
+    hub = ScanHub()
+
+    def hub_attach(callback):
+        for name in ports.names:
+            hub.attach(name, lambda scan, name=name: callback(name, scan)).result()
+
+    def hub_detach():
+        for name in ports.names:
+            hub.detach(name).result()
+
+    measure("ScanHub", ports, hub_attach, hub_detach, args.scans)
+
+    readers = []
+
+    def reader_attach(callback):
+        for name in ports.names:
+            readers.append(ComPortReader(name, callback=lambda scan, name=name: callback(name, scan)))
+            readers[-1].start_reading()
+
+    def reader_detach():
+        for reader in readers:
+            reader.stop_reading()
+
+    measure("ComPortReader", ports, reader_attach, reader_detach, args.scans)
+
+    # Hot-plugging: attach half the ports, then sync to the other half, reading the async stream
+    half = len(ports.names) // 2
+    hub.sync(ports.names[:half])
+    time.sleep(0.2)
+    added, removed = hub.sync(ports.names[half:])
+    time.sleep(0.2)
+    print(f"sync: attached {len(added)}, detached {len(removed)}; attached now {len(hub.ports)}")
+
+    async def take(count):
+        stream = hub.scans()
+        return [await anext(stream) for _ in range(count)]
+
+    for scanner in ports.scanners:
+        os.write(scanner, b"89918710401084292769\r\n")
+    stream = hub.submit(take(len(ports.names) - half)).result(timeout=5)
+    print(f"async stream: {len(stream)} scans from {len({port for port, _ in stream})} ports")
+    hub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Cost of the hot-path latency instrumentation: what timing one scan through
+its stages adds, what a publish (summary, Prometheus file) costs the GUI
+thread once a second, and how close the histogram quantiles are to the
+exact ones:
+
+    python benchmarks/bench_scan_metrics.py --scans 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from logic.scan_queue import ScanQueue
+from services.scan_metrics import QUANTILES, READ, LatencyHistogram, ScanMetrics, write_prometheus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan metrics benchmark.")
+    parser.add_argument("--scans", type=int, default=200_000, help="Scans timed (default: 200000).")
+    parser.add_argument("--publishes", type=int, default=60, help="Summaries taken and written (default: 60).")
+    args = parser.parse_args()
+
+    random.seed(1)
+    latencies = [random.lognormvariate(-7, 1) for _ in range(args.scans)]  # Median about 0.9 ms, long tail
+
+    histogram = LatencyHistogram()
+    started = time.perf_counter()
+    for latency in latencies:
+        histogram.record(latency)
+    record = (time.perf_counter() - started) / args.scans
+    print(f"LatencyHistogram.record: {record * 1e6:.2f} µs")
+
+    metrics = ScanMetrics()
+    now = time.perf_counter()
+    started = time.perf_counter()
+    for i, latency in enumerate(latencies):
+        metrics.record(READ, latency)
+        metrics.validated(now, now, now, now + latency)
+        if i % 128 == 127:  # Rows reach the table a batch at a time
+            metrics.logged()
+    per_scan = (time.perf_counter() - started) / args.scans
+    print(f"Stages of one scan (read, queue, validate, display, total): {per_scan * 1e6:.2f} µs")
+
+    queue = ScanQueue()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "card_validator.prom")
+        summary_time = write_time = 0.0
+        for _ in range(args.publishes):
+            started = time.perf_counter()
+            summary = metrics.summary(queue)
+            summary_time += time.perf_counter() - started
+            started = time.perf_counter()
+            write_prometheus(path, summary)
+            write_time += time.perf_counter() - started
+            metrics.record(READ, 0.001)
+        print(f"Publish: summary {summary_time / args.publishes * 1e3:.2f} ms, "
+              f"Prometheus file {write_time / args.publishes * 1e3:.2f} ms ({os.path.getsize(path)} bytes)")
+
+    exact = sorted(latencies)
+    estimated = LatencyHistogram.quantiles(histogram.snapshot())
+    for quantile, value in zip(QUANTILES, estimated):
+        truth = exact[max(0, round(quantile * len(exact)) - 1)]
+        print(f"  p{round(quantile * 100)}: histogram {value * 1e3:.3f} ms, exact {truth * 1e3:.3f} ms "
+              f"({(value - truth) / truth:+.2%})")
+
+
+if __name__ == "__main__":
+    main()
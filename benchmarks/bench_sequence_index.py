@@ -0,0 +1,71 @@
+"""
+Resynchronisation lookups: linear forward scan vs SequenceIndex.
+
+Checks that both give the same "first similar card after the cursor" for
+exact, truncated and garbage reads, then times them:
+
+    python benchmarks/bench_sequence_index.py --cards 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bench_card_sequence import luhn_digit
+from services.card_sequence import CardSequence
+from services.sequence_index import SequenceIndex
+
+
+def linear_find(sequence, scanned_code, after):
+    """The search CardValidator used to run on every NOT OK scan."""
+    for i in range(after + 1, len(sequence)):
+        expected_card_value = sequence[i][1]
+        if scanned_code in expected_card_value or expected_card_value in scanned_code:
+            return i
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SequenceIndex benchmark.")
+    parser.add_argument("--cards", type=int, default=200_000, help="Number of cards (default: 200000).")
+    parser.add_argument("--lookups", type=int, default=50, help="Lookups per kind (default: 50).")
+    args = parser.parse_args()
+
+    sequence = CardSequence()
+    for n in range(args.cards):
+        body = f"8991871040{108429276 + n:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+
+    start = time.perf_counter()
+    index = SequenceIndex(sequence, substring_lengths=(19,))
+    print(f"{args.cards} cards, index built in {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(7)
+    kinds = {
+        "exact": lambda i: sequence.iccid(i),
+        "truncated (19)": lambda i: sequence.iccid(i)[1:],
+        "truncated (12)": lambda i: sequence.iccid(i)[8:],
+        "garbage": lambda i: "X" + sequence.iccid(i)[:5],
+    }
+    for kind, make_scan in kinds.items():
+        queries = []
+        for _ in range(args.lookups):
+            target = rng.randrange(args.cards)
+            queries.append((make_scan(target), rng.randrange(max(1, target))))
+
+        start = time.perf_counter()
+        linear = [linear_find(sequence, scan, after) for scan, after in queries]
+        linear_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = [index.find_next(scan, after) for scan, after in queries]
+        index_time = time.perf_counter() - start
+
+        print(f"{kind:<15} linear {linear_time / len(queries) * 1e3:9.3f} ms   "
+              f"index {index_time / len(queries) * 1e3:9.3f} ms   identical={linear == indexed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Throughput of the headless SequenceValidator in a tight loop.
+
+    python benchmarks/bench_sequence_validator.py --cards 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bench_card_sequence import luhn_digit
+from services.card_sequence import CardSequence
+from services.sequence_index import SequenceIndex
+from services.sequence_validator import SequenceValidator
+
+
+def run(label, validator, scans):
+    validator.load(validator.sequence, validator.index)  # Rewind and forget the cards seen
+    scan = validator.scan
+    start = time.perf_counter()
+    for code in scans:
+        scan(code)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(scans) / elapsed / 1e6:6.2f} M scans/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SequenceValidator throughput benchmark.")
+    parser.add_argument("--cards", type=int, default=1_000_000, help="Number of cards (default: 1000000).")
+    args = parser.parse_args()
+
+    sequence = CardSequence()
+    for n in range(args.cards):
+        body = f"8991871040{108429276 + n:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+    validator = SequenceValidator(sequence, SequenceIndex(sequence))
+
+    in_order = [sequence.iccid(i) for i in range(args.cards)]
+    run("in order (all OK)", validator, in_order)
+
+    # One card in 1000 missing from the scans: a JUMPED verdict each time
+    with_gaps = [code for i, code in enumerate(in_order) if i % 1000 != 500]
+    run("0.1% missing (JUMPED)", validator, with_gaps)
+
+    # One pair of neighbouring cards in 1000 swapped by the conveyor
+    swapped = list(in_order)
+    for i in range(500, args.cards - 1, 1000):
+        swapped[i], swapped[i + 1] = swapped[i + 1], swapped[i]
+    validator.window = 2
+    run("0.1% swapped, window 2", validator, swapped)
+    run("in order, window 2", validator, in_order)
+    validator.window = 0
+
+    counts = {}
+    validator.subscribe(lambda verdict: counts.__setitem__(verdict.status, counts.get(verdict.status, 0) + 1))
+    run("in order, one subscriber", validator, in_order)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Session checkpoint and resume: what a checkpoint costs the GUI thread and
+the disk while a large job runs, and how long a restart takes to get the
+cursor, seen cards and log view back:
+
+    python benchmarks/bench_session_checkpoint.py --cards 5000000 --logged 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import constants
+from services.audit_journal import AuditJournal
+from services.card_sequence import CardSequence
+from services.log_store import LogStore
+from services.sequence_validator import SequenceValidator
+from services.session_checkpoint import SessionCheckpoint
+
+
+def make_sequence(count):
+    iccids = (np.arange(count, dtype=np.int64) + 8991871040_000000000).astype("S19")
+    numcards = (np.arange(count, dtype=np.int64) + 1).astype("S10")
+    sequence = CardSequence(19, 10)
+    sequence.extend_packed(count, iccids.tobytes(), 19, numcards.tobytes(), 10)
+    return sequence
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session checkpoint benchmark.")
+    parser.add_argument("--cards", type=int, default=5_000_000, help="Cards in the job (default: 5000000).")
+    parser.add_argument("--logged", type=int, default=1_000_000, help="Scans logged before the restart (default: 1000000).")
+    parser.add_argument("--rate", type=int, default=520, help="Scans between two checkpoints (default: 520).")
+    args = parser.parse_args()
+
+    sequence = make_sequence(args.cards)
+    validator = SequenceValidator(sequence)
+    with tempfile.TemporaryDirectory() as directory:
+        journal = AuditJournal(directory, "bench")
+        for i in range(args.logged):
+            journal.append("12:00:00.000", sequence.iccid(i), sequence.iccid(i), "OK")
+        validator.seek(args.logged)
+        validator.seen.add_range(0, args.logged)
+        journal.flush()
+
+        checkpoint = SessionCheckpoint(directory)
+        job = {"path": "job.cpd", "count": args.cards}
+
+        def save():
+            state = {"job": job, "validator": validator.state(),
+                     "journal": {"session": journal.session, "records": journal.records}}
+            started = time.perf_counter()
+            checkpoint.save(state, validator.seen.bits, journal)
+            return time.perf_counter() - started
+
+        for _ in range(2):  # One whole write of each bitset file
+            save()
+            checkpoint.wait()
+        first = checkpoint.bytes_written
+        worst = 0.0
+        for _ in range(10):
+            start = validator.cursor
+            validator.seen.add_range(start, start + args.rate)  # One interval of the line
+            validator.seek(start + args.rate)
+            worst = max(worst, save())
+            checkpoint.wait()
+        print(f"checkpoint of {args.cards} cards: first two write {first >> 10} KiB, then "
+              f"{(checkpoint.bytes_written - first) / 10 / 1024:.0f} KiB per {args.rate} scans; "
+              f"save() holds the caller {worst * 1e3:.2f} ms at worst")
+        checkpoint.close()
+        journal.close()
+
+        # Restart: read the checkpoint, reopen the journal, refill the log view and restore the cursor
+        started = time.perf_counter()
+        state, bits = SessionCheckpoint(directory).load()
+        loaded = time.perf_counter()
+        resumed_journal = AuditJournal(directory, "bench", session=state["journal"]["session"])
+        rows = resumed_journal.tail(constants.LOG_RESUME_ROWS)
+        store = LogStore(limit=constants.LOG_TAIL_ROWS)
+        store.clear(resumed_journal.records - len(rows))
+        for _, timestamp, scanned_code, expected_code, status in rows:
+            store.append(timestamp, scanned_code, expected_code, status)
+        logged = time.perf_counter()
+        restored = SequenceValidator(sequence)
+        restored.restore(state["validator"], bits)
+        finished = time.perf_counter()
+        assert restored.cursor == validator.cursor and restored.seen.bits == validator.seen.bits
+        assert store[-1]["index"] == args.logged
+        print(f"resume: checkpoint {(loaded - started) * 1e3:.1f} ms, journal and last {len(rows)} log rows "
+              f"{(logged - loaded) * 1e3:.1f} ms, validator {(finished - logged) * 1e3:.1f} ms, "
+              f"total {(finished - started) * 1e3:.1f} ms")
+        resumed_journal.close()
+
+
+if __name__ == "__main__":
+    main()
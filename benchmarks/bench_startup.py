@@ -0,0 +1,75 @@
+"""
+Startup time to a usable window, in a fresh interpreter per run: the
+fast-start path (deferred imports, COM ports listed in the background,
+logo decoded after the first paint) against everything done up front as
+before. ``--port-delay`` makes port enumeration as slow as it is on the
+line PCs' Windows installs:
+
+    python benchmarks/bench_startup.py --runs 5 --port-delay 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import gui.main as main
+list_ports = main.ModernCardValidator.list_ports
+def slow_list_ports(self):
+    time.sleep({delay!r})  # Enumeration as slow as on the line PCs
+    list_ports(self)
+main.ModernCardValidator.list_ports = slow_list_ports
+if {eager!r}:
+    # Everything up front, as before: all modules, port listing and the logo before the window shows
+    for name in main.DEFERRED_MODULES:
+        __import__(name)
+    from logic.com_selector import list_com_ports
+    time.sleep({delay!r})
+    list_com_ports()
+window = main.ModernCardValidator()
+if {eager!r}:
+    from PyQt6.QtGui import QPixmap
+    window.logo_label.setScaledContents(True)
+    window.logo_label.setPixmap(QPixmap(main.constants.LOGO_PATH))
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+while window.startup_steps and not {eager!r}:  # Up front, it was all done before the window showed
+    app.processEvents()
+    time.sleep(0.001)
+print(json.dumps({{"shown": shown - started, "ready": time.perf_counter() - started}}))
+"""
+
+
+def run(eager, delay):
+    code = CHILD.format(root=ROOT, delay=delay, eager=eager)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode (default: 5).")
+    parser.add_argument("--port-delay", type=float, default=0.0, help="Seconds added to COM port enumeration (default: 0).")
+    args = parser.parse_args()
+
+    for label, eager in (("up front (before)", True), ("fast start", False)):
+        results = [run(eager, args.port_delay) for _ in range(args.runs)]
+        shown = statistics.median(result["shown"] for result in results)
+        ready = statistics.median(result["ready"] for result in results)
+        print(f"{label:>18}: window shown {shown * 1e3:6.0f} ms, ports listed and modules loaded {ready * 1e3:6.0f} ms "
+              f"(median of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+GUI thread cost of scan feedback: scans are sent through the main window's
+ScanQueue at a steady rate, and the benchmark reports how long the GUI
+thread is busy (its CPU time, painting included) per scan and how
+many widget paints the feedback causes:
+
+    python benchmarks/bench_ui_pacing.py --rates 50 200 520 --seconds 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PyQt6.QtCore import QEvent, QEventLoop, QObject
+from PyQt6.QtWidgets import QApplication
+
+import constants
+from bench_card_sequence import luhn_digit
+from gui.main import ModernCardValidator
+from services.card_sequence import CardSequence
+from services.sequence_index import SequenceIndex
+
+
+class PaintCounter(QObject):
+    """Counts paint events."""
+
+    def __init__(self):
+        super().__init__()
+        self.paints = 0
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            self.paints += 1
+        return False
+
+
+def run(app, window, codes, rate, counter):
+    window.sequence_validator.seek(0)
+    window.log_model.clear()
+    window.scan_queue.reset()
+    window.drain_timer.start(constants.SCAN_DRAIN_INTERVAL_MS)
+    for _ in range(20):
+        app.processEvents()
+
+    def paced():
+        due = time.perf_counter()
+        for code in codes:
+            due += 1 / rate
+            time.sleep(max(0.0, due - time.perf_counter()))
+            window.scan_queue.put(code)
+
+    sender = threading.Thread(target=paced)
+    counter.paints = 0
+    cpu = time.thread_time()  # CPU time of the GUI thread, painting included
+    started = time.perf_counter()
+    sender.start()
+    while sender.is_alive() or len(window.log_data) < len(codes):
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)  # Blocks while idle, like exec()
+        if time.perf_counter() - started > 60:
+            break
+    elapsed = time.perf_counter() - started
+    busy = time.thread_time() - cpu
+    sender.join()
+    window.drain_timer.stop()
+    print(f"{rate:5g} scans/s: GUI thread busy {busy / len(codes) * 1e3:.2f} ms per scan "
+          f"({busy / elapsed:.0%} of the time), {counter.paints / elapsed:.0f} paints/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan feedback repaint benchmark.")
+    parser.add_argument("--rates", type=float, nargs="+", default=[50, 200, 520], help="Scans per second.")
+    parser.add_argument("--seconds", type=float, default=4, help="Seconds per rate (default: 4).")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    sequence = CardSequence()
+    for n in range(100_000):
+        body = f"8991871040{108429276 + n:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+    window = ModernCardValidator()
+    window.sequence_validator.load(sequence, SequenceIndex(sequence))
+    window.show()
+    counter = PaintCounter()
+    app.installEventFilter(counter)
+    for rate in args.rates:
+        codes = [sequence.iccid(i) for i in range(int(rate * args.seconds))]
+        run(app, window, codes, rate, counter)
+    app.removeEventFilter(counter)  # Before the interpreter frees the filter, which the app would still call
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,14 +10,62 @@ BTN_DOWNLOAD_LOGS = "Download Logs"
 BTN_CLEAR_UPLOAD = "Clear Upload"
 BTN_SET_START_CARD = "Set Start Card"
 BTN_CLEAR_LOG = "Clear Log"
+BTN_MULTI_LANE = "Multi-Lane"
+BTN_METRICS = "Metrics"
 TITLE_SELECT_FILE = "Select File"
 FILE_FILTER = "CPD Files (*.cpd);;Text Files (*.txt);;All Files (*)"
 TITLE_SAVE_LOGS = "Save Logs"
 CSV_FILE_FILTER = "CSV Files (*.csv)"
+TITLE_MULTI_LANE = "Multi-Lane Validation"
+TITLE_METRICS = "Scan Metrics"
+MENU_PROFILE = "Profile"
+ACTION_MEMORY_SNAPSHOT = "Take Memory Snapshot"
+ACTION_WRITE_PROFILE = "Write Profile Bundle"
+LABEL_LANE_STARTS = "Lane start NUMCARDs:"
 LOG_TABLE_HEADERS = ["Index", "Timestamp", "Scanned Code", "Expected Code", "Status"]
 MSG_WAITING_FOR_SCAN = "Waiting for scan..."
 
 
+# Validation
+# Scan lengths (shorter than an ICCID) to index for truncated reads. Other truncated
+# lengths are still resynchronised, with a slower vectorised scan.
+RESYNC_SUBSTRING_LENGTHS = ()
+# Longest issuer prefix (industry identifier, country code and issuer) reads are checked against
+ICCID_PREFIX_LENGTH = 7
+# Positions a card may arrive early or late by on lines that swap neighbouring cards (0: strict order).
+# A pending card is only reported missing once the furthest card accepted is more than this past it.
+OUT_OF_ORDER_WINDOW = 0
+# Multi-lane mode repaints lane logs and counters at this interval instead of once per scan
+LANE_FLUSH_INTERVAL_MS = 100
+# Scans from the COM reader are queued and validated in batches at this interval, one repaint per batch
+SCAN_DRAIN_INTERVAL_MS = 16
+# Scan feedback (scanner field, status bar, card fields, log table) is repainted at most this often
+FRAME_INTERVAL_MS = 16
+# New log rows are added to the table at most this often; inserting rows repaints the whole table
+LOG_FLUSH_INTERVAL_MS = 100
+# Most scans validated per tick, so a burst is spread over several ticks instead of freezing the GUI
+SCAN_BATCH_LIMIT = 128
+# Most scans queued for the GUI; past it SCAN_QUEUE_OVERFLOW ("drop_newest" or "drop_oldest") applies
+SCAN_QUEUE_CAPACITY = 4096
+SCAN_QUEUE_OVERFLOW = "drop_newest"
+# Scans that wait longer than this in the queue are counted late
+SCAN_LATE_MS = 100
+# Every log row is journaled to disk; rows are fsynced in groups of this many or after this long
+JOURNAL_SYNC_RECORDS = 256
+JOURNAL_SYNC_INTERVAL_MS = 200
+# A journal file is closed and a new one started at this size
+JOURNAL_MAX_BYTES = 64 * 1024 * 1024
+# The log table keeps this many recent rows in memory; the journal keeps them all
+LOG_TAIL_ROWS = 1_000_000
+# The session (cursor, seen cards, journal position) is checkpointed this often while it changes
+CHECKPOINT_INTERVAL_MS = 1000
+# Rows read back from the journal into the log table when a session is resumed
+LOG_RESUME_ROWS = 10_000
+# Scan rate, queue depth and stage latencies are published this often; latency quantiles cover the last window
+METRICS_INTERVAL_MS = 1000
+METRICS_WINDOW_S = 30
+
+
 # File Paths
 import sys
 import os
@@ -36,16 +84,51 @@ ASSETS_DIR = "assets"
 LOGO_FILE = "logo.png"
 LOGO_PATH = resource_path(os.path.join(ASSETS_DIR, LOGO_FILE))
 
+# Parsed sequences are cached here so reselecting a job maps the cache instead of reparsing
+CACHE_DIR = os.environ.get(
+    "CARD_VALIDATOR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".card_sequence_validator", "cache")
+)
+# Audit journals of the scan log, one set of files per logging session
+JOURNAL_DIR = os.environ.get(
+    "CARD_VALIDATOR_JOURNAL_DIR",
+    os.path.join(os.path.expanduser("~"), ".card_sequence_validator", "journal")
+)
+# Checkpoint of the last session, offered for resuming at startup
+CHECKPOINT_DIR = os.environ.get(
+    "CARD_VALIDATOR_CHECKPOINT_DIR",
+    os.path.join(os.path.expanduser("~"), ".card_sequence_validator", "checkpoint")
+)
+# Metrics in the Prometheus text format, for the line dashboard's textfile collector; empty to turn off
+METRICS_FILE = os.environ.get(
+    "CARD_VALIDATOR_METRICS_FILE",
+    os.path.join(os.path.expanduser("~"), ".card_sequence_validator", "metrics", "card_validator.prom")
+)
+# Bundles written in profiling mode (--profile)
+PROFILE_DIR = os.environ.get(
+    "CARD_VALIDATOR_PROFILE_DIR",
+    os.path.join(os.path.expanduser("~"), ".card_sequence_validator", "profiles")
+)
+# Once loaded, keep runs of consecutive ICCIDs as arithmetic ranges when that at least halves the memory
+COMPRESS_SEQUENCE_RANGES = True
+
 # Messages
 MSG_NO_COM_PORTS = "No COM ports found."
 MSG_COM_PORTS_REFRESHED = "COM ports refreshed."
+MSG_LISTING_COM_PORTS = "Looking for COM ports..."
 MSG_SELECT_COM_PORT = "Please select a COM port first."
 MSG_LISTENING_ON_PORT = "Listening on {port}"
 MSG_STOPPED_LISTENING = "Stopped listening."
+MSG_SCAN_QUEUE_BEHIND = "Scanner is ahead of validation: {dropped} scan(s) dropped, {late} late"
 MSG_APP_READY = "Application ready."
 MSG_FILE_SELECTED = "Selected: {file}"
 MSG_NO_FILE_SELECTED = "Please select a file first!"
 MSG_LOADED_CARDS = "Loaded {count} expected cards."
+MSG_LOADING_CARDS = "Loading cards... {count} loaded ({percent}%)"
+MSG_LOADING_CARD_DISPLAY = "Loading..."
+MSG_SCAN_WAITING_FOR_LOAD = "Waiting for cards to load ({count} scan(s) queued)..."
+MSG_SCAN_REJECTED = "Rejected read: {scanned} - {reason} ({count} rejected)"
+MSG_SCAN_DUPLICATE = "Duplicate scan: {scanned} was already scanned ({count} duplicates)"
 MSG_CLEARED_LOADED_FILE = "Loaded file cleared."
 MSG_LOG_TABLE_CLEARED = "Log table cleared."
 MSG_NO_LOG_DATA = "No log data to download!"
@@ -54,4 +137,25 @@ MSG_ERROR_SAVING_FILE = "Error saving file: {error}"
 MSG_ERROR_LOADING_CARDS = "Error loading expected cards: {error}"
 MSG_CONFIRM_CLEAR_LOG = "Are you sure you want to clear the log table? This action cannot be undone."
 MSG_NO_CARD_SELECTED = "No card selected."
-MSG_START_PROCESSING_FROM = "Starting processing from NUMCARD: {numcard}"
\ No newline at end of file
+MSG_CONFIRM_RESUME = ("The last session was not finished:\n\n{file}\nNext card: position {position} of {count}, "
+                      "{records} scan(s) logged.\n\nResume it?")
+MSG_RESUMED = "Resumed {file} at position {position} with {records} logged scan(s)."
+MSG_RESUME_FAILED = "Cannot resume the last session: {error}"
+MSG_START_PROCESSING_FROM = "Starting processing from NUMCARD: {numcard}"
+MSG_JUMP_PLACEHOLDER = "Go to NUMCARD, or the first or last digits of an ICCID"
+MSG_JUMP_MATCH = "{kind}: match {number} of {count} (Enter for next)"
+MSG_JUMP_NOT_FOUND = "No card matches \"{query}\""
+MSG_SELECT_LANE_PORTS = "Select a COM port for each lane first."
+MSG_LANE_STARTS_PLACEHOLDER = "One per selected port, comma-separated (default: equal split)"
+MSG_LANE_STARTS_COUNT = "Give one start NUMCARD per selected port ({ports})."
+MSG_LANES_STARTED = "Validating on {count} lane(s)."
+MSG_LANE_RANGE = "NUMCARD {first} to {last}"
+MSG_LANE_STATS = "Next: {current} | {rate:.1f} scans/s | {scanned} scanned | {errors} errors"
+MSG_LANE_DONE = "Range complete"
+MSG_LANE_STOPPED = "Stopped (NOT OK)"
+MSG_METRICS_RATE = "{rate:.1f} scans/s | {scans} validated"
+MSG_METRICS_QUEUE = "Queue: {depth} waiting (peak {peak}) | {dropped} dropped | {late} late"
+MSG_PROFILE_TRACING = "Memory tracing started (the app runs slower); take another snapshot to see what grew."
+MSG_PROFILE_SNAPSHOT = "Memory snapshot {count} taken."
+MSG_PROFILE_WRITTEN = "Profile written to {path}"
+MSG_PROFILE_FAILED = "Could not write the profile: {error}"
\ No newline at end of file
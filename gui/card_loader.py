@@ -0,0 +1,60 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+from logic.file_parser import iter_file_chunks, prepare_sequence
+from services.card_sequence import CardSequence
+from services.sequence_cache import open_cached_sequence, store_cached_sequence
+from services.sequence_index import SequenceIndex
+import constants
+
+
+class CardLoader(QThread):
+    """
+    Loads the expected card sequence on a background thread.
+
+    Rows are appended to ``sequence`` as they are parsed, so the GUI can use
+    the cards loaded so far while the rest of the file streams in. ``index``
+    is extended after every chunk, so it always covers the rows the GUI has
+    been told about. A valid binary cache is used instead of parsing when
+    one exists. Once the whole file is in, it is range-compressed when
+    that saves memory, and an IccidCheck is derived from it for rejecting
+    malformed reads.
+    """
+    chunk_loaded = pyqtSignal(int, int)       # rows loaded so far, percent of file read
+    load_finished = pyqtSignal(object, object, object)  # the complete CardSequence, its SequenceIndex and IccidCheck
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.sequence = CardSequence()
+        self.index = SequenceIndex(self.sequence, constants.RESYNC_SUBSTRING_LENGTHS)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop loading after the current chunk and wait for the thread to exit."""
+        self._cancelled.set()
+        self.wait()
+
+    def run(self):
+        try:
+            cached = open_cached_sequence(self.file_path)
+            if cached is not None:
+                self._finish(cached)
+                return
+
+            for rows, progress in iter_file_chunks(self.file_path):
+                if self._cancelled.is_set():
+                    return
+                self.sequence.extend(rows)
+                self.index.update()
+                self.chunk_loaded.emit(len(self.sequence), int(progress * 100))
+
+            if not self._cancelled.is_set():
+                store_cached_sequence(self.file_path, self.sequence)
+                self._finish(self.sequence, self.index)
+        except Exception as e:
+            if not self._cancelled.is_set():
+                self.load_failed.emit(str(e))
+
+    def _finish(self, sequence, index=None):
+        self.load_finished.emit(*prepare_sequence(sequence, index))
@@ -0,0 +1,91 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QColor, QFont
+
+import constants
+
+STATUS_COLOURS = {"OK": "#2ecc71", "OUT OF ORDER": "#2ecc71", "REJECTED": "#f39c12", "DUPLICATE": "#f39c12"}
+ERROR_COLOUR = "#e74c3c"
+
+
+class LogTableModel(QAbstractTableModel):
+    """
+    Table model over a LogStore. Views only ask for the rows on screen, so a
+    long session costs the store's few bytes a row and no widget items.
+
+    Rows appended to the store are shown once flush() signals them, in one
+    insert per batch (the main window flushes on its ViewState's "log" field).
+    Rows a bounded store has dropped are removed from the top at the same
+    time.
+
+    Args:
+        store (LogStore): The log rows.
+        parent (QObject): Parent object.
+    """
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._rows = 0  # Rows the views have been told about
+        self._first = 0  # Store's ``first`` when they were told
+        self._bold = QFont("Arial", weight=QFont.Weight.Bold)
+        self._colours = {status: QColor(colour) for status, colour in STATUS_COLOURS.items()}
+        self._error_colour = QColor(ERROR_COLOUR)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(constants.LOG_TABLE_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return constants.LOG_TABLE_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        store = self.store
+        row, column = self._first + index.row() - store.first, index.column()
+        if not 0 <= row < len(store):
+            return None  # Dropped by the store; removed from the view on the next flush
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(store.first + row + 1)
+            if column == 1:
+                return store.timestamp(row)
+            if column == 2:
+                return store.scanned_code(row)
+            if column == 3:
+                return store.expected_code(row)
+            return store.status(row)
+        if column == 4:
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return self._colours.get(store.status(row), self._error_colour)
+            if role == Qt.ItemDataRole.FontRole:
+                return self._bold
+        return None
+
+    def flush(self):
+        """Show the rows appended, and drop the rows trimmed, since the last flush. Returns True on any change."""
+        store = self.store
+        dropped = min(store.first - self._first, self._rows)
+        if dropped > 0:
+            self.beginRemoveRows(QModelIndex(), 0, dropped - 1)
+            self._rows -= dropped
+            self._first += dropped
+            self.endRemoveRows()
+        self._first = store.first  # Also when more rows were dropped than had been shown
+        added = len(store) - self._rows
+        if added <= 0:
+            return dropped > 0
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + added - 1)
+        self._rows += added
+        self.endInsertRows()
+        return True
+
+    def clear(self, first=0):
+        """Drop every row of the store; the next one appended is log row ``first + 1``."""
+        self.beginResetModel()
+        self.store.clear(first)
+        self._rows = 0
+        self._first = first
+        self.endResetModel()
@@ -1,71 +1,194 @@
 import sys
 import os
+import threading
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from gui import startup
+startup.start()
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QPushButton,
-    QTableWidget, QTableWidgetItem, QVBoxLayout, QHBoxLayout, QFileDialog,
+    QTableView, QVBoxLayout, QHBoxLayout, QFileDialog,
     QComboBox, QTextEdit, QFrame, QHeaderView, QMessageBox, QStatusBar, QDialog, QListWidget, QDialogButtonBox, QInputDialog
 )
-from PyQt6.QtCore import QTimer, Qt, pyqtSignal, QObject
-from PyQt6.QtGui import QFont, QColor, QPixmap
+from PyQt6.QtCore import QTimer, Qt, pyqtSignal, QObject, QSize
+from PyQt6.QtGui import QImageReader, QPixmap
 import constants
-import csv
-from logic.com_reader import ComPortReader
-from logic.com_selector import list_com_ports
-from logic.file_parser import parse_file
+from logic.scan_queue import ScanQueue
+from gui.log_table_model import LogTableModel
+from gui.view_state import ViewState
+from services.audit_journal import AuditJournal
 from services.card_validator import CardValidator
-from gui.ui.preview_window import PreviewWindow
-from gui.ui.select_start_card_dialog import SelectStartCardDialog
+from services import profiling
+from services.log_store import LogStore
+from services.scan_metrics import ScanMetrics, prometheus_text, write_prometheus
+from services.session_checkpoint import SessionCheckpoint, job_identity
+from services.sequence_validator import SequenceValidator
+
+# Imported where first used, and by warm_up() once the window is on screen, so they stay off the startup path
+DEFERRED_MODULES = (
+    "numpy", "logic.com_selector", "logic.com_reader", "gui.card_loader", "services.card_finder",
+    "gui.ui.preview_window", "gui.ui.select_start_card_dialog", "gui.ui.multi_lane_window", "gui.ui.metrics_panel",
+)
+startup.mark("imports")
 
 
 class Worker(QObject):
-    data_received = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
+    ports_listed = pyqtSignal(list)
+    warmed_up = pyqtSignal()
 
 class ModernCardValidator(QMainWindow):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
+        self.profiler = profiler  # Set in profiling mode (--profile)
         self.worker = Worker()
+        self.sequence_validator = SequenceValidator(window=constants.OUT_OF_ORDER_WINDOW)
         self.card_validator = CardValidator(self)
-        self.log_data = []
+        # The table keeps the recent rows; the journal keeps them all, on disk
+        self.log_data = LogStore(limit=constants.LOG_TAIL_ROWS)
+        self.journal = self.open_journal()
+        self.log_model = LogTableModel(self.log_data, self)
         self.selected_file_path = ""
-        self.expected_cards = []
-        self.current_card_index = 0
-        self.first_scan_received = True
+        self.card_loader = None
+        self.loading = False
+        self._card_finder = None
+        # Scan feedback reaches the widgets through the view state, at most once a frame
+        self.view = ViewState(constants.FRAME_INTERVAL_MS, self)
         self.init_ui()
+        self.bind_view()
         self.setup_timer()
         self.com_port_reader = None
-        self.refresh_com_ports()
+        # The reader thread queues scans; the GUI validates them in batches on drain_timer
+        self.scan_queue = ScanQueue(constants.SCAN_QUEUE_CAPACITY, constants.SCAN_QUEUE_OVERFLOW,
+                                    constants.SCAN_LATE_MS / 1000)
+        self.queue_losses = (0, 0)  # (dropped, late) last shown in the status bar
+        self.drain_timer = QTimer(self)
+        self.drain_timer.timeout.connect(self.drain_scans)
+        # Hot-path latencies, published to the metrics panel and file every METRICS_INTERVAL_MS
+        self.metrics = ScanMetrics(constants.METRICS_WINDOW_S)
+        self.metrics_summary = None  # Last published
+        self.metrics_panel = None  # Created when first shown
+        self.metrics_error = None  # Last error writing the metrics file, printed once
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.publish_metrics)
+        self.metrics_timer.start(constants.METRICS_INTERVAL_MS)
+        # Cursor, seen cards and journal position, so a restart can resume the job
+        self.checkpoint = SessionCheckpoint(constants.CHECKPOINT_DIR)
+        self.job_identity = None  # Identity of the loaded job file, once fully loaded
+        self.pending_resume = None  # (state, seen bits) to restore once the job has loaded
+        self.checkpointed = None  # What the last checkpoint was taken at
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.timeout.connect(self.save_checkpoint)
+        self.checkpoint_timer.start(constants.CHECKPOINT_INTERVAL_MS)
+        self.port_lister = None
+        self.startup_steps = 2  # Port listing and warm-up, before the startup report
         self.update_card_display()
 
-        self.worker.data_received.connect(self.handle_com_data)
         self.worker.error_occurred.connect(self.handle_com_error)
+        self.worker.ports_listed.connect(self.on_ports_listed)
+        self.worker.warmed_up.connect(self.on_warmed_up)
+        # Slow or optional work waits for the first pass of the event loop, once the window is up
+        QTimer.singleShot(0, self.finish_startup)
+
+    @property
+    def expected_cards(self):
+        return self.sequence_validator.sequence
+
+    @property
+    def sequence_index(self):
+        return self.sequence_validator.index
+
+    @property
+    def card_finder(self):
+        """Jump-to lookups over the loaded cards, made again for each new job."""
+        if self._card_finder is None or self._card_finder.sequence is not self.expected_cards:
+            from services.card_finder import CardFinder  # Deferred, see DEFERRED_MODULES
+            self._card_finder = CardFinder(self.expected_cards)
+        return self._card_finder
+
+    @property
+    def current_card_index(self):
+        return self.sequence_validator.cursor
+
+    @current_card_index.setter
+    def current_card_index(self, index):
+        self.sequence_validator.seek(index)
+
+    def finish_startup(self):
+        startup.mark("window shown")
+        self.load_logo()
+        self.refresh_com_ports()
+        threading.Thread(target=self.warm_up, name="Warm-up", daemon=True).start()
+
+    def warm_up(self):
+        """Import DEFERRED_MODULES in the background so the first click that needs one does not wait."""
+        try:
+            for name in DEFERRED_MODULES:
+                __import__(name)
+        finally:
+            self.worker.warmed_up.emit()
+
+    def on_warmed_up(self):
+        startup.mark("deferred modules imported")
+        self.startup_step_done()
+
+    def startup_step_done(self):
+        if self.startup_steps:
+            self.startup_steps -= 1
+            if not self.startup_steps:
+                startup.report()
 
     def refresh_com_ports(self):
+        """List the COM ports on a background thread; on_ports_listed() fills the combo box."""
+        if self.port_lister is not None and self.port_lister.is_alive():
+            return
+        self.start_btn.setEnabled(False)
+        self.findChild(QPushButton, "refreshBtn").setEnabled(False)
+        self.show_status(constants.MSG_LISTING_COM_PORTS)
+        self.port_lister = threading.Thread(target=self.list_ports, name="COM port listing", daemon=True)
+        self.port_lister.start()
+
+    def list_ports(self):
+        from logic.com_selector import list_com_ports  # Deferred, see DEFERRED_MODULES
+        ports = []
+        try:
+            ports = list_com_ports()
+        except Exception as e:
+            self.worker.error_occurred.emit(str(e))
+        finally:
+            self.worker.ports_listed.emit(ports)
+
+    def on_ports_listed(self, ports):
         self.com_port_combo.clear()
-        ports = list_com_ports()
         self.com_port_combo.addItems(ports)
+        self.findChild(QPushButton, "refreshBtn").setEnabled(True)
         if not ports:
             self.start_btn.setEnabled(False)
-            self.status_bar.showMessage(constants.MSG_NO_COM_PORTS)
+            self.show_status(constants.MSG_NO_COM_PORTS)
         else:
             self.start_btn.setEnabled(True)
-            self.status_bar.showMessage(constants.MSG_COM_PORTS_REFRESHED)
+            self.show_status(constants.MSG_COM_PORTS_REFRESHED)
+        startup.mark("COM ports listed")
+        self.startup_step_done()
 
     def start_reading(self):
         selected_port = self.com_port_combo.currentText()
         if not selected_port:
-            self.status_bar.showMessage(constants.MSG_SELECT_COM_PORT)
+            self.show_status(constants.MSG_SELECT_COM_PORT)
             return
 
+        from logic.com_reader import ComPortReader  # Deferred, see DEFERRED_MODULES
+        self.scan_queue.reset()
+        self.queue_losses = (0, 0)
         self.com_port_reader = ComPortReader(
             port=selected_port,
-            callback=self.worker.data_received.emit,
-            error_callback=self.worker.error_occurred.emit
+            callback=self.scan_queue.put,
+            error_callback=self.worker.error_occurred.emit,
+            metrics=self.metrics
         )
         self.com_port_reader.start_reading()
-        self.status_bar.showMessage(constants.MSG_LISTENING_ON_PORT.format(port=selected_port))
+        self.drain_timer.start(constants.SCAN_DRAIN_INTERVAL_MS)
+        self.show_status(constants.MSG_LISTENING_ON_PORT.format(port=selected_port))
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.com_port_combo.setEnabled(False)
@@ -75,7 +198,9 @@ class ModernCardValidator(QMainWindow):
         if self.com_port_reader:
             self.com_port_reader.stop_reading()
             self.com_port_reader = None
-        self.status_bar.showMessage(constants.MSG_STOPPED_LISTENING)
+        self.drain_timer.stop()
+        self.scan_queue.clear()  # Scans read after a NOT OK are not validated
+        self.show_status(constants.MSG_STOPPED_LISTENING)
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.com_port_combo.setEnabled(True)
@@ -84,26 +209,87 @@ class ModernCardValidator(QMainWindow):
     def handle_com_data(self, scanned_code):
         self.card_validator.handle_com_data(scanned_code)
 
+    def drain_scans(self):
+        """Validate the scans queued since the last tick, up to SCAN_BATCH_LIMIT, as one batch."""
+        self.metrics.observe_queue(len(self.scan_queue))
+        scans = self.scan_queue.drain_timed(constants.SCAN_BATCH_LIMIT)
+        if scans:
+            self.card_validator.handle_com_batch(scans)
+        losses = (self.scan_queue.dropped, self.scan_queue.late)
+        if losses != self.queue_losses:
+            self.queue_losses = losses
+            self.show_status(constants.MSG_SCAN_QUEUE_BEHIND.format(dropped=losses[0], late=losses[1]))
+
     def get_timestamp(self):
         return datetime.now().strftime("%H:%M:%S.%f")[:-3]
 
-    def update_card_display(self):
+    def bind_view(self):
+        view = self.view
+        view.bind("scanned", lambda text: self.set_text(self.scanner_input, text))
+        view.bind("status", lambda message: self.status_bar.showMessage(*message))
+        view.bind("card", self.show_card)
+        view.bind("clock", self.clock_label.setText)
+        view.bind("log", lambda _: self.flush_log(), constants.LOG_FLUSH_INTERVAL_MS)
+
+    def flush_log(self):
+        self.log_model.flush()
+        self.metrics.logged()
+
+    def publish_metrics(self):
+        """Show the scan metrics in the panel, if it is open, and write them to METRICS_FILE."""
+        summary = self.metrics_summary = self.metrics.summary(self.scan_queue)
+        if self.metrics_panel is not None and self.metrics_panel.isVisible():
+            self.metrics_panel.show_summary(summary)
+        if constants.METRICS_FILE:
+            try:
+                write_prometheus(constants.METRICS_FILE, summary)
+                self.metrics_error = None
+            except OSError as e:
+                if str(e) != self.metrics_error:
+                    self.metrics_error = str(e)
+                    print(f"Could not write the metrics file: {e}")
+
+    def toggle_metrics(self):
+        if self.metrics_panel is None:
+            from gui.ui.metrics_panel import MetricsPanel  # Deferred, see DEFERRED_MODULES
+            self.metrics_panel = MetricsPanel(self)
+            self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.metrics_panel)
+        elif self.metrics_panel.isVisible():
+            self.metrics_panel.hide()
+            return
+        if self.metrics_summary is not None:
+            self.metrics_panel.show_summary(self.metrics_summary)
+        self.metrics_panel.show()
+
+    @staticmethod
+    def set_text(widget, text):
+        if widget.text() != text:
+            widget.setText(text)
+
+    def show_status(self, message, timeout=0):
+        self.view.set("status", (message, timeout))
+
+    def update_card_display(self, index=None):
+        self.view.set("card", self.current_card_index if index is None else index)
+
+    def show_card(self, index):
+        end_text = constants.MSG_LOADING_CARD_DISPLAY if self.loading else "End of sequence"
         if self.expected_cards:
-            if self.current_card_index < len(self.expected_cards):
-                self.current_card_input.setText(self.expected_cards[self.current_card_index][1])
+            if index < len(self.expected_cards):
+                self.set_text(self.current_card_input, self.expected_cards.iccid(index))
             else:
-                self.current_card_input.setText("End of sequence")
-            
-            if self.current_card_index + 1 < len(self.expected_cards):
-                self.next_expected_card_input.setText(self.expected_cards[self.current_card_index + 1][1])
+                self.set_text(self.current_card_input, end_text)
+
+            if index + 1 < len(self.expected_cards):
+                self.set_text(self.next_expected_card_input, self.expected_cards.iccid(index + 1))
             else:
-                self.next_expected_card_input.setText("End of sequence")
+                self.set_text(self.next_expected_card_input, end_text)
         else:
-            self.current_card_input.setText("N/A")
-            self.next_expected_card_input.setText("N/A")
+            self.set_text(self.current_card_input, "N/A")
+            self.set_text(self.next_expected_card_input, "N/A")
 
     def handle_com_error(self, error):
-        self.status_bar.showMessage(error)
+        self.show_status(error)
 
     def init_ui(self):
         self.setWindowTitle(constants.APP_TITLE)
@@ -162,8 +348,8 @@ class ModernCardValidator(QMainWindow):
                 border: 1px solid #BAC7D2; /* Panels/Card Backgrounds */
              }
  
-             /* Table Widget */
-             QTableWidget {
+             /* Tables */
+             QTableView {
                 background-color: #BAC7D2; /* Panels/Card Backgrounds */
                 color: #354563; /* Headers/Main UI Text */
                 border: 1px solid #FFFFFF; /* General Backgrounds */
@@ -228,6 +414,13 @@ class ModernCardValidator(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage(constants.MSG_APP_READY)
+        if self.profiler is not None:
+            self.create_profile_menu()
+
+    def create_profile_menu(self):
+        menu = self.menuBar().addMenu(constants.MENU_PROFILE)
+        menu.addAction(constants.ACTION_MEMORY_SNAPSHOT, self.take_memory_snapshot)
+        menu.addAction(constants.ACTION_WRITE_PROFILE, self.write_profile)
 
     def create_header(self, layout):
         header_frame = QFrame()
@@ -235,13 +428,9 @@ class ModernCardValidator(QMainWindow):
         h_layout = QHBoxLayout(header_frame)
         h_layout.setContentsMargins(15, 5, 15, 5)
 
-        logo_label = QLabel()
-        logo_path = constants.LOGO_PATH
-        logo_pixmap = QPixmap(logo_path)
-        logo_label.setFixedSize(142, 100)
-        logo_label.setScaledContents(True)
-        logo_label.setPixmap(logo_pixmap)
-        h_layout.addWidget(logo_label)
+        self.logo_label = QLabel()
+        self.logo_label.setFixedSize(142, 100)
+        h_layout.addWidget(self.logo_label)  # The logo itself is decoded by load_logo() once the window is up
 
         title_label = QLabel(constants.APP_TITLE)
         title_label.setObjectName("titleLabel")
@@ -301,8 +490,8 @@ class ModernCardValidator(QMainWindow):
 
     def create_log_viewer(self, layout):
         layout.addWidget(QLabel("Log Viewer"))
-        self.log_table = QTableWidget(0, 5)
-        self.log_table.setHorizontalHeaderLabels(constants.LOG_TABLE_HEADERS)
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
         header = self.log_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
@@ -312,6 +501,9 @@ class ModernCardValidator(QMainWindow):
         self.log_table.setColumnWidth(0, 50)
         self.log_table.setColumnWidth(1, 100)
         self.log_table.setColumnWidth(4, 80)
+        # The Index column numbers the rows; uniform rows keep scrolling cheap however long the log gets
+        self.log_table.verticalHeader().setVisible(False)
+        self.log_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.log_table.setAlternatingRowColors(True)
         layout.addWidget(self.log_table, 1)
 
@@ -335,6 +527,15 @@ class ModernCardValidator(QMainWindow):
         self.set_start_card_btn.clicked.connect(self.select_start_card)
         self.set_start_card_btn.setEnabled(False)
 
+        self.multi_lane_btn = QPushButton(constants.BTN_MULTI_LANE)
+        self.multi_lane_btn.setObjectName("multiLaneBtn")
+        self.multi_lane_btn.clicked.connect(self.open_multi_lane)
+        self.multi_lane_btn.setEnabled(False)
+
+        metrics_btn = QPushButton(constants.BTN_METRICS)
+        metrics_btn.setObjectName("metricsBtn")
+        metrics_btn.clicked.connect(self.toggle_metrics)
+
         clear_log_btn = QPushButton(constants.BTN_CLEAR_LOG)
         clear_log_btn.setObjectName("clearLogBtn")
         clear_log_btn.clicked.connect(self.clear_log_table)
@@ -344,59 +545,131 @@ class ModernCardValidator(QMainWindow):
         file_layout.addWidget(download_btn)
         file_layout.addWidget(clear_upload_btn)
         file_layout.addWidget(self.set_start_card_btn)
+        file_layout.addWidget(self.multi_lane_btn)
+        file_layout.addWidget(metrics_btn)
         file_layout.addWidget(clear_log_btn)
         layout.addLayout(file_layout)
 
     def create_bottom_section(self, layout):
         pass
 
+    def load_logo(self):
+        """Decode the logo straight to the label's size, instead of decoding it whole and scaling every paint."""
+        reader = QImageReader(constants.LOGO_PATH)
+        reader.setScaledSize(QSize(self.logo_label.width(), self.logo_label.height()))
+        self.logo_label.setPixmap(QPixmap.fromImage(reader.read()))
+
     def setup_timer(self):
         self.timer = QTimer()
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.update_clock)
-        self.timer.start(1000)
         self.update_clock()
 
     def update_clock(self):
-        now = datetime.now().strftime("%Y-%m-%d | %H:%M:%S.%f")[:-3]
-        self.clock_label.setText(now)
-
-    def add_log_entry(self, timestamp, scanned_code, expected_code, status, index):
-        row_pos = self.log_table.rowCount()
-        self.log_table.insertRow(row_pos)
-        
-        index_item = QTableWidgetItem(str(index))
-        timestamp_item = QTableWidgetItem(timestamp)
-        scanned_code_item = QTableWidgetItem(scanned_code)
-        expected_code_item = QTableWidgetItem(expected_code)
-        status_item = QTableWidgetItem(status)
-
-        index_item.setFlags(index_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        timestamp_item.setFlags(timestamp_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        scanned_code_item.setFlags(scanned_code_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        expected_code_item.setFlags(expected_code_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        status_item.setFlags(status_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-
-        self.log_table.setItem(row_pos, 0, index_item)
-        self.log_table.setItem(row_pos, 1, timestamp_item)
-        self.log_table.setItem(row_pos, 2, scanned_code_item)
-        self.log_table.setItem(row_pos, 3, expected_code_item)
-
-        status_item.setFont(QFont("Arial", weight=QFont.Weight.Bold))
-        if status == "OK":
-            status_item.setForeground(QColor("#2ecc71"))
+        # The clock only shows whole seconds, so it ticks on the second instead of showing a stale fraction
+        now = datetime.now()
+        self.view.set("clock", now.strftime("%Y-%m-%d | %H:%M:%S"))
+        self.timer.start(1000 - now.microsecond // 1000)
+
+    def take_memory_snapshot(self):
+        count = self.profiler.snapshot()
+        if count == 1:
+            self.show_status(constants.MSG_PROFILE_TRACING)
         else:
-            status_item.setForeground(QColor("#e74c3c"))
-        self.log_table.setItem(row_pos, 4, status_item)
+            self.show_status(constants.MSG_PROFILE_SNAPSHOT.format(count=count), 3000)
+
+    def write_profile(self):
+        """Write a profile bundle with the session's scan counts and latest metrics."""
+        extra = {
+            "scans": self.metrics.scans,
+            "log_rows": self.journal.records,
+            "job": self.selected_file_path,
+            "cards": len(self.expected_cards) if self.expected_cards else 0,
+            "cursor": self.current_card_index,
+        }
+        metrics = prometheus_text(self.metrics_summary) if self.metrics_summary is not None else None
+        try:
+            path = self.profiler.write(extra, metrics)
+        except OSError as e:
+            print(constants.MSG_PROFILE_FAILED.format(error=e))
+            self.show_status(constants.MSG_PROFILE_FAILED.format(error=e))
+            return
+        print(constants.MSG_PROFILE_WRITTEN.format(path=path))
+        self.show_status(constants.MSG_PROFILE_WRITTEN.format(path=path), 5000)
+
+    def open_journal(self, session=None):
+        return AuditJournal(constants.JOURNAL_DIR, "scans", constants.JOURNAL_SYNC_RECORDS,
+                            constants.JOURNAL_SYNC_INTERVAL_MS / 1000, constants.JOURNAL_MAX_BYTES,
+                            error_callback=self.worker.error_occurred.emit, session=session)
+
+    def save_checkpoint(self):
+        """Checkpoint the session if it moved on since the last checkpoint."""
+        if self.job_identity is None or self.pending_resume is not None:
+            return
+        validator = self.sequence_validator
+        taken_at = (self.job_identity["path"], self.journal.session, self.journal.records, validator.cursor)
+        if taken_at == self.checkpointed:
+            return
+        self.checkpointed = taken_at
+        state = {"job": self.job_identity, "validator": validator.state(),
+                 "journal": {"session": self.journal.session, "records": self.journal.records}}
+        self.checkpoint.save(state, validator.seen.bits, self.journal)
+
+    def offer_resume(self):
+        """Offer to resume the last session if it left a checkpoint and its job file is unchanged."""
+        saved = self.checkpoint.load()
+        if saved is None:
+            return
+        state, bits = saved
+        job = state["job"]
+        try:
+            unchanged = job_identity(job["path"], job["count"]) == job
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            self.checkpoint.discard()
+            return
+        reply = QMessageBox.question(self, "Resume", constants.MSG_CONFIRM_RESUME.format(
+            file=job["path"], position=state["validator"]["cursor"] + 1, count=job["count"],
+            records=state["journal"]["records"]), QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes)
+        if reply != QMessageBox.StandardButton.Yes:
+            self.checkpoint.discard()
+            return
+        self.resume_session(state, bits)
 
-        self.log_data.append({
-            "index": index, "timestamp": timestamp, "scanned_code": scanned_code, "expected_code": expected_code, "status": status
-        })
+    def resume_session(self, state, bits):
+        """Reopen a checkpoint's journal and log view, then load its job and restore the cursor once loaded."""
+        try:
+            journal = self.open_journal(state["journal"]["session"])
+            rows = journal.tail(constants.LOG_RESUME_ROWS)
+            self.log_model.clear(journal.records - len(rows))
+            for _, timestamp, scanned_code, expected_code, status in rows:
+                self.log_data.append(timestamp, scanned_code, expected_code, status)
+        except (OSError, ValueError) as e:
+            self.log_model.clear()
+            QMessageBox.critical(self, "Error", constants.MSG_RESUME_FAILED.format(error=e))
+            return
+        self.journal.close()
+        self.journal = journal
+        self.log_model.flush()
+        self.log_table.scrollToBottom()
+        self.pending_resume = (state, bits)
+        self.selected_file_path = state["job"]["path"]
+        self.load_expected_cards()
+        self.findChild(QPushButton, "fileBtn").setEnabled(False)
+
+    def add_log_entry(self, timestamp, scanned_code, expected_code, status):
+        self.log_data.append(timestamp, scanned_code, expected_code, status)
+        self.journal.append(timestamp, scanned_code, expected_code, status)
+        self.view.set("log")
 
     def select_file(self):
         file_path, _ = QFileDialog.getOpenFileName(self, constants.TITLE_SELECT_FILE, "", constants.FILE_FILTER)
         if file_path:
             self.selected_file_path = file_path
-            self.status_bar.showMessage(constants.MSG_FILE_SELECTED.format(file=os.path.basename(file_path)), 3000)
+            self.pending_resume = None
+            self.show_status(constants.MSG_FILE_SELECTED.format(file=os.path.basename(file_path)), 3000)
             self.load_expected_cards()
             self.findChild(QPushButton, "fileBtn").setEnabled(False)
 
@@ -404,68 +677,124 @@ class ModernCardValidator(QMainWindow):
         if not self.selected_file_path:
             QMessageBox.warning(self, "Warning", constants.MSG_NO_FILE_SELECTED)
             return
-        
-        preview_dialog = PreviewWindow(self.expected_cards, self)
+
+        from gui.ui.preview_window import PreviewWindow  # Deferred, see DEFERRED_MODULES
+        preview_dialog = PreviewWindow(self.expected_cards, self, self.card_finder)
         preview_dialog.exec()
 
     def load_expected_cards(self):
+        self.cancel_loading()
         if not self.selected_file_path:
-            self.expected_cards = []
+            self.sequence_validator.load()
             return
-        try:
-            parsed_data = parse_file(self.selected_file_path)
-            self.expected_cards = [card_tuple for card_tuple, _ in parsed_data]
-            
-            self.current_card_index = 0
-            self.first_scan_received = True
-            self.status_bar.showMessage(constants.MSG_LOADED_CARDS.format(count=len(self.expected_cards)), 3000)
-            self.set_start_card_btn.setEnabled(True)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", constants.MSG_ERROR_LOADING_CARDS.format(error=str(e)))
-            self.expected_cards = []
+
+        from gui.card_loader import CardLoader  # Deferred, see DEFERRED_MODULES
+        self.job_identity = None
+        self.card_loader = CardLoader(self.selected_file_path, self)
+        self.card_loader.chunk_loaded.connect(self.on_cards_chunk_loaded)
+        self.card_loader.load_finished.connect(self.on_cards_loaded)
+        self.card_loader.load_failed.connect(self.on_cards_load_failed)
+
+        # Scanning can start on the rows loaded so far while the rest streams in
+        self.sequence_validator.load(self.card_loader.sequence, self.card_loader.index)
+        self.loading = True
+        self.card_loader.start()
+
+    def cancel_loading(self):
+        if self.card_loader:
+            self.card_loader.cancel()
+            self.card_loader = None
+        self.loading = False
+        self.card_validator.clear_pending()
+
+    def on_cards_chunk_loaded(self, count, percent):
+        if self.sender() is not self.card_loader:
+            return  # Late signal from a cancelled load
+        self.show_status(constants.MSG_LOADING_CARDS.format(count=count, percent=percent))
+        self.card_validator.process_pending()
+        self.update_card_display()
+
+    def on_cards_loaded(self, sequence, index, check):
+        if self.sender() is not self.card_loader:
+            return
+        self.card_loader = None
+        self.loading = False
+        # The loader may hand back a cached or range-compressed copy of the cards streamed so far.
+        # The check only comes now, once every card is in, so no real card is rejected.
+        self.sequence_validator.swap(sequence, index, check)
+        self.job_identity = job_identity(self.selected_file_path, len(sequence))
+        self.checkpointed = None
+        message = constants.MSG_LOADED_CARDS.format(count=len(sequence))
+        if self.pending_resume is not None:
+            state, bits = self.pending_resume
+            self.pending_resume = None
+            if state["job"] == self.job_identity:
+                self.sequence_validator.restore(state["validator"], bits)
+                message = constants.MSG_RESUMED.format(file=os.path.basename(self.selected_file_path),
+                                                       position=self.current_card_index + 1,
+                                                       records=self.journal.records)
+        # Sort the jump-to orders off the GUI thread so the card dialogs find cards at once
+        threading.Thread(target=self.card_finder.prepare, daemon=True).start()
+        self.card_validator.process_pending()
+        self.update_card_display()
+        self.show_status(message, 3000)
+        self.set_start_card_btn.setEnabled(True)
+        self.multi_lane_btn.setEnabled(True)
+
+    def on_cards_load_failed(self, error):
+        if self.sender() is not self.card_loader:
+            return
+        self.card_loader = None
+        self.loading = False
+        self.pending_resume = None
+        self.card_validator.clear_pending()
+        QMessageBox.critical(self, "Error", constants.MSG_ERROR_LOADING_CARDS.format(error=error))
+        self.sequence_validator.load()
+        self.update_card_display()
 
     def download_logs(self):
-        if not self.log_data:
+        if not self.journal.records:
             QMessageBox.information(self, "Info", constants.MSG_NO_LOG_DATA)
             return
         file_path, _ = QFileDialog.getSaveFileName(self, constants.TITLE_SAVE_LOGS, f"logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", constants.CSV_FILE_FILTER)
         if file_path:
             try:
-                with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=['index', 'timestamp', 'scanned_code', 'expected_code', 'status'])
-                    writer.writeheader()
-                    writer.writerows(self.log_data)
+                self.journal.export(file_path)
                 QMessageBox.information(self, "Success", constants.MSG_LOGS_SAVED.format(path=file_path))
-                self.status_bar.showMessage("Logs downloaded successfully", 3000)
+                self.show_status("Logs downloaded successfully", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "Error", constants.MSG_ERROR_SAVING_FILE.format(error=str(e)))
 
     def clear_loaded_file(self):
+        self.cancel_loading()
         self.selected_file_path = ""
-        self.expected_cards = []
-        self.current_card_index = 0
-        self.first_scan_received = True
+        self.job_identity = self.pending_resume = self.checkpointed = None
+        self.checkpoint.discard()
+        self.sequence_validator.load()
         self.scanner_input.clear()
         self.current_card_input.clear()
         self.next_expected_card_input.clear()
         self.findChild(QPushButton, "fileBtn").setEnabled(True)
         self.set_start_card_btn.setEnabled(False)
-        self.status_bar.showMessage(constants.MSG_CLEARED_LOADED_FILE, 3000)
+        self.multi_lane_btn.setEnabled(False)
+        self.show_status(constants.MSG_CLEARED_LOADED_FILE, 3000)
 
     def clear_log_table(self):
         reply = QMessageBox.question(self, "Clear Log", constants.MSG_CONFIRM_CLEAR_LOG, QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.log_table.setRowCount(0)
-            self.log_data = []
-            self.status_bar.showMessage(constants.MSG_LOG_TABLE_CLEARED, 3000)
+            self.log_model.clear()
+            self.journal.close()  # Its files stay on disk; the next rows start a new session
+            self.journal = self.open_journal()
+            self.show_status(constants.MSG_LOG_TABLE_CLEARED, 3000)
 
     def select_start_card(self):
         if not self.expected_cards:
             QMessageBox.warning(self, "Warning", constants.MSG_NO_FILE_SELECTED)
             return
 
-        dialog = SelectStartCardDialog(self.expected_cards, self)
+        from gui.ui.select_start_card_dialog import SelectStartCardDialog  # Deferred, see DEFERRED_MODULES
+        dialog = SelectStartCardDialog(self.expected_cards, self, self.card_finder)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             selected_index = dialog.get_selected_index()
             if selected_index != -1:
@@ -475,11 +804,39 @@ class ModernCardValidator(QMainWindow):
             else:
                 QMessageBox.warning(self, "Warning", constants.MSG_NO_CARD_SELECTED)
 
+    def open_multi_lane(self):
+        """Validate the loaded job on several COM ports at once, one lane per scanning head."""
+        if not self.expected_cards or self.loading:
+            QMessageBox.warning(self, "Warning", constants.MSG_NO_FILE_SELECTED)
+            return
+        from gui.ui.multi_lane_window import MultiLaneWindow  # Deferred, see DEFERRED_MODULES
+        self.stop_reading()  # Its port may be one of the lanes
+        MultiLaneWindow(self.expected_cards, self.sequence_index, self.sequence_validator.check, self).exec()
+
+    def closeEvent(self, event):
+        self.cancel_loading()
+        self.checkpoint_timer.stop()
+        self.metrics_timer.stop()
+        self.save_checkpoint()
+        self.checkpoint.close()  # Flushes the journal before its last state is written
+        self.journal.close()
+        if self.profiler is not None:
+            self.write_profile()
+            self.profiler.stop()
+        super().closeEvent(event)
+
 def main():
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
-    win = ModernCardValidator()
+    startup.mark("QApplication created")
+    profiler = None
+    if profiling.ENABLED:
+        profiler = profiling.Profiler(constants.PROFILE_DIR, "app")
+        profiler.start()
+    win = ModernCardValidator(profiler)
+    startup.mark("window created")
     win.show()
+    win.offer_resume()
     sys.exit(app.exec())
 
 
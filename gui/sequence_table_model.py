@@ -0,0 +1,37 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+SEQUENCE_HEADERS = ["NUMCARD", "ICCID"]
+
+
+class SequenceTableModel(QAbstractTableModel):
+    """
+    Read-only NUMCARD/ICCID table over a loaded sequence. Cells are read from
+    the sequence when a view paints them, so opening it costs nothing per card.
+
+    Args:
+        sequence (CardSequence): The cards; the rows loaded so far are shown.
+        parent (QObject): Parent object.
+    """
+
+    def __init__(self, sequence, parent=None):
+        super().__init__(parent)
+        self.sequence = sequence
+        self._rows = len(sequence) if sequence else 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(SEQUENCE_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return SEQUENCE_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if index.column() == 0:
+            return self.sequence.numcard(index.row())
+        return self.sequence.iccid(index.row())
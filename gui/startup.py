@@ -0,0 +1,88 @@
+"""
+Startup timing, for finding what slows a cold start on the line PCs.
+
+Start the app with ``--startup-report`` (or CARD_VALIDATOR_STARTUP_REPORT=1)
+and, once the window is up, the COM ports are listed and the deferred
+modules are imported, it prints how long each startup phase took and an
+``-X importtime``-style table of the slowest imports: time spent in the
+module itself and including what it imported, in milliseconds.
+
+Import this module before anything heavy so that the imports it times
+include the app's own. It has no dependencies beyond the standard library.
+"""
+import builtins
+import os
+import sys
+import threading
+import time
+
+STARTED = time.perf_counter()
+ENABLED = "--startup-report" in sys.argv or os.environ.get("CARD_VALIDATOR_STARTUP_REPORT") == "1"
+REPORT_IMPORTS = 25  # Slowest imports listed
+
+_marks = []  # (phase, seconds since STARTED)
+_imports = []  # (module, self seconds, cumulative seconds), in the order they finished
+_local = threading.local()  # Per thread: ``stack`` of seconds spent in nested imports, one per import in progress
+_original_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level == 0 and not fromlist and name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    stack = _local.__dict__.setdefault("stack", [])
+    loaded = len(sys.modules)
+    stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = stack.pop()
+        if len(sys.modules) > loaded:
+            label = _label(name, globals, fromlist, level)
+            if threading.current_thread() is not threading.main_thread():
+                label += " (background)"
+            _imports.append((label, elapsed - nested, elapsed))
+            if stack:
+                stack[-1] += elapsed
+
+
+def _label(name, globals, fromlist, level):
+    """Absolute name of what an import statement imported, e.g. "numpy.linalg" for ``from . import linalg``."""
+    if not level:
+        return name
+    package = ((globals or {}).get("__package__") or "").rsplit(".", level - 1)[0]
+    if name:
+        return f"{package}.{name}"
+    if len(fromlist) == 1:
+        return f"{package}.{fromlist[0]}"
+    return f"{package}.{{{', '.join(fromlist[:3])}{', ...' if len(fromlist) > 3 else ''}}}"
+
+
+def start():
+    """Start timing imports, if the report is enabled."""
+    if ENABLED and builtins.__import__ is _original_import:
+        builtins.__import__ = _timed_import
+
+
+def mark(phase):
+    """Note that a startup phase has just finished."""
+    if ENABLED:
+        _marks.append((phase, time.perf_counter() - STARTED))
+
+
+def report():
+    """Stop timing imports and print the report."""
+    if not ENABLED:
+        return
+    builtins.__import__ = _original_import
+    lines = ["Startup report (ms since the startup module was imported):"]
+    previous = 0.0
+    for phase, at in _marks:
+        lines.append(f"  {at * 1e3:8.1f}  (+{(at - previous) * 1e3:7.1f})  {phase}")
+        previous = at
+    lines.append(f"Slowest imports ({len(_imports)} timed):")
+    lines.append(f"  {'self':>8} | {'cumulative':>10} | module")
+    for name, own, cumulative in sorted(_imports, key=lambda entry: -entry[2])[:REPORT_IMPORTS]:
+        lines.append(f"  {own * 1e3:8.1f} | {cumulative * 1e3:10.1f} | {name}")
+    print("\n".join(lines))
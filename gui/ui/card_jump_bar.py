@@ -0,0 +1,45 @@
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QWidget
+
+import constants
+
+
+class CardJumpBar(QWidget):
+    """
+    Jump-to box over a CardFinder: Enter finds the first card matching the
+    NUMCARD or ICCID prefix/suffix typed, and Enter again steps to the next match.
+    """
+    card_found = pyqtSignal(int)  # Position of the card jumped to
+
+    def __init__(self, finder, parent=None):
+        super().__init__(parent)
+        self.finder = finder
+        self.matches = None
+        self.match_number = 0
+        self._query = None
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText(constants.MSG_JUMP_PLACEHOLDER)
+        self.query_input.returnPressed.connect(self.jump)
+        layout.addWidget(self.query_input, 1)
+        self.result_label = QLabel()
+        layout.addWidget(self.result_label)
+
+    def jump(self):
+        query = self.query_input.text().strip()
+        if not query:
+            return
+        if query == self._query and self.matches:
+            self.match_number = (self.match_number + 1) % self.matches.count
+        else:
+            self._query = query
+            self.matches = self.finder.search(query)
+            self.match_number = 0
+        if not self.matches:
+            self.result_label.setText(constants.MSG_JUMP_NOT_FOUND.format(query=query))
+            return
+        self.result_label.setText(constants.MSG_JUMP_MATCH.format(
+            kind=self.matches.kind, number=self.match_number + 1, count=self.matches.count))
+        self.card_found.emit(self.matches.position(self.match_number))
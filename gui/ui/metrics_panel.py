@@ -0,0 +1,56 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QDockWidget, QHeaderView, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+)
+
+import constants
+from services.scan_metrics import DISPLAY, QUANTILES, QUEUE, READ, STAGES, TOTAL, VALIDATE
+
+STAGE_LABELS = {
+    READ: "Port read -> framed",
+    QUEUE: "Framed -> validation",
+    VALIDATE: "Validation",
+    DISPLAY: "Verdict -> log table",
+    TOTAL: "Port read -> log table",
+}
+
+
+class MetricsPanel(QDockWidget):
+    """
+    Dockable view of a ScanMetrics summary: scans per second, queue depth
+    and the p50/p95/p99 latency of each hot-path stage, in milliseconds.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(constants.TITLE_METRICS, parent)
+        self.setObjectName("metricsDock")
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        self.rate_label = QLabel()
+        layout.addWidget(self.rate_label)
+        self.queue_label = QLabel()
+        layout.addWidget(self.queue_label)
+
+        self.table = QTableWidget(len(STAGES), len(QUANTILES) + 1)
+        self.table.setHorizontalHeaderLabels([f"p{round(q * 100)} (ms)" for q in QUANTILES] + ["Count"])
+        self.table.setVerticalHeaderLabels([STAGE_LABELS[stage] for stage in STAGES])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        for row in range(len(STAGES)):
+            for column in range(len(QUANTILES) + 1):
+                item = QTableWidgetItem()
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        layout.addWidget(self.table)
+        self.setWidget(widget)
+
+    def show_summary(self, summary):
+        """Show a ScanMetrics.summary()."""
+        self.rate_label.setText(constants.MSG_METRICS_RATE.format(rate=summary["rate"], scans=summary["scans"]))
+        self.queue_label.setText(constants.MSG_METRICS_QUEUE.format(
+            depth=summary["depth"], peak=summary["depth_peak"], dropped=summary["dropped"], late=summary["late"]))
+        for row, stage in enumerate(STAGES):
+            figures = summary["stages"][stage]
+            for column, value in enumerate(figures["quantiles"]):
+                self.table.item(row, column).setText("-" if value is None else f"{value * 1e3:.2f}")
+            self.table.item(row, len(QUANTILES)).setText(str(figures["count"]))
@@ -0,0 +1,287 @@
+import os
+import threading
+from datetime import datetime
+from functools import partial
+
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (
+    QDialog, QFileDialog, QGridLayout, QGroupBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
+    QListWidget, QListWidgetItem, QMessageBox, QPushButton, QTableView, QVBoxLayout
+)
+
+import constants
+from gui.log_table_model import LogTableModel
+from logic.com_selector import list_com_ports
+from logic.scan_hub import ScanHub
+from services.audit_journal import AuditJournal
+from services.log_store import LogStore
+from services.scan_lanes import ScanLane, ranges_from_numcards, split_ranges
+from services.sequence_validator import verdict_log_rows
+
+
+class LaneSignals(QObject):
+    """Carries scans from the lane reader threads to the GUI thread, tagged with the lane."""
+    data_received = pyqtSignal(int, str)
+    error_occurred = pyqtSignal(int, str)
+    ports_listed = pyqtSignal(list, str)  # The COM ports, and an error message if listing them failed
+
+
+class LanePanel(QGroupBox):
+    """Log table, audit journal and live counters of one lane. Logged rows are shown on flush()."""
+
+    def __init__(self, lane, sequence, parent=None, error_callback=None):
+        super().__init__(lane.name, parent)
+        self.lane = lane
+        self.sequence = sequence
+        self.file_name = "".join(c if c.isalnum() else "_" for c in lane.name)
+        self.log_data = LogStore(limit=constants.LOG_TAIL_ROWS)
+        self.journal = AuditJournal(constants.JOURNAL_DIR, f"lane_{self.file_name}", constants.JOURNAL_SYNC_RECORDS,
+                                    constants.JOURNAL_SYNC_INTERVAL_MS / 1000, constants.JOURNAL_MAX_BYTES,
+                                    error_callback=error_callback)
+        self.log_model = LogTableModel(self.log_data, self)
+
+        layout = QVBoxLayout(self)
+        if lane.stop > lane.start:
+            first, last = sequence.numcard(lane.start), sequence.numcard(lane.stop - 1)
+        else:
+            first = last = "-"
+        layout.addWidget(QLabel(constants.MSG_LANE_RANGE.format(first=first, last=last)))
+        self.stats_label = QLabel()
+        layout.addWidget(self.stats_label)
+
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
+        self.log_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.log_table.verticalHeader().setVisible(False)
+        self.log_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.log_table.setAlternatingRowColors(True)
+        layout.addWidget(self.log_table, 1)
+        self.refresh_stats()
+
+    def add_verdict(self, timestamp, verdict):
+        for scanned_code, expected_code, status in verdict_log_rows(verdict, self.sequence):
+            self.log_data.append(timestamp, scanned_code, expected_code, status)
+            self.journal.append(timestamp, scanned_code, expected_code, status)
+
+    def flush(self):
+        """Add the rows logged since the last flush to the table in one batch."""
+        if self.log_model.flush():
+            self.log_table.scrollToBottom()
+
+    def refresh_stats(self, stopped=False):
+        lane = self.lane
+        cursor = lane.validator.cursor
+        current = self.sequence.numcard(cursor) if cursor < lane.stop else constants.MSG_LANE_DONE
+        self.stats_label.setText(constants.MSG_LANE_STATS.format(
+            current=current, rate=lane.throughput(), scanned=lane.scanned, errors=lane.errors)
+            + (f" | {constants.MSG_LANE_STOPPED}" if stopped else ""))
+
+
+class MultiLaneWindow(QDialog):
+    """
+    Runs several scanning heads over the loaded job, one lane per COM port,
+    each with its own cursor over a NUMCARD sub-range.
+
+    Args:
+        sequence (CardSequence): The loaded cards, shared by every lane.
+        index (SequenceIndex): The shared index over ``sequence``.
+        check (IccidCheck): The shared structural check, or None.
+        parent (QWidget): Parent window; its stylesheet is inherited.
+        reader_factory (callable): Builds a lane's reader, with ComPortReader's
+                                   arguments (port, callback, error_callback).
+                                   By default every lane is read by one ScanHub thread.
+    """
+
+    def __init__(self, sequence, index, check=None, parent=None, reader_factory=None):
+        super().__init__(parent)
+        self.setWindowTitle(constants.TITLE_MULTI_LANE)
+        self.setMinimumSize(1000, 700)
+        if parent is not None:
+            self.setStyleSheet(parent.styleSheet())
+        self.sequence = sequence
+        self.index = index
+        self.check = check
+        self.hub = None
+        if reader_factory is None:
+            self.hub = ScanHub()
+            reader_factory = self.hub.reader
+        self.reader_factory = reader_factory
+        self.lanes = []
+        self.panels = []
+        self.readers = []
+        self.stopped = set()  # Lanes whose reader stopped after a NOT OK scan
+
+        self.signals = LaneSignals()
+        self.signals.data_received.connect(self.handle_lane_data)
+        self.signals.error_occurred.connect(self.handle_lane_error)
+        self.signals.ports_listed.connect(self.on_ports_listed)
+
+        layout = QVBoxLayout(self)
+        setup_layout = QHBoxLayout()
+        self.port_list = QListWidget()
+        self.port_list.setMaximumHeight(110)
+        setup_layout.addWidget(self.port_list, 1)
+        options_layout = QVBoxLayout()
+        options_layout.addWidget(QLabel(constants.LABEL_LANE_STARTS))
+        self.starts_input = QLineEdit()
+        self.starts_input.setPlaceholderText(constants.MSG_LANE_STARTS_PLACEHOLDER)
+        options_layout.addWidget(self.starts_input)
+        buttons_layout = QHBoxLayout()
+        self.start_btn = QPushButton("Start Lanes")
+        self.start_btn.clicked.connect(self.start_lanes)
+        self.stop_btn = QPushButton("Stop Lanes")
+        self.stop_btn.clicked.connect(self.stop_lanes)
+        self.stop_btn.setEnabled(False)
+        download_btn = QPushButton(constants.BTN_DOWNLOAD_LOGS)
+        download_btn.clicked.connect(self.download_logs)
+        buttons_layout.addWidget(self.start_btn)
+        buttons_layout.addWidget(self.stop_btn)
+        buttons_layout.addWidget(download_btn)
+        options_layout.addLayout(buttons_layout)
+        setup_layout.addLayout(options_layout, 1)
+        layout.addLayout(setup_layout)
+
+        self.lane_grid = QGridLayout()
+        layout.addLayout(self.lane_grid, 1)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        # Listing the ports can take seconds on the line PCs, so it runs in the background like the main window's
+        self.start_btn.setEnabled(False)
+        self.status_label.setText(constants.MSG_LISTING_COM_PORTS)
+        threading.Thread(target=self.list_ports, name="COM port listing", daemon=True).start()
+
+        # Log rows and counters are repainted on a timer, not per scan, so the GUI thread keeps up
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(constants.LANE_FLUSH_INTERVAL_MS)
+
+    def list_ports(self):
+        ports, error = [], ""
+        try:
+            ports = list_com_ports()
+        except Exception as e:
+            error = str(e)
+        finally:
+            self.signals.ports_listed.emit(ports, error)
+
+    def on_ports_listed(self, ports, error):
+        for port in ports:
+            item = QListWidgetItem(port)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.port_list.addItem(item)
+        if not self.lanes:
+            self.start_btn.setEnabled(bool(ports))
+            self.status_label.setText(error or ("" if ports else constants.MSG_NO_COM_PORTS))
+
+    def selected_ports(self):
+        return [self.port_list.item(i).text() for i in range(self.port_list.count())
+                if self.port_list.item(i).checkState() == Qt.CheckState.Checked]
+
+    def start_lanes(self, ports=None):
+        ports = self.selected_ports() if not ports else ports
+        if not ports:
+            self.status_label.setText(constants.MSG_SELECT_LANE_PORTS)
+            return
+        numcards = [numcard.strip() for numcard in self.starts_input.text().split(",") if numcard.strip()]
+        try:
+            if numcards:
+                if len(numcards) != len(ports):
+                    raise ValueError(constants.MSG_LANE_STARTS_COUNT.format(ports=len(ports)))
+                ranges = ranges_from_numcards(self.sequence, numcards)
+            else:
+                ranges = split_ranges(len(self.sequence), len(ports))
+        except ValueError as e:
+            QMessageBox.warning(self, "Warning", str(e))
+            return
+
+        self.stop_lanes()
+        self.clear_lanes()
+        for lane_index, (port, (start, stop)) in enumerate(zip(ports, ranges)):
+            lane = ScanLane(port, self.sequence, self.index, self.check, start, stop,
+                            window=constants.OUT_OF_ORDER_WINDOW)
+            panel = LanePanel(lane, self.sequence, self,
+                              error_callback=partial(self.signals.error_occurred.emit, lane_index))
+            self.lanes.append(lane)
+            self.panels.append(panel)
+            self.lane_grid.addWidget(panel, lane_index // 2, lane_index % 2)
+            reader = self.reader_factory(
+                port=port,
+                callback=partial(self.signals.data_received.emit, lane_index),
+                error_callback=partial(self.signals.error_occurred.emit, lane_index),
+            )
+            self.readers.append(reader)
+            reader.start_reading()
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.port_list.setEnabled(False)
+        self.status_label.setText(constants.MSG_LANES_STARTED.format(count=len(self.lanes)))
+
+    def stop_lanes(self):
+        for reader in self.readers:
+            reader.stop_reading()
+        self.readers = []
+        self.flush()
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.port_list.setEnabled(True)
+
+    def clear_lanes(self):
+        for panel in self.panels:
+            panel.journal.close()
+            self.lane_grid.removeWidget(panel)
+            panel.deleteLater()
+        self.lanes = []
+        self.panels = []
+        self.stopped = set()
+
+    def handle_lane_data(self, lane_index, scanned_code):
+        if lane_index >= len(self.lanes) or lane_index in self.stopped:
+            return  # Late scan from a stopped reader
+        verdict = self.lanes[lane_index].scan(scanned_code)
+        self.panels[lane_index].add_verdict(datetime.now().strftime("%H:%M:%S.%f")[:-3], verdict)
+        if verdict.stop_reading:
+            # Stop this head only; the GUI thread does not wait for its port to close
+            self.stopped.add(lane_index)
+            self.readers[lane_index].stop_reading(wait=False)
+
+    def handle_lane_error(self, lane_index, error):
+        if lane_index < len(self.lanes):
+            self.status_label.setText(f"{self.lanes[lane_index].name}: {error}")
+
+    def flush(self):
+        for lane_index, panel in enumerate(self.panels):
+            panel.flush()
+            panel.refresh_stats(lane_index in self.stopped)
+
+    def download_logs(self):
+        if not any(panel.journal.records for panel in self.panels):
+            QMessageBox.information(self, "Info", constants.MSG_NO_LOG_DATA)
+            return
+        directory = QFileDialog.getExistingDirectory(self, constants.TITLE_SAVE_LOGS)
+        if not directory:
+            return
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        try:
+            for panel in self.panels:
+                panel.journal.export(os.path.join(directory, f"logs_{stamp}_{panel.file_name}.csv"))
+            QMessageBox.information(self, "Success", constants.MSG_LOGS_SAVED.format(path=directory))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", constants.MSG_ERROR_SAVING_FILE.format(error=str(e)))
+
+    def shutdown(self):
+        self.flush_timer.stop()
+        self.stop_lanes()
+        for panel in self.panels:
+            panel.journal.close()
+        if self.hub:
+            self.hub.stop()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
+    def reject(self):
+        self.shutdown()
+        super().reject()
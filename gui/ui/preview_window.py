@@ -1,9 +1,13 @@
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView
+    QDialog, QVBoxLayout, QLabel, QTableView, QHeaderView, QAbstractItemView
 )
 
+from gui.sequence_table_model import SequenceTableModel
+from gui.ui.card_jump_bar import CardJumpBar
+from services.card_finder import CardFinder
+
 class PreviewWindow(QDialog):
-    def __init__(self, expected_cards, parent=None):
+    def __init__(self, expected_cards, parent=None, finder=None):
         super().__init__(parent)
         self.setWindowTitle("Preview Expected Cards")
         self.setMinimumSize(400, 300)
@@ -14,13 +18,18 @@ class PreviewWindow(QDialog):
         if not expected_cards:
             layout.addWidget(QLabel("No expected cards loaded."))
         else:
-            table = QTableWidget(len(expected_cards), 2)
-            table.setHorizontalHeaderLabels(["NUMCARD", "ICCID"])
-            table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers) # Make table non-editable
-            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            # Rows are read from the sequence as they scroll into view
+            self.table = QTableView()
+            self.table.setModel(SequenceTableModel(expected_cards, self))
+            self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+            self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
 
-            for row, (numcard, iccid) in enumerate(expected_cards):
-                table.setItem(row, 0, QTableWidgetItem(numcard))
-                table.setItem(row, 1, QTableWidgetItem(iccid))
+            jump_bar = CardJumpBar(finder or CardFinder(expected_cards), self)
+            jump_bar.card_found.connect(self.show_card)
+            layout.addWidget(jump_bar)
+            layout.addWidget(self.table)
 
-            layout.addWidget(table)
\ No newline at end of file
+    def show_card(self, position):
+        self.table.selectRow(position)
+        self.table.scrollTo(self.table.model().index(position, 0), QAbstractItemView.ScrollHint.PositionAtCenter)
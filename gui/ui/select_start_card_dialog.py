@@ -1,9 +1,13 @@
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QLabel, QListWidget, QDialogButtonBox
+    QDialog, QVBoxLayout, QLabel, QTableView, QHeaderView, QAbstractItemView, QDialogButtonBox
 )
 
+from gui.sequence_table_model import SequenceTableModel
+from gui.ui.card_jump_bar import CardJumpBar
+from services.card_finder import CardFinder
+
 class SelectStartCardDialog(QDialog):
-    def __init__(self, expected_cards, parent=None):
+    def __init__(self, expected_cards, parent=None, finder=None):
         super().__init__(parent)
         self.setWindowTitle("Select Starting Card")
         self.setMinimumSize(300, 400)
@@ -15,20 +19,35 @@ class SelectStartCardDialog(QDialog):
         label = QLabel("Select the NUMCARD to start processing from:")
         layout.addWidget(label)
 
-        self.card_list_widget = QListWidget()
-        for i, (numcard, iccid) in enumerate(expected_cards):
-            self.card_list_widget.addItem(f"{numcard} (ICCID: {iccid})")
-        layout.addWidget(self.card_list_widget)
+        jump_bar = CardJumpBar(finder or CardFinder(expected_cards), self)
+        jump_bar.card_found.connect(self.select_card)
+        layout.addWidget(jump_bar)
+
+        # Rows are read from the sequence as they scroll into view
+        self.card_table = QTableView()
+        self.card_table.setModel(SequenceTableModel(expected_cards, self))
+        self.card_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.card_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.card_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.card_table.verticalHeader().setVisible(False)
+        self.card_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        layout.addWidget(self.card_table)
 
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
 
-        self.card_list_widget.itemClicked.connect(self._item_clicked)
+        self.card_table.clicked.connect(self._row_clicked)
+        self.card_table.doubleClicked.connect(self.accept)
+
+    def _row_clicked(self, index):
+        self.selected_index = index.row()
 
-    def _item_clicked(self, item):
-        self.selected_index = self.card_list_widget.row(item)
+    def select_card(self, position):
+        self.selected_index = position
+        self.card_table.selectRow(position)
+        self.card_table.scrollTo(self.card_table.model().index(position, 0), QAbstractItemView.ScrollHint.PositionAtCenter)
 
     def get_selected_index(self):
-        return self.selected_index
\ No newline at end of file
+        return self.selected_index
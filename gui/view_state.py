@@ -0,0 +1,86 @@
+"""
+Frame-paced widget updates for the main window.
+
+Scan feedback used to write to the widgets once per scan: the scanner field,
+the status bar, the two card fields and the log table, each write scheduling
+its own repaint. ViewState sits in between. Setting a field only records the
+value; at most once per frame the latest value of every field set since the
+last frame is handed to that field's setter. A burst of scans then costs one
+repaint of each widget that changed, however many scans the frame held.
+
+A field can also be given a longer interval of its own, for widgets that are
+costly to repaint and not what the operator watches scan by scan, such as
+the log table: it is then applied in the first frame after its interval.
+"""
+import time
+
+from PyQt6.QtCore import QObject, QTimer
+
+
+class ViewState(QObject):
+    """
+    The values the window's widgets should show, applied at most once a frame.
+
+    A frame starts right away when the last one is at least ``interval_ms``
+    old, so feedback on a single scan is not delayed; under load frames are
+    ``interval_ms`` apart.
+
+    Args:
+        interval_ms (int): Shortest time between two frames.
+        parent (QObject): Parent object.
+
+    Attributes:
+        frames (int): Frames applied so far.
+    """
+
+    def __init__(self, interval_ms, parent=None):
+        super().__init__(parent)
+        self.interval = interval_ms / 1000
+        self.frames = 0
+        self._setters = {}  # Field -> (callable taking the value, seconds between two applies)
+        self._applied_at = {}  # Field -> when it was last applied
+        self._pending = {}  # Field -> latest value set and not applied yet
+        self._last_frame = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.apply)
+
+    def bind(self, field, setter, interval_ms=0):
+        """
+        Apply values of ``field`` with ``setter(value)``.
+
+        Args:
+            field (str): Field name.
+            setter (callable): Shows a value in the widgets.
+            interval_ms (int): Shortest time between two applies of this
+                               field, if longer than a frame.
+        """
+        self._setters[field] = (setter, interval_ms / 1000)
+        self._applied_at[field] = 0.0
+
+    def set(self, field, value=None):
+        """Show ``value`` in ``field`` from the next frame it is due in on."""
+        self._pending[field] = value
+        if not self._timer.isActive():
+            self._schedule(time.monotonic())
+
+    def apply(self):
+        """Apply the pending values that are due now."""
+        self._timer.stop()
+        now = self._last_frame = time.monotonic()
+        self.frames += 1
+        pending, self._pending = self._pending, {}
+        for field, value in pending.items():
+            setter, interval = self._setters[field]
+            if now - self._applied_at[field] >= interval:
+                self._applied_at[field] = now
+                setter(value)
+            else:
+                self._pending[field] = value  # Not due yet
+        if self._pending:
+            self._schedule(now)
+
+    def _schedule(self, now):
+        due = max(self._last_frame + self.interval,
+                  min(self._applied_at[field] + self._setters[field][1] for field in self._pending))
+        self._timer.start(max(0, round((due - now) * 1000)))
@@ -1,28 +1,120 @@
+import os
+import select
 import serial
 import threading
-import re
+import time
+
+from services.scan_metrics import READ
+
+READ_CHUNK = 4096  # Bytes read per wake-up; a burst of scans is framed in one pass
+MAX_FRAME = 1024   # A partial frame longer than this is line noise and is dropped
+READ_TIMEOUT = 0.2  # Seconds a blocking read waits before the loop checks for a stop again
+
+# CR ends a frame like LF; every other byte outside printable ASCII is deleted
+_FRAME_TABLE = bytes(range(256)).replace(b"\r", b"\n")
+_NOISE = bytes(b for b in range(256) if not 0x20 <= b <= 0x7E and b not in (0x0A, 0x0D))
+
+
+class ScanFramer:
+    """
+    Splits the raw bytes read from a scanner into scans.
+
+    Frames end on CR, LF or CRLF; bytes outside printable ASCII are dropped,
+    then surrounding spaces are stripped and empty frames are skipped.
+    """
+
+    __slots__ = ("buffer",)
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Add bytes read from the port.
+
+        Args:
+            data (bytes): Bytes as read, possibly several scans or part of one.
+
+        Returns:
+            list[str]: The scans completed by ``data``, in order.
+        """
+        buffer = self.buffer
+        buffer += data
+        end = max(buffer.rfind(b"\n"), buffer.rfind(b"\r"))
+        if end < 0:
+            if len(buffer) > MAX_FRAME:
+                buffer.clear()
+            return []
+        text = buffer[:end].translate(_FRAME_TABLE, _NOISE).decode("ascii")
+        del buffer[:end + 1]
+        return [scan for scan in map(str.strip, text.split("\n")) if scan]
+
 
 class ComPortReader:
-    def __init__(self, port, baudrate=115200, callback=None, error_callback=None):
+    """
+    Reads scans from a serial port on a thread of its own.
+
+    Args:
+        port (str): The port's device name.
+        baudrate (int): Baud rate.
+        callback (callable): Called with each scan, on the reader thread.
+        error_callback (callable): Called with a message if the port fails.
+        metrics (ScanMetrics): If given, each read is timed from the bytes
+                               arriving to the scans framed, as its READ stage,
+                               and ``callback`` is called as
+                               ``callback(scan, arrived)`` with the time the
+                               bytes arrived (time.perf_counter()).
+        opened_callback (callable): Called without arguments once the port
+                                    is open, on the reader thread.
+    """
+
+    def __init__(self, port, baudrate=115200, callback=None, error_callback=None, metrics=None,
+                 opened_callback=None):
         self.port = port
         self.baudrate = baudrate
         self.callback = callback
         self.error_callback = error_callback
+        self.metrics = metrics
+        self.opened_callback = opened_callback
         self.running = False
         self.thread = None
+        self._serial = None
+        self._wake = None  # Write end of the pipe that wakes the read loop to stop
 
     def start_reading(self):
         self.running = True
-        self.thread = threading.Thread(target=self.read_loop)
+        if os.name == "posix":
+            wake, self._wake = os.pipe()
+            args = (wake,)
+        else:
+            args = ()
+        self.thread = threading.Thread(target=self.read_loop, args=args, name=f"ComPortReader {self.port}")
         self.thread.daemon = True
         self.thread.start()
 
-    def stop_reading(self):
+    def stop_reading(self, wait=True):
+        """Stop the read loop; with ``wait``, block until the thread has closed the port."""
         self.running = False
-        if self.thread and self.thread.is_alive():
+        if self._wake is not None:
+            try:
+                os.write(self._wake, b"\0")
+            except OSError:
+                pass  # The loop already ended and closed its end
+            os.close(self._wake)
+            self._wake = None
+        elif self._serial is not None:
+            self._serial.cancel_read()
+        if wait and self.thread and self.thread.is_alive():
             self.thread.join()
 
-    def read_loop(self):
+    def read_loop(self, wake=None):
+        """
+        Read scans until stopped. The thread sleeps in the kernel until the
+        port has data: on POSIX in select() on the port and the ``wake`` pipe,
+        elsewhere in a read that stop_reading() cancels, bounded by
+        READ_TIMEOUT so a stop that comes while the port is opening or
+        between two reads (when there is no read to cancel) is still seen.
+        """
         try:
             print(f"Attempting to open serial port {self.port} at {self.baudrate} baud...")
             with serial.Serial(
@@ -31,20 +123,26 @@ class ComPortReader:
                 bytesize=8,      # Data size = 8
                 parity='N',      # Parity = none
                 stopbits=1,      # Standard stop bits
-                timeout=1,       # Timeout
+                timeout=0 if wake is not None else READ_TIMEOUT,  # Non-blocking under select, else bounded
                 rtscts=False,    # Handshake = off
                 dsrdtr=False     # Handshake = off
             ) as ser:
                 print(f"Successfully opened serial port {self.port}.")
-                while self.running:
-                    if ser.in_waiting > 0:
-                        raw_data = ser.readline()
-                        decoded_data = raw_data.decode(errors='ignore').strip()
-                        
-                        decoded_data = re.sub(r'[^\x20-\x7E]', '',decoded_data)
-                        print(f"Received raw: {raw_data}, Decoded: {decoded_data}")
-                        if self.callback:
-                            self.callback(decoded_data)
+                if not self.running:
+                    return  # Stopped while the port was opening
+                if self.opened_callback:
+                    self.opened_callback()
+                framer = ScanFramer()
+                if wake is not None:
+                    self._select_loop(ser.fileno(), wake, framer)
+                else:
+                    self._serial = ser
+                    while self.running:
+                        data = ser.read(ser.in_waiting or 1)
+                        if not data:
+                            continue  # Timed out or cancelled; the loop checks running again
+                        arrived = time.perf_counter()
+                        self._deliver(framer.feed(data), arrived)
         except serial.SerialException as e:
             print(f"Serial error in read_loop: {e}")
             if self.error_callback:
@@ -56,4 +154,31 @@ class ComPortReader:
             if self.error_callback:
                 self.error_callback(f"Unexpected error: {e}")
             else:
-                print(f"Unexpected error: {e}")
\ No newline at end of file
+                print(f"Unexpected error: {e}")
+        finally:
+            self._serial = None
+            if wake is not None:
+                os.close(wake)
+
+    def _select_loop(self, fd, wake, framer):
+        while self.running:
+            ready, _, _ = select.select([fd, wake], [], [])
+            if wake in ready or not self.running:
+                return
+            arrived = time.perf_counter()
+            data = os.read(fd, READ_CHUNK)
+            if not data:
+                raise serial.SerialException(f"{self.port} was disconnected")
+            self._deliver(framer.feed(data), arrived)
+
+    def _deliver(self, scans, arrived):
+        if not self.callback:
+            return
+        if self.metrics is None:
+            for scan in scans:
+                self.callback(scan)
+            return
+        read = time.perf_counter() - arrived
+        for scan in scans:
+            self.metrics.record(READ, read)
+            self.callback(scan, arrived)
@@ -1,23 +1,82 @@
 import os
-from services.file_service import parse_cpd_cards, parse_txt_file, parse_csv_file
+import constants
+from services.file_service import (
+    parse_cpd_cards, parse_txt_file, parse_csv_file,
+    iter_cpd_cards, iter_txt_cards, iter_csv_cards, CHUNK_ROWS
+)
+from services.sequence_cache import load_cached_sequence
 
-def parse_file(file_path):
+
+def _readers_for(file_path):
+    """Return the (parser, chunk iterator) pair for a file's extension."""
+    _, file_extension = os.path.splitext(file_path)
+
+    if file_extension.lower() == '.cpd':
+        return parse_cpd_cards, iter_cpd_cards
+    elif file_extension.lower() == '.txt':
+        return parse_txt_file, iter_txt_cards
+    elif file_extension.lower() == '.csv':
+        return parse_csv_file, iter_csv_cards
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+def parse_file(file_path, use_cache=True):
     """
     Parses a file based on its extension.
 
     Args:
         file_path (str): Path to the input file.
+        use_cache (bool): Reuse (or create) the binary sequence cache for the file.
 
     Returns:
-        list: A list of tuples, where each tuple contains (current_card, next_card).
+        CardSequence: The expected cards as (NUMCARD, ICCID) records.
     """
-    _, file_extension = os.path.splitext(file_path)
+    parser, _ = _readers_for(file_path)
 
-    if file_extension.lower() == '.cpd':
-        return parse_cpd_cards(file_path)
-    elif file_extension.lower() == '.txt':
-        return parse_txt_file(file_path)
-    elif file_extension.lower() == '.csv':
-        return parse_csv_file(file_path)
-    else:
-        raise ValueError(f"Unsupported file type: {file_extension}")
+    if use_cache:
+        return load_cached_sequence(file_path, parser)
+    return parser(file_path)
+
+
+def prepare_sequence(sequence, index=None):
+    """
+    Readies a fully loaded sequence for validation: it is range-compressed
+    when that at least halves its memory, indexed for resynchronisation
+    (unless ``index`` already covers it) and given an IccidCheck.
+
+    Args:
+        sequence (CardSequence): Every card of the job.
+        index (SequenceIndex): An index already built over ``sequence``, if any.
+
+    Returns:
+        tuple: (sequence, SequenceIndex, IccidCheck) for SequenceValidator.
+    """
+    # Imported here: they load NumPy, which the headless validator keeps off its startup path
+    from services.iccid_check import IccidCheck
+    from services.range_sequence import RangeSequence
+    from services.sequence_index import SequenceIndex
+
+    if constants.COMPRESS_SEQUENCE_RANGES:
+        compressed = RangeSequence.from_sequence(sequence)
+        if compressed.nbytes <= sequence.nbytes // 2:
+            sequence, index = compressed, None
+    if index is None:
+        index = SequenceIndex(sequence, constants.RESYNC_SUBSTRING_LENGTHS)
+    return sequence, index, IccidCheck.from_sequence(sequence)
+
+
+def iter_file_chunks(file_path, chunk_size=CHUNK_ROWS):
+    """
+    Streams a file's cards in chunks, based on its extension.
+
+    Args:
+        file_path (str): Path to the input file.
+        chunk_size (int): Maximum number of rows per chunk.
+
+    Yields:
+        tuple: (rows, progress) where rows is a list of (NUMCARD, ICCID) tuples
+               and progress the fraction of the file read so far.
+    """
+    _, chunk_iterator = _readers_for(file_path)
+    return chunk_iterator(file_path, chunk_size)
@@ -0,0 +1,276 @@
+"""
+Many serial ports served by one asyncio event loop thread.
+
+ComPortReader gives every port its own thread. A ScanHub instead registers
+each port's file descriptor with one event loop (``loop.add_reader``) and
+frames what arrives with the same ScanFramer, so a line PC polling many
+scanners runs one reader thread however many ports are attached. That
+holds on POSIX only: Windows serial handles cannot be polled, so there each
+port is read by a thread of its own (blocking reads bounded by
+READ_TIMEOUT), and the hub thread only frames and delivers.
+
+Ports can be attached and detached at any time from any thread; sync() and
+``ports`` wait for the hub thread, so call them from other threads. Scans are
+delivered to the port's callback on the hub thread. The callback must be
+thread-safe; emitting a Qt signal is, and is how the GUI is bridged. Ports
+attached without a callback feed the hub's async stream, ``scans()``.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+
+from logic.com_reader import READ_CHUNK, READ_TIMEOUT, ScanFramer
+
+
+class _Port:
+    __slots__ = ("name", "serial", "framer", "callback", "error_callback", "executor")
+
+    def __init__(self, name, callback, error_callback):
+        self.name = name
+        self.serial = None
+        self.executor = None  # The port's reader thread, where ports cannot be polled (Windows)
+        self.framer = ScanFramer()
+        self.callback = callback
+        self.error_callback = error_callback
+
+
+class HubReader:
+    """
+    One port of a ScanHub behind the ComPortReader interface, so code written
+    against ComPortReader (e.g. a MultiLaneWindow reader_factory) can use the hub.
+    """
+
+    def __init__(self, hub, port, callback=None, error_callback=None):
+        self.hub = hub
+        self.port = port
+        self.callback = callback
+        self.error_callback = error_callback
+
+    def start_reading(self):
+        self.hub.attach(self.port, self.callback, self.error_callback)
+
+    def stop_reading(self, wait=True):
+        """Detach the port; with ``wait``, block until the hub has closed it."""
+        done = self.hub.detach(self.port)
+        if wait and done is not None:
+            done.result()
+
+
+class ScanHub:
+    """
+    Reads scans from any number of serial ports on one event loop thread.
+
+    Args:
+        baudrate (int): Baud rate the ports are opened at.
+    """
+
+    def __init__(self, baudrate=115200):
+        self.baudrate = baudrate
+        self.loop = None
+        self.thread = None
+        self._ports = {}  # Port name -> _Port, changed only on the hub thread
+        self._queue = None  # (port, scan) pairs of the ports attached without a callback
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def ports(self):
+        """Names of the attached ports, read on the hub thread."""
+        if not self.running:
+            return []
+        return self.submit(self._names()).result()
+
+    def start(self):
+        """Start the hub thread; does nothing if it is already running."""
+        if self.running:
+            return
+        self.loop = asyncio.new_event_loop()
+        self._queue = asyncio.Queue()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Detach every port and stop the hub thread."""
+        if not self.running:
+            return
+        self.submit(self._close_all()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.thread = None
+
+    def submit(self, coroutine):
+        """Run a coroutine on the hub thread; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def attach(self, port, callback=None, error_callback=None):
+        """
+        Open a port and start reading it; errors go to ``error_callback``.
+
+        Args:
+            port (str): The port's device name, as listed by list_com_ports().
+            callback (callable): Called with each scan, on the hub thread.
+                                 Without one, scans go to ``scans()``.
+            error_callback (callable): Called with a message if the port fails.
+
+        Returns:
+            concurrent.futures.Future: Done once the port is open (or failed).
+        """
+        self.start()
+        return self.submit(self._attach(port, callback, error_callback))
+
+    def detach(self, port):
+        """Stop reading a port and close it. Returns a Future, or None if the hub is not running."""
+        if not self.running:
+            return None
+        return self.submit(self._detach(port))
+
+    def reader(self, port, callback=None, error_callback=None):
+        """A HubReader for ``port``; takes ComPortReader's arguments."""
+        return HubReader(self, port, callback, error_callback)
+
+    def sync(self, ports, callback=None, error_callback=None):
+        """
+        Attach the listed ports that are not attached yet and detach the ones
+        no longer listed, e.g. with a fresh list_com_ports() after hot-plugging.
+        The difference is taken on the hub thread, in order with attach() and
+        detach() calls made before.
+
+        Returns:
+            tuple[list[str], list[str]]: The ports attached (being opened) and detached.
+        """
+        self.start()
+        return self.submit(self._sync(list(ports), callback, error_callback)).result()
+
+    async def scans(self):
+        """Async stream of (port, scan) from the ports attached without a callback; iterate it on the hub thread."""
+        queue = self._queue
+        while True:
+            yield await queue.get()
+
+    async def _names(self):
+        return sorted(self._ports)
+
+    async def _sync(self, ports, callback, error_callback):
+        attached = set(self._ports)
+        added = [port for port in dict.fromkeys(ports) if port not in attached]
+        removed = sorted(attached - set(ports))
+        for port in removed:
+            self._close(self._ports[port])
+        loop = asyncio.get_running_loop()
+        for port in added:
+            loop.create_task(self._attach(port, callback, error_callback))  # Registers the port before any later call runs
+        return added, removed
+
+    async def _attach(self, name, callback, error_callback):
+        if name in self._ports:
+            return
+        port = self._ports[name] = _Port(name, callback, error_callback)
+        loop = asyncio.get_running_loop()
+        try:
+            print(f"Attempting to open serial port {name} at {self.baudrate} baud...")
+            # Opening can block on USB adapters; keep the other ports reading meanwhile
+            ser = await loop.run_in_executor(None, self._open, name)
+        except serial.SerialException as e:
+            self._ports.pop(name, None)
+            self._report(port, f"Serial error: {e}")
+            return
+        except Exception as e:  # E.g. ValueError for a malformed port name
+            self._ports.pop(name, None)
+            self._report(port, f"Unexpected error: {e}")
+            return
+        if self._ports.get(name) is not port:
+            ser.close()  # Detached while opening
+            return
+        port.serial = ser
+        print(f"Successfully opened serial port {name}.")
+        if os.name == "posix":
+            loop.add_reader(ser.fileno(), self._readable, port)
+        else:
+            # Windows serial handles cannot be polled; each port gets a reader thread of its own, since
+            # a shared executor would run out of threads and leave later ports (and opens) waiting
+            port.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ScanHub {name}")
+            loop.create_task(self._read_blocking(port))
+
+    def _open(self, name):
+        return serial.Serial(
+            name,
+            self.baudrate,
+            bytesize=8,      # Data size = 8
+            parity='N',      # Parity = none
+            stopbits=1,      # Standard stop bits
+            timeout=0 if os.name == "posix" else READ_TIMEOUT,  # Non-blocking under add_reader, else bounded
+            rtscts=False,    # Handshake = off
+            dsrdtr=False     # Handshake = off
+        )
+
+    def _readable(self, port):
+        try:
+            data = os.read(port.serial.fileno(), READ_CHUNK)
+        except OSError as e:
+            data = None
+            error = f"Serial error: {e}"
+        else:
+            error = f"Serial error: {port.name} was disconnected"
+        if not data:
+            self._close(port)
+            self._report(port, error)
+            return
+        self._deliver(port, port.framer.feed(data))
+
+    async def _read_blocking(self, port):
+        loop = asyncio.get_running_loop()
+        ser = port.serial
+        executor = port.executor
+        try:
+            while self._ports.get(port.name) is port:
+                data = await loop.run_in_executor(executor, lambda: ser.read(ser.in_waiting or 1))
+                if data:
+                    self._deliver(port, port.framer.feed(data))
+        except (serial.SerialException, RuntimeError) as e:  # RuntimeError: the executor was shut down
+            if self._ports.get(port.name) is port:
+                self._close(port)
+                self._report(port, f"Serial error: {e}")
+
+    def _deliver(self, port, scans):
+        if port.callback:
+            for scan in scans:
+                port.callback(scan)
+        else:
+            for scan in scans:
+                self._queue.put_nowait((port.name, scan))
+
+    def _report(self, port, message):
+        print(f"{message} ({port.name})")
+        if port.error_callback:
+            port.error_callback(message)
+
+    async def _detach(self, name):
+        port = self._ports.get(name)
+        if port is not None:
+            self._close(port)
+
+    async def _close_all(self):
+        for port in list(self._ports.values()):
+            self._close(port)
+
+    def _close(self, port):
+        self._ports.pop(port.name, None)
+        ser = port.serial
+        if ser is None:
+            return
+        if os.name == "posix":
+            self.loop.remove_reader(ser.fileno())
+        else:
+            ser.cancel_read()
+        ser.close()
+        port.serial = None
+        if port.executor is not None:
+            port.executor.shutdown(wait=False)  # Its pending read ends within READ_TIMEOUT
+            port.executor = None
@@ -0,0 +1,122 @@
+"""
+Bounded hand-off of scans from a reader thread to the GUI thread.
+
+The reader thread put()s each scan; the GUI thread drain()s everything
+queued at a fixed cadence and validates the batch in one go, instead of
+running one queued Qt event per scan. deque.append and deque.popleft are
+atomic, so neither side takes a lock.
+
+When the GUI falls behind by more than ``capacity`` scans the overflow
+policy decides what is lost, and every loss is counted:
+
+- DROP_NEWEST: incoming scans are refused until the GUI catches up, so the
+  scans already queued are validated in the order they arrived.
+- DROP_OLDEST: the oldest queued scans make room, so the GUI catches up to
+  the cards currently under the scanner.
+
+Every scan keeps when its bytes arrived and when it was queued
+(time.perf_counter()), so drain_timed() can time it through the GUI.
+
+Either way the dropped cards show up as SKIPPED rows once the line is
+resynchronised, and ``dropped`` says how many were lost in the queue.
+"""
+import time
+from collections import deque
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+
+class ScanQueue:
+    """
+    Single-producer, single-consumer queue of scans with an overflow policy.
+
+    Args:
+        capacity (int): Most scans held before the overflow policy applies.
+        overflow (str): DROP_NEWEST or DROP_OLDEST.
+        late_after (float): Seconds a scan may wait before it is counted late.
+
+    Attributes:
+        received (int): Scans put by the reader.
+        dropped (int): Scans lost to the overflow policy.
+        late (int): Scans drained more than ``late_after`` after they arrived.
+    """
+
+    __slots__ = ("capacity", "overflow", "late_after", "received", "dropped", "late", "_scans")
+
+    def __init__(self, capacity=4096, overflow=DROP_NEWEST, late_after=0.1):
+        if overflow not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.late_after = late_after
+        self.received = 0
+        self.dropped = 0
+        self.late = 0
+        # With DROP_OLDEST the deque's maxlen discards the oldest scan on append
+        self._scans = deque(maxlen=capacity if overflow == DROP_OLDEST else None)
+
+    def put(self, scan, arrived=None):
+        """
+        Queue a scan; called on the reader thread.
+
+        Args:
+            scan (str): The scan.
+            arrived (float): When its bytes arrived (time.perf_counter()),
+                             if the reader timed them; else now.
+        """
+        self.received += 1
+        scans = self._scans
+        if len(scans) >= self.capacity:
+            self.dropped += 1
+            if self.overflow == DROP_NEWEST:
+                return
+        queued = time.perf_counter()
+        scans.append((queued if arrived is None else arrived, queued, scan))
+
+    def drain(self, limit=None):
+        """
+        Take the queued scans, oldest first; called on the GUI thread.
+
+        Args:
+            limit (int): Most scans to take, or None for all of them. The rest
+                         stay queued for the next drain.
+
+        Returns:
+            list[str]: The scans taken.
+        """
+        return [scan for _, _, scan in self.drain_timed(limit)]
+
+    def drain_timed(self, limit=None):
+        """
+        Like drain(), with the times each scan arrived and was queued.
+
+        Returns:
+            list[tuple[float, float, str]]: (arrived, queued, scan) of the scans taken.
+        """
+        scans = self._scans
+        batch = []
+        count = len(scans) if limit is None else min(limit, len(scans))
+        for _ in range(count):
+            batch.append(scans.popleft())
+        if batch:
+            deadline = time.perf_counter() - self.late_after
+            if batch[0][0] < deadline:
+                self.late += sum(1 for arrived, _, _ in batch if arrived < deadline)
+        return batch
+
+    def clear(self):
+        """Discard the queued scans, e.g. once reading has stopped."""
+        self._scans.clear()
+
+    def reset(self):
+        """Discard the queued scans and zero the counters."""
+        self._scans.clear()
+        self.received = self.dropped = self.late = 0
+
+    def __len__(self):
+        return len(self._scans)
+
+    def __repr__(self):
+        return (f"ScanQueue({len(self._scans)}/{self.capacity} queued, {self.overflow}, received={self.received}, "
+                f"dropped={self.dropped}, late={self.late})")
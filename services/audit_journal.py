@@ -0,0 +1,211 @@
+"""
+Crash-safe, append-only journal of the scan log.
+
+Every log row is handed to an AuditJournal as it is logged. A background
+writer thread appends the rows as CSV lines (the same columns as a log
+download) and group-commits them: the file is fsynced once ``sync_records``
+rows are waiting or ``sync_interval`` seconds after the oldest waiting row
+was appended, whichever comes first. A crash or power cut loses at most
+that window, and a torn last line is the only damage a reader can see.
+
+A session's rows go to numbered files, a new one once the current file
+reaches ``max_bytes``; every file starts with the CSV header, so each one
+can be opened on its own. export() joins a session's files into one CSV,
+as a file copy. A session can be reopened after a restart: its torn last
+line, if any, is cut off, numbering carries on from the last row on disk,
+and tail() reads the most recent rows back without reading the rest.
+"""
+import csv
+import glob
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from services.log_store import LOG_FIELDS
+
+_TAIL_BLOCK = 1 << 16  # Bytes read per step when reading a journal backwards
+
+
+class AuditJournal:
+    """
+    Journal of one logging session, written by a background thread.
+
+    Args:
+        directory (str): Where the journal files are written; created if missing.
+        name (str): File name prefix, e.g. "scans" or a lane name.
+        sync_records (int): Rows waiting that trigger an fsync.
+        sync_interval (float): Seconds a row may wait before it is fsynced.
+        max_bytes (int): Size at which the next rows go to a new file.
+        error_callback (callable): Called with a message, on the writer
+                                   thread, if the journal cannot be written.
+        session (str): An earlier journal's ``session`` to carry on with,
+                       in a new file, instead of starting a new session.
+
+    Attributes:
+        records (int): Rows appended.
+        synced (int): Rows written and fsynced.
+        paths (list[str]): The session's files, in order.
+    """
+
+    def __init__(self, directory, name="scans", sync_records=256, sync_interval=0.2, max_bytes=64 << 20,
+                 error_callback=None, session=None):
+        self.directory = directory
+        self.session = session or f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        self.sync_records = sync_records
+        self.sync_interval = sync_interval
+        self.max_bytes = max_bytes
+        self.error_callback = error_callback
+        self.records = 0
+        self.synced = 0
+        self.paths = []
+        self.error = None
+        if session:
+            self._reopen()
+        self._pending = deque()  # (appended at, row) not yet written
+        self._condition = threading.Condition()
+        self._flush_requested = False
+        self._closing = False
+        self._file = None
+        self._writer = None
+        self._thread = threading.Thread(target=self._run, name=f"AuditJournal {name}", daemon=True)
+        self._thread.start()
+
+    def append(self, timestamp, scanned_code, expected_code, status):
+        """Queue a log row for the journal; returns right away. Ignored once the journal is closed."""
+        with self._condition:
+            if self._closing:
+                return
+            self.records += 1
+            self._pending.append((time.monotonic(), (self.records, timestamp, scanned_code, expected_code, status)))
+            if len(self._pending) == 1 or len(self._pending) >= self.sync_records:
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Write and fsync every row appended so far.
+
+        Returns:
+            bool: True once they are on disk, False on timeout or a write error.
+        """
+        with self._condition:
+            target = self.records
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self.synced >= target or self.error is not None, timeout) \
+                and self.error is None
+
+    def close(self):
+        """Flush, close the current file and stop the writer thread."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def export(self, path):
+        """
+        Write the whole session to ``path`` as one CSV, with a single header.
+
+        Raises:
+            OSError: If the journal could not be written or read.
+        """
+        if not self.flush():
+            raise OSError(self.error or "Journal flush timed out")
+        with open(path, "wb") as out:
+            for number, journal_path in enumerate(self.paths):
+                with open(journal_path, "rb") as journal:
+                    if number:
+                        journal.readline()  # Every file repeats the header
+                    shutil.copyfileobj(journal, out, 1 << 20)
+
+    def tail(self, count):
+        """
+        The last ``count`` rows written, read back from the end of the files.
+
+        Returns:
+            list[list[str]]: Rows oldest first, as lists of LOG_FIELDS values.
+        """
+        lines = []
+        for path in reversed(self.paths):
+            if len(lines) >= count:
+                break
+            with open(path, "rb") as journal:
+                end = journal.seek(0, os.SEEK_END)
+                blocks, newlines = [], 0
+                while end > 0 and newlines <= count - len(lines):
+                    start = max(0, end - _TAIL_BLOCK)
+                    journal.seek(start)
+                    blocks.append(journal.read(end - start))
+                    newlines += blocks[-1].count(b"\n")
+                    end = start
+            # The first line is the header, or cut by the last block read
+            file_lines = b"".join(reversed(blocks)).splitlines()[1:]
+            lines[:0] = file_lines[max(0, len(file_lines) - (count - len(lines))):]
+        return list(csv.reader(line.decode("utf-8") for line in lines))
+
+    def _reopen(self):
+        """Pick up an earlier session's files and numbering."""
+        pattern = os.path.join(glob.escape(self.directory), f"{glob.escape(self.session)}_[0-9][0-9][0-9].csv")
+        self.paths = sorted(glob.glob(pattern))
+        if self.paths:
+            with open(self.paths[-1], "r+b") as journal:
+                size = journal.seek(0, os.SEEK_END)
+                journal.seek(max(0, size - _TAIL_BLOCK))
+                block = journal.read()
+                if block and not block.endswith(b"\n"):
+                    journal.truncate(size - len(block) + block.rfind(b"\n") + 1)  # Torn by a crash
+        last = self.tail(1)
+        self.records = self.synced = int(last[0][0]) if last else 0
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                condition.wait_for(lambda: self._pending or self._closing or self._flush_requested)
+                if self._pending and not self._closing and not self._flush_requested:
+                    # Group commit: wait for a full batch or the oldest row's deadline
+                    deadline = self._pending[0][0] + self.sync_interval
+                    while (len(self._pending) < self.sync_records and not self._closing and not self._flush_requested
+                           and (remaining := deadline - time.monotonic()) > 0):
+                        condition.wait(remaining)
+                batch = [row for _, row in self._pending]
+                self._pending.clear()
+                self._flush_requested = False
+                closing = self._closing
+            if batch and self.error is None:
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    self.error = f"Audit journal error: {e}"
+                    print(self.error)
+                    if self.error_callback:
+                        self.error_callback(self.error)
+            with condition:
+                if self.error is None:
+                    self.synced += len(batch)
+                condition.notify_all()
+            if closing:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write(self, batch):
+        if self._file is None:
+            self._open_next()
+        self._writer.writerows(batch)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self._file.tell() >= self.max_bytes:
+            self._file.close()
+            self._file = None  # The next batch starts a new file
+
+    def _open_next(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.session}_{len(self.paths) + 1:03d}.csv")
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self.paths.append(path)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(LOG_FIELDS)
@@ -0,0 +1,158 @@
+"""
+Jump-to lookups over a loaded job: a card by NUMCARD, or by the start or
+end of its ICCID.
+
+CardFinder keeps one sorted order of positions per kind of key, 4 bytes a
+card, and binary-searches it while reading the keys back from the sequence
+itself, so a lookup costs O(log n) reads whatever the job size. An order
+is built the first time its kind is searched, or up front by prepare();
+one whose keys are already ascending in job order (the usual case for
+ICCIDs) costs nothing to keep.
+"""
+import numpy as np
+
+_READ_BLOCK = 1 << 16  # Cards read per call while building an order, so other threads get the GIL in between
+
+NUMCARD = "NUMCARD"
+ICCID_PREFIX = "ICCID prefix"
+ICCID_SUFFIX = "ICCID suffix"
+
+
+class CardMatches:
+    """
+    The cards matching a query, in key order.
+
+    Attributes:
+        kind (str): NUMCARD, ICCID_PREFIX or ICCID_SUFFIX.
+        count (int): Number of matching cards.
+    """
+
+    __slots__ = ("kind", "_order", "_lo", "count")
+
+    def __init__(self, kind, order, lo, hi):
+        self.kind = kind
+        self._order = order
+        self._lo = lo
+        self.count = hi - lo
+
+    def position(self, i):
+        """Position of the i-th match."""
+        rank = self._lo + i
+        return rank if self._order is None else int(self._order[rank])
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"CardMatches({self.kind}, {self.count} cards)"
+
+
+class CardFinder:
+    """
+    Sorted lookups over a CardSequence or RangeSequence.
+
+    Args:
+        sequence (CardSequence): The loaded cards. Cards appended after an
+                                 order was built trigger a rebuild.
+    """
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self._orders = {}  # Kind -> (cards covered, positions in key order or None for job order)
+
+    def prepare(self):
+        """Build every order now, e.g. on a background thread right after a job loads."""
+        for kind in (NUMCARD, ICCID_PREFIX, ICCID_SUFFIX):
+            self._order(kind)
+
+    def search(self, query):
+        """
+        Find cards by NUMCARD, else by ICCID prefix, else by ICCID suffix.
+
+        Args:
+            query (str): A NUMCARD, or the start or end of an ICCID.
+
+        Returns:
+            CardMatches: The matches of the first kind that has any, or None.
+        """
+        query = query.strip()
+        if not query or not self.sequence:
+            return None
+        for kind in (NUMCARD, ICCID_PREFIX, ICCID_SUFFIX):
+            matches = self.find(kind, query)
+            if matches.count:
+                return matches
+        return None
+
+    def find(self, kind, query):
+        """Return the CardMatches of ``query`` for one kind of key."""
+        key = query.encode("utf-8")
+        if kind == ICCID_SUFFIX:
+            key = key[::-1]
+        order = self._order(kind)
+        read = self._reader(kind)
+        size = len(key)
+        count = len(self.sequence)
+        if kind == NUMCARD:
+            lo = self._bisect(order, read, key, count, lambda found: found < key)
+            hi = self._bisect(order, read, key, count, lambda found: found <= key)
+        else:
+            lo = self._bisect(order, read, key, count, lambda found: found[:size] < key)
+            hi = self._bisect(order, read, key, count, lambda found: found[:size] <= key)
+        return CardMatches(kind, order, lo, hi)
+
+    @staticmethod
+    def _bisect(order, read, key, count, before):
+        """First rank whose key is not ``before`` the query."""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if before(read(mid if order is None else int(order[mid]))):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _reader(self, kind):
+        sequence = self.sequence
+        if kind == NUMCARD:
+            return lambda position: (sequence.numcard(position) or "").encode("utf-8")
+        if kind == ICCID_PREFIX:
+            return lambda position: sequence.iccid(position).encode("utf-8")
+        return lambda position: sequence.iccid(position).encode("utf-8")[::-1]
+
+    def _order(self, kind):
+        count = len(self.sequence)
+        built = self._orders.get(kind)
+        if built is not None and built[0] == count:
+            return built[1]
+        read = self.sequence.numcard_records if kind == NUMCARD else self.sequence.iccid_records
+        blocks = []
+        width = 0
+        for start in range(0, count, _READ_BLOCK):
+            block, width = read(start, min(start + _READ_BLOCK, count))
+            blocks.append(block)
+        keys = np.frombuffer(b"".join(blocks), dtype=f"S{width}") if width else np.zeros(count, dtype="S1")
+        del blocks
+        if kind == ICCID_SUFFIX:
+            keys = self._reversed(keys, width)
+        if count < 2 or bool((keys[1:] >= keys[:-1]).all()):
+            order = None  # Already ascending in job order
+        else:
+            order = np.argsort(keys, kind="stable").astype(np.uint32 if count < 1 << 32 else np.int64)
+        self._orders[kind] = (count, order)
+        return order
+
+    @staticmethod
+    def _reversed(keys, width):
+        """Each NUL-padded record with its characters reversed, still NUL-padded on the right."""
+        rows = keys.view(np.uint8).reshape(-1, width)
+        lengths = np.char.str_len(keys)
+        reversed_rows = np.zeros_like(rows)
+        columns = np.arange(width)
+        for start in range(0, len(rows), 1 << 20):
+            block = slice(start, start + (1 << 20))
+            source = lengths[block, None] - 1 - columns
+            valid = source >= 0
+            reversed_rows[block] = np.where(valid, np.take_along_axis(rows[block], np.maximum(source, 0), axis=1), 0)
+        return reversed_rows.view(f"S{width}").ravel()
@@ -0,0 +1,197 @@
+"""
+Compact in-memory store for the expected card sequence.
+
+Each column (NUMCARD, ICCID) is held as fixed-width byte records packed into
+a single buffer instead of one Python string per card, so a multi-million
+card job costs a few tens of bytes per card rather than several hundred.
+"""
+
+ICCID_WIDTH = 20    # ICCIDs are 19-20 digits; longer values widen the column
+NUMCARD_WIDTH = 8   # Enough for NUMCARD values up to 99,999,999
+
+
+class _Column:
+    """Fixed-width, NUL-padded byte records stored back to back in one buffer."""
+
+    __slots__ = ("buffer", "width", "offset")
+
+    def __init__(self, width, buffer=None, offset=0):
+        self.width = width
+        self.buffer = bytearray() if buffer is None else buffer
+        self.offset = offset
+
+    def get(self, index):
+        start = self.offset + index * self.width
+        return self.buffer[start:start + self.width].rstrip(b"\0").decode("utf-8")
+
+    def records(self, start, stop):
+        """Return a copy of records [start, stop) as packed bytes."""
+        return self.buffer[self.offset + start * self.width:self.offset + stop * self.width]
+
+    def raw(self, count):
+        """Return the packed records as a buffer, without copying when possible."""
+        return memoryview(self.buffer)[self.offset:self.offset + count * self.width]
+
+    def append(self, value):
+        self.buffer += value.ljust(self.width, b"\0")
+
+    def extend_packed(self, data, width, count):
+        """Append ``count`` records packed at ``width`` (no wider than this column)."""
+        if width == self.width:
+            self.buffer += data
+            return
+        for i in range(count):
+            self.append(data[i * width:(i + 1) * width].rstrip(b"\0"))
+
+    def widened(self, width, count):
+        """Return a copy of this column re-padded to a larger record width."""
+        column = _Column(width)
+        for i in range(count):
+            start = self.offset + i * self.width
+            column.append(self.buffer[start:start + self.width].rstrip(b"\0"))
+        return column
+
+
+class CardSequence:
+    """
+    Ordered (NUMCARD, ICCID) records with O(1) positional access.
+
+    Indexing returns the same ``(numcard, iccid)`` string tuples the parsers
+    used to produce, so the sequence can be used anywhere a list of card
+    tuples was used before. A NUMCARD of ``None`` (plain ICCID lists) is
+    stored as an empty record.
+    """
+
+    def __init__(self, iccid_width=ICCID_WIDTH, numcard_width=NUMCARD_WIDTH):
+        self._iccids = _Column(iccid_width)
+        self._numcards = _Column(numcard_width)
+        self._count = 0
+
+    @classmethod
+    def from_buffer(cls, buffer, count, iccid_width, numcard_width, offset=0):
+        """
+        Wrap already packed records, e.g. a memory-mapped cache file.
+
+        The buffer holds ``count`` ICCID records followed by ``count`` NUMCARD
+        records starting at ``offset``. Sequences over read-only buffers
+        cannot be appended to.
+        """
+        sequence = cls(iccid_width, numcard_width)
+        sequence._iccids = _Column(iccid_width, buffer, offset)
+        sequence._numcards = _Column(numcard_width, buffer, offset + count * iccid_width)
+        sequence._count = count
+        return sequence
+
+    @property
+    def record_widths(self):
+        """(ICCID width, NUMCARD width) of the packed records, in bytes."""
+        return self._iccids.width, self._numcards.width
+
+    def column_buffers(self):
+        """Return the packed ICCID and NUMCARD records, in that order."""
+        return self._iccids.raw(self._count), self._numcards.raw(self._count)
+
+    def append(self, numcard, iccid):
+        """Append one card to the end of the sequence."""
+        numcard_bytes = b"" if numcard is None else numcard.encode("utf-8")
+        iccid_bytes = iccid.encode("utf-8")
+
+        if len(numcard_bytes) > self._numcards.width:
+            self._numcards = self._numcards.widened(len(numcard_bytes), self._count)
+        if len(iccid_bytes) > self._iccids.width:
+            self._iccids = self._iccids.widened(len(iccid_bytes), self._count)
+
+        self._numcards.append(numcard_bytes)
+        self._iccids.append(iccid_bytes)
+        self._count += 1
+
+    def extend(self, cards):
+        """Append (numcard, iccid) pairs in order."""
+        for numcard, iccid in cards:
+            self.append(numcard, iccid)
+
+    def extend_packed(self, count, iccids, iccid_width, numcards, numcard_width):
+        """
+        Append ``count`` records that are already packed, e.g. by a parser
+        worker process, without decoding them one by one.
+        """
+        if iccid_width > self._iccids.width:
+            self._iccids = self._iccids.widened(iccid_width, self._count)
+        if numcard_width > self._numcards.width:
+            self._numcards = self._numcards.widened(numcard_width, self._count)
+
+        self._numcards.extend_packed(numcards, numcard_width, count)
+        self._iccids.extend_packed(iccids, iccid_width, count)
+        self._count += count
+
+    def iccid(self, index):
+        """Return the ICCID at ``index``."""
+        return self._iccids.get(index)
+
+    def iccid_records(self, start=0, stop=None):
+        """
+        Return (records, width): a copy of the packed ICCID records for cards
+        [start, stop), e.g. for building vectorised indexes.
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        column = self._iccids
+        return column.records(start, stop), column.width
+
+    def numcard_records(self, start=0, stop=None):
+        """Return (records, width): a copy of the packed NUMCARD records for cards [start, stop)."""
+        stop = self._count if stop is None else min(stop, self._count)
+        column = self._numcards
+        return column.records(start, stop), column.width
+
+    def iccid_block(self, start, stop):
+        """
+        Return (text, width): ICCIDs [start, stop) decoded in one go as
+        latin-1, one ``width``-character NUL-padded record after another.
+        Cheaper than decoding card by card when reading ahead.
+        """
+        records, width = self.iccid_records(start, stop)
+        return records.decode("latin-1"), width
+
+    def numcard(self, index):
+        """Return the NUMCARD at ``index``, or None if the source had none."""
+        return self._numcards.get(index) or None
+
+    def next_card(self, index):
+        """Return the card following ``index``, or None if it is the last one."""
+        if index + 1 < self._count:
+            return self[index + 1]
+        return None
+
+    def pairs(self):
+        """
+        Lazily yield (current_card, next_card) tuples.
+
+        This is the view the parsers used to build eagerly; next_card is None
+        for the last card.
+        """
+        for i in range(self._count):
+            yield self[i], self.next_card(i)
+
+    @property
+    def nbytes(self):
+        """Number of bytes held by the record buffers."""
+        return self._count * (self._iccids.width + self._numcards.width)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("card index out of range")
+        return self.numcard(index), self._iccids.get(index)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self.numcard(i), self._iccids.get(i)
+
+    def __repr__(self):
+        return f"<CardSequence cards={self._count} bytes={self.nbytes}>"
@@ -1,56 +1,143 @@
-from PyQt6.QtWidgets import QInputDialog
+import time
+from collections import deque
+import constants
+from services import sequence_validator
 
 class CardValidator:
     def __init__(self, main_window):
         self.main_window = main_window
+        self.pending_scans = deque()  # Scans waiting for more of the sequence to load
+        self.search_resume_index = 0  # Where the pending head's similar-card search left off
+        self.batching = False
+        self.batch_position = None  # Position of the last verdict of the batch being validated
+        self.batch_stopped = False  # A scan of the batch stopped the reader
+        main_window.sequence_validator.subscribe(self.render_verdict)
 
     def handle_com_data(self, scanned_code):
-        self.main_window.scanner_input.setText(scanned_code)
+        if self.pending_scans or not self.can_validate(scanned_code):
+            self.pending_scans.append(scanned_code)
+            self.main_window.view.set("scanned", scanned_code)
+            self.main_window.show_status(constants.MSG_SCAN_WAITING_FOR_LOAD.format(count=len(self.pending_scans)))
+            return
+        self.validate(scanned_code)
+
+    def handle_com_batch(self, scans):
+        """
+        Validate a batch of scans drained from the reader, as (arrived, queued,
+        scanned_code) from ScanQueue.drain_timed(), timing each one into the
+        main window's metrics. Its log rows reach the table in one insert and
+        the card display is updated once, for the last verdict. If a scan
+        stops the reader, the rest of the batch is not validated.
+        """
+        main_window = self.main_window
+        metrics = main_window.metrics
+        self.batching = True
+        self.batch_position = None
+        self.batch_stopped = False
+        try:
+            for arrived, queued, scanned_code in scans:
+                entered = time.perf_counter()
+                self.handle_com_data(scanned_code)
+                metrics.validated(arrived, queued, entered, time.perf_counter())
+                if self.batch_stopped:
+                    break
+        finally:
+            self.batching = False
+        if self.batch_position is not None:
+            main_window.update_card_display(self.batch_position)
+
+    def process_pending(self):
+        """Validate queued scans now that more of the sequence is loaded."""
+        while self.pending_scans and self.can_validate(self.pending_scans[0]):
+            self.validate(self.pending_scans.popleft())
+
+    def clear_pending(self):
+        self.pending_scans.clear()
+        self.search_resume_index = 0
+
+    def can_validate(self, scanned_code):
+        """
+        While the sequence is still loading, a scan can only be validated once
+        every row its verdict depends on is in memory: the card at the cursor,
+        and for a mismatch, the first similar card after it.
+        """
+        if not self.main_window.loading:
+            return True
+        expected_cards = self.main_window.expected_cards
+        index = self.main_window.current_card_index
+        loaded = len(self.main_window.sequence_index)  # Rows the index already covers
+        if index >= loaded:
+            return False
+        if expected_cards[index][1] == scanned_code:
+            self.search_resume_index = 0
+            return True
+
+        # Rows already searched for this scan cannot match on the next attempt
+        if self.find_similar_index(scanned_code, max(index + 1, self.search_resume_index)) is None:
+            self.search_resume_index = loaded
+            return False
+        self.search_resume_index = 0
+        return True
+
+    def find_similar_index(self, scanned_code, start=None):
+        """
+        Return the index of the first card after the cursor whose ICCID contains
+        scanned_code or is contained in it, or None. Looked up in the sequence
+        index instead of walking the remaining cards.
+        """
+        return self.main_window.sequence_validator.find_similar(scanned_code, start)
+
+    def validate(self, scanned_code):
+        self.main_window.view.set("scanned", scanned_code)
+        self.main_window.sequence_validator.scan(scanned_code)
+
+    def render_verdict(self, verdict):
+        """Log a SequenceValidator verdict and update the display."""
         timestamp = self.main_window.get_timestamp()
+        scanned_code = verdict.scanned_code
+        status = verdict.status
 
-        if self.main_window.first_scan_received:
-            self.main_window.first_scan_received = False
-
-        expected_numcard = "N/A"
-        expected_iccid_for_display = "N/A"
-        status = "N/A"
-
-        if self.main_window.expected_cards and self.main_window.current_card_index < len(self.main_window.expected_cards):
-            expected_numcard = self.main_window.expected_cards[self.main_window.current_card_index][0]
-            expected_iccid_for_display = self.main_window.expected_cards[self.main_window.current_card_index][1]
-            status = "OK" if scanned_code == expected_iccid_for_display else "NOT OK"
-        elif self.main_window.expected_cards and self.main_window.current_card_index >= len(self.main_window.expected_cards):
-            expected_iccid_for_display = "End of sequence"
-            status = "N/A"
-
-        self.main_window.add_log_entry(timestamp, scanned_code, expected_iccid_for_display, status, self.main_window.log_table.rowCount() + 1)
-        self.main_window.status_bar.showMessage(f"Scanned: {scanned_code} - {status}")
-
-        if status == "NOT OK":
-            similar_cards = []
-            for i in range(self.main_window.current_card_index + 1, len(self.main_window.expected_cards)):
-                expected_card_value = self.main_window.expected_cards[i][1]
-                if scanned_code in expected_card_value or expected_card_value in scanned_code:
-                    similar_cards.append((self.main_window.expected_cards[i][0], expected_card_value, i))
-
-            if similar_cards:
-                # Automatically select the first similar card
-                chosen_numcard, chosen_iccid, chosen_index = similar_cards[0]
-
-                for i in range(self.main_window.current_card_index, chosen_index):
-                    skipped_num, skipped_iccid = self.main_window.expected_cards[i]
-                    self.main_window.add_log_entry(timestamp, "MISSING", skipped_iccid, "SKIPPED", self.main_window.log_table.rowCount() + 1)
-
-                self.main_window.current_card_index = chosen_index
-                expected_numcard = self.main_window.expected_cards[self.main_window.current_card_index][0]
-                expected_iccid_for_display = self.main_window.expected_cards[self.main_window.current_card_index][1]
-                status = "OK"
-
-                self.main_window.add_log_entry(timestamp, scanned_code, expected_iccid_for_display, status, self.main_window.log_table.rowCount() + 1)
-                self.main_window.status_bar.showMessage(f"Scanned: {scanned_code} - {status} (Jumped)")
+        if status == sequence_validator.JUMPED:
+            self.add_log_entry(timestamp, scanned_code, verdict.expected_iccid, sequence_validator.NOT_OK)
+            expected_cards = self.main_window.expected_cards
+            for i in verdict.skipped:
+                self.add_log_entry(timestamp, "MISSING", expected_cards.iccid(i), "SKIPPED")
+            self.add_log_entry(timestamp, scanned_code, expected_cards.iccid(verdict.position), sequence_validator.OK)
+            self.main_window.show_status(f"Scanned: {scanned_code} - OK (Jumped)")
+        elif status == sequence_validator.OUT_OF_ORDER:
+            # Accepted within the out-of-order window; cards that fell out of it are missing
+            expected_cards = self.main_window.expected_cards
+            self.add_log_entry(timestamp, scanned_code, expected_cards.iccid(verdict.position), status)
+            for i in verdict.skipped:
+                self.add_log_entry(timestamp, "MISSING", expected_cards.iccid(i), "SKIPPED")
+            self.main_window.show_status(f"Scanned: {scanned_code} - OK (Out of order)")
+        elif status == sequence_validator.REJECTED:
+            # A malformed read, not a sequence error: keep reading and wait for a rescan
+            self.add_log_entry(timestamp, scanned_code, verdict.expected_iccid, status)
+            self.main_window.show_status(constants.MSG_SCAN_REJECTED.format(
+                scanned=scanned_code, reason=verdict.reason, count=self.main_window.sequence_validator.rejected))
+        elif status == sequence_validator.DUPLICATE:
+            # The card was validated before: flag it without moving the cursor or stopping the reader
+            self.add_log_entry(timestamp, scanned_code, verdict.expected_iccid, status)
+            self.main_window.show_status(constants.MSG_SCAN_DUPLICATE.format(
+                scanned=scanned_code, count=self.main_window.sequence_validator.duplicates))
+        else:
+            if status == sequence_validator.END:
+                expected_iccid, status = "End of sequence", "N/A"
+            elif status == sequence_validator.NO_SEQUENCE:
+                expected_iccid = "N/A"
             else:
+                expected_iccid = verdict.expected_iccid
+            self.add_log_entry(timestamp, scanned_code, expected_iccid, status)
+            self.main_window.show_status(f"Scanned: {scanned_code} - {status}")
+            if verdict.stop_reading:
+                self.batch_stopped = self.batching
                 self.main_window.stop_reading()
 
-        self.main_window.update_card_display()
+        if self.batching:
+            self.batch_position = verdict.position
+        else:
+            self.main_window.update_card_display(verdict.position)
 
-        self.main_window.current_card_index += 1
+    def add_log_entry(self, timestamp, scanned_code, expected_code, status):
+        self.main_window.add_log_entry(timestamp, scanned_code, expected_code, status)
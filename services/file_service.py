@@ -1,19 +1,26 @@
 import csv
+import os
+from services.card_sequence import CardSequence
 
-def parse_cpd_cards(file_path):
+CHUNK_ROWS = 10000  # Rows per chunk when streaming a file
+CPD_HEADER_PREFIX = "NUMCARD;MAXCARD;DATAFILE;ICCID;IMSI"  # Header row that starts the card section
+
+
+def iter_cpd_cards(file_path, chunk_size=CHUNK_ROWS):
     """
-    Parses a CPD (Card Profile Data) file to extract card details (NUMCARD and ICCID)
-    and returns them as pairs of (current_card, next_card).
+    Streams card details (NUMCARD and ICCID) from a CPD (Card Profile Data) file in chunks.
 
     Args:
         file_path (str): Path to the input CPD file.
+        chunk_size (int): Maximum number of rows per chunk.
 
-    Returns:
-        list: A list of tuples, where each tuple contains (current_card, next_card).
-              - current_card: (NUMCARD, ICCID) of the current row
-              - next_card: (NUMCARD, ICCID) of the next row, or None if it's the last
+    Yields:
+        tuple: (rows, progress)
+               - rows: list of (NUMCARD, ICCID) tuples in file order
+               - progress: fraction of the file read so far (0.0 - 1.0)
     """
-    
+
+    total_size = os.path.getsize(file_path) or 1
     card_data = []       # Stores extracted card details as (NUMCARD, ICCID)
     start_reading = False  # Flag to identify when to start reading data rows
 
@@ -23,43 +30,41 @@ def parse_cpd_cards(file_path):
             line = line.strip()  # Remove extra spaces/newlines from each line
 
             # Detect the header row that starts the card section
-            if line.startswith("NUMCARD;MAXCARD;DATAFILE;ICCID;IMSI"):
+            if line.startswith(CPD_HEADER_PREFIX):
                 start_reading = True   # Start reading after the header
                 header = line.split(";")  # Split header into column names
                 numcard_idx = header.index("NUMCARD")  # Find column index for NUMCARD
                 iccid_idx = header.index("ICCID")      # Find column index for ICCID
+                last_idx = max(numcard_idx, iccid_idx)
                 continue  # Skip to the next line (don't treat header as data)
 
             # Once inside card section, extract relevant values from each row
             if start_reading and line:
-                parts = line.split(";")       # Split row by semicolon
+                parts = line.split(";", last_idx + 1)  # Split row by semicolon, only as far as needed
                 numcard = parts[numcard_idx]  # Extract NUMCARD value
                 iccid = parts[iccid_idx]      # Extract ICCID value
                 card_data.append((numcard, iccid))  # Store the pair
 
-    # Build pairs of (current_card, next_card) for easier comparison/validation
-    paired_cards = []
-    for i in range(len(card_data)):
-        current = card_data[i]  # Current card details
-        next_card = card_data[i + 1] if i + 1 < len(card_data) else None  # Next card (or None if last)
-        paired_cards.append((current, next_card))
+                if len(card_data) >= chunk_size:
+                    yield card_data, f.buffer.tell() / total_size
+                    card_data = []
 
-    return paired_cards
+    yield card_data, 1.0
 
 
-def parse_txt_file(file_path):
+def iter_txt_cards(file_path, chunk_size=CHUNK_ROWS):
     """
-    Parses a simple text file where each line contains an ICCID.
+    Streams ICCIDs from a simple text file (one ICCID per line) in chunks.
 
     Args:
         file_path (str): Path to the input text file.
+        chunk_size (int): Maximum number of rows per chunk.
 
-    Returns:
-        list: A list of tuples, where each tuple contains (current_card, next_card).
-              - current_card: (None, ICCID) of the current row
-              - next_card: (None, ICCID) of the next row, or None if it's the last
+    Yields:
+        tuple: (rows, progress) where rows is a list of (None, ICCID) tuples.
     """
-    
+
+    total_size = os.path.getsize(file_path) or 1
     iccid_data = []  # Stores extracted ICCIDs
 
     # Open the text file for reading
@@ -69,36 +74,33 @@ def parse_txt_file(file_path):
             if iccid:  # Ensure the line is not empty
                 iccid_data.append((None, iccid))  # Store with None for NUMCARD
 
-    # Build pairs of (current_card, next_card)
-    paired_cards = []
-    for i in range(len(iccid_data)):
-        current = iccid_data[i]
-        next_card = iccid_data[i + 1] if i + 1 < len(iccid_data) else None
-        paired_cards.append((current, next_card))
+                if len(iccid_data) >= chunk_size:
+                    yield iccid_data, f.buffer.tell() / total_size
+                    iccid_data = []
 
-    return paired_cards
+    yield iccid_data, 1.0
 
 
-def parse_csv_file(file_path):
+def iter_csv_cards(file_path, chunk_size=CHUNK_ROWS):
     """
-    Parses a CSV file to extract card details (NUMCARD and ICCID).
+    Streams card details (NUMCARD and ICCID) from a CSV file in chunks.
 
     Args:
         file_path (str): Path to the input CSV file.
+        chunk_size (int): Maximum number of rows per chunk.
 
-    Returns:
-        list: A list of tuples, where each tuple contains (current_card, next_card).
-              - current_card: (NUMCARD, ICCID) of the current row
-              - next_card: (NUMCARD, ICCID) of the next row, or None if it's the last
+    Yields:
+        tuple: (rows, progress) where rows is a list of (NUMCARD, ICCID) tuples.
     """
-    
+
+    total_size = os.path.getsize(file_path) or 1
     card_data = []  # Stores extracted card details
 
     # Open the CSV file for reading
     with open(file_path, mode='r', encoding='utf-8', newline='') as f:
         reader = csv.reader(f)
         header = next(reader)  # Read the header row
-        
+
         # Find column indices for NUMCARD and ICCID
         try:
             numcard_idx = header.index("NUMCARD")
@@ -112,11 +114,234 @@ def parse_csv_file(file_path):
             iccid = row[iccid_idx]
             card_data.append((numcard, iccid))
 
-    # Build pairs of (current_card, next_card)
-    paired_cards = []
-    for i in range(len(card_data)):
-        current = card_data[i]
-        next_card = card_data[i + 1] if i + 1 < len(card_data) else None
-        paired_cards.append((current, next_card))
+            if len(card_data) >= chunk_size:
+                yield card_data, f.buffer.tell() / total_size
+                card_data = []
+
+    yield card_data, 1.0
+
+
+class CpdHeader:
+    """
+    Work-order metadata from the preamble of a CPD file.
+
+    The preamble is a format line (e.g. ``CPDv2``) followed by pairs of
+    lines: semicolon-separated field names (ERP_*, BATCH, QUANTITY, ...) and
+    their values. Every field is kept in ``fields``; the properties cover
+    the ones the line cares about.
+    """
+
+    def __init__(self, version=None, fields=None):
+        self.version = version
+        self.fields = fields or {}
+
+    def get(self, name, default=None):
+        value = self.fields.get(name)
+        return value if value else default
+
+    @property
+    def work_order(self):
+        return self.get("ERP_WO_NBR") or self.get("ERP_WO_ID")
+
+    @property
+    def part(self):
+        return self.get("ERP_PART") or self.get("ERP_SO_PART")
+
+    @property
+    def part_description(self):
+        return self.get("ERP_PART_DESC") or self.get("ERP_SO_PART_DESC")
+
+    @property
+    def sales_order(self):
+        return self.get("ERP_SO")
+
+    @property
+    def customer(self):
+        return self.get("ERP_CUSTOMER_NAME") or self.get("CUSTOMER")
 
-    return paired_cards
\ No newline at end of file
+    @property
+    def batch(self):
+        return self.get("BATCH")
+
+    @property
+    def quantity(self):
+        quantity = self.get("QUANTITY")
+        return int(quantity) if quantity and quantity.isdigit() else None
+
+    @property
+    def data_generation_date(self):
+        """ERP_DGR_DATE and ERP_DGR_TIME joined, e.g. '2024-12-10 03:42:06.95051'."""
+        return " ".join(part for part in (self.get("ERP_DGR_DATE"), self.get("ERP_DGR_TIME")) if part) or None
+
+    @property
+    def start_date(self):
+        return self.get("STARTDATEHOUR")
+
+    def __repr__(self):
+        return f"<CpdHeader work_order={self.work_order!r} part={self.part!r} batch={self.batch!r}>"
+
+
+class CpdData:
+    """Result of read_cpd: the parsed header plus the requested columns."""
+
+    def __init__(self, header, columns):
+        self.header = header
+        self.columns = columns  # Column name -> list of values in file order
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), []))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+
+# Per-card values; everything else repeats across a job and is worth interning
+UNIQUE_CPD_COLUMNS = frozenset(("NUMCARD", "ICCID", "IMSI", "MSISDN"))
+
+
+def _parse_preamble(lines):
+    """Build a CpdHeader from the lines before the card header row."""
+    version = None
+    if lines and ";" not in lines[0]:
+        version = lines[0]
+        lines = lines[1:]
+
+    fields = {}
+    for names_line, values_line in zip(lines[0::2], lines[1::2]):
+        fields.update(zip(names_line.split(";"), values_line.split(";")))
+    return CpdHeader(version, fields)
+
+
+def read_cpd_header(file_path):
+    """
+    Reads only the preamble of a CPD file.
+
+    Args:
+        file_path (str): Path to the input CPD file.
+
+    Returns:
+        CpdHeader: The work-order metadata found before the card section.
+    """
+    preamble = []
+    with open(file_path, mode='r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith(CPD_HEADER_PREFIX):
+                break
+            if line:
+                preamble.append(line)
+    return _parse_preamble(preamble)
+
+
+def read_cpd(file_path, columns=("NUMCARD", "ICCID"), intern=None):
+    """
+    Reads selected columns of a CPD file together with its header metadata.
+
+    Rows are split only as far as the last requested column, so asking for
+    e.g. NUMCARD, ICCID and IMSI never materialises the remaining fields.
+
+    Args:
+        file_path (str): Path to the input CPD file.
+        columns (iterable): Card section column names to load.
+        intern (iterable): Columns whose repeated values should share one
+                           string object. Defaults to every requested column
+                           except the per-card ones (NUMCARD, ICCID, IMSI, MSISDN).
+
+    Returns:
+        CpdData: ``header`` (CpdHeader) and ``columns`` (name -> list of values).
+
+    Raises:
+        ValueError: If the file has no card section or a column is missing.
+    """
+    columns = list(columns)
+    if intern is None:
+        intern = [name for name in columns if name not in UNIQUE_CPD_COLUMNS]
+    pools = {name: {} for name in intern}  # Value -> shared instance, per column
+
+    preamble = []
+    values = None
+    with open(file_path, mode='r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+
+            if values is None:
+                if line.startswith(CPD_HEADER_PREFIX):
+                    header = line.split(";")
+                    values = {name: [] for name in columns}
+                    try:
+                        projection = [(values[name], header.index(name), pools.get(name)) for name in columns]
+                    except ValueError as e:
+                        raise ValueError(f"CPD card section has no such column: {e}")
+                    last_idx = max((idx for _, idx, _ in projection), default=0)
+                elif line:
+                    preamble.append(line)
+                continue
+
+            if line:
+                parts = line.split(";", last_idx + 1)
+                for values_list, idx, pool in projection:
+                    value = parts[idx]
+                    if pool is not None:
+                        value = pool.setdefault(value, value)
+                    values_list.append(value)
+
+    if values is None:
+        raise ValueError("CPD file has no NUMCARD;MAXCARD;DATAFILE;ICCID;IMSI card section.")
+    return CpdData(_parse_preamble(preamble), values)
+
+
+def _collect(chunks):
+    sequence = CardSequence()
+    for rows, _ in chunks:
+        sequence.extend(rows)
+    return sequence
+
+
+def parse_cpd_cards(file_path, workers=1):
+    """
+    Parses a CPD (Card Profile Data) file to extract card details (NUMCARD and ICCID).
+
+    Args:
+        file_path (str): Path to the input CPD file.
+        workers (int): Number of parser processes; None uses every core. The
+                       result is identical to the serial parser.
+
+    Returns:
+        CardSequence: The (NUMCARD, ICCID) records in file order. Use
+                      ``pairs()`` for a lazy (current_card, next_card) view.
+    """
+    if workers != 1:
+        from services.parallel_parser import parse_cpd_parallel  # Imports this module
+        return parse_cpd_parallel(file_path, workers)
+    return _collect(iter_cpd_cards(file_path))
+
+
+def parse_txt_file(file_path):
+    """
+    Parses a simple text file where each line contains an ICCID.
+
+    Args:
+        file_path (str): Path to the input text file.
+
+    Returns:
+        CardSequence: The (None, ICCID) records in file order.
+    """
+    return _collect(iter_txt_cards(file_path))
+
+
+def parse_csv_file(file_path, workers=1):
+    """
+    Parses a CSV file to extract card details (NUMCARD and ICCID).
+
+    Args:
+        file_path (str): Path to the input CSV file.
+        workers (int): Number of parser processes; None uses every core. Quoted
+                       fields must not contain line breaks in parallel mode.
+
+    Returns:
+        CardSequence: The (NUMCARD, ICCID) records in file order.
+    """
+    if workers != 1:
+        from services.parallel_parser import parse_csv_parallel  # Imports this module
+        return parse_csv_parallel(file_path, workers)
+    return _collect(iter_csv_cards(file_path))
@@ -0,0 +1,266 @@
+"""
+Headless validation service, for line stations without a display:
+
+    python -m services.headless_validator JOB.CPD --port /dev/ttyUSB0 --baudrate 115200
+
+Scans are read with ComPortReader and validated on its thread by the same
+SequenceValidator rules the GUI applies. Each scan gives one JSON line on
+stdout, and its log rows, as the GUI would log them, are appended to a CSV
+log (``<job>_log.csv`` by default). Qt is never imported.
+
+The service is ready for scans as soon as the job's cards are loaded, which
+maps the sequence cache when there is one. NumPy, the resynchronisation
+index and the ICCID check are prepared meanwhile, while the reader opens the
+port: a scan of the card at the cursor is validated at once, and the first
+scan that is not waits for them. The prepared job then replaces the loaded
+one, and the heap its preparation used is handed back to the system where
+the C library allows it (glibc), so the service keeps only what validation
+needs. The preparation runs on the main thread, which otherwise only waits:
+glibc would keep a thread of its own's heap arena at its peak.
+
+Every line has an ``event``:
+
+    ready    the port is open; startup_ms is the time since the service started
+    scan     one verdict: status, position, numcard, expected, skipped, reason
+    error    the port or the job failed
+    stopped  the run ended, with the count of each status
+
+Like the GUI, a NOT OK stops reading (exit status 1) unless ``--keep-going``
+is given; errors exit with 2 and Ctrl+C with 0. The reader's diagnostics go
+to stderr. With ``--profile`` the run is profiled and a bundle is written to
+PROFILE_DIR (see services.profiling).
+"""
+import time
+
+STARTED = time.perf_counter()  # Before the imports below, which are part of the startup
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+import constants
+from logic.com_reader import ComPortReader
+from logic.file_parser import parse_file, prepare_sequence
+from services import profiling
+from services.log_store import LOG_FIELDS
+from services.sequence_validator import SequenceValidator, verdict_log_rows
+
+NOT_OK_EXIT = 1
+ERROR_EXIT = 2
+
+
+def open_log(path):
+    """
+    Open a CSV scan log for appending, writing its header if it is new.
+
+    Returns:
+        tuple: (file, index of its last row), so appended rows carry on the
+        numbering; the index is 0 for a new log.
+    """
+    last = 0
+    try:
+        with open(path, "rb") as file:
+            size = file.seek(0, os.SEEK_END)
+            file.seek(max(0, size - 4096))  # Only the tail is read, however long the log has grown
+            for line in reversed(file.read().splitlines()):
+                index = line.split(b",", 1)[0]
+                if index.isdigit():
+                    last = int(index)
+                    break
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file = open(path, "a", encoding="utf-8", newline="", buffering=1)  # Line buffered: each row reaches the file
+    if file.tell() == 0:
+        csv.writer(file).writerow(LOG_FIELDS)
+    return file, last
+
+
+def release_freed_memory():
+    """Return the heap's free pages to the system, with glibc; elsewhere nothing is done."""
+    import ctypes  # Off the startup path
+
+    try:
+        ctypes.CDLL(None).malloc_trim(0)
+    except (AttributeError, OSError, TypeError):
+        pass  # Not glibc (on Windows CDLL(None) itself fails)
+
+
+class HeadlessValidator:
+    """
+    Validates scans against one job and reports every verdict.
+
+    Args:
+        sequence (CardSequence): The job's cards.
+        log_path (str): CSV log the verdicts' rows are appended to.
+        output (file): Where the JSON lines are written.
+        window (int): Out-of-order window, as in the GUI.
+        keep_going (bool): Keep validating after a NOT OK.
+
+    Attributes:
+        validator (SequenceValidator): The validation state.
+        counts (Counter): Scans validated, per status.
+        stopped (threading.Event): Set when the run should end.
+        stop_reason (str): Why it ended: "not ok", "error" or "interrupted".
+    """
+
+    def __init__(self, sequence, log_path, output, window=0, keep_going=False):
+        self.validator = SequenceValidator(sequence, window=window)
+        self.log_path = log_path
+        self.output = output
+        self.keep_going = keep_going
+        self.counts = Counter()
+        self.stopped = threading.Event()
+        self.stop_reason = None
+        self._ready = threading.Event()
+        self._swap_lock = threading.Lock()  # The prepared job is swapped in between two scans
+        self._lock = threading.Lock()  # Lines come from the reader, preparation and main threads
+        self._log, self._log_index = open_log(log_path)
+        self._writer = csv.writer(self._log)
+
+    def prepare(self):
+        """Prepare the job's index and check (see prepare_sequence) and swap them in."""
+        try:
+            prepared = prepare_sequence(self.validator.sequence)
+        except Exception as e:
+            self.fail(f"Could not prepare the job: {e}")
+            return
+        with self._swap_lock:
+            self.validator.swap(*prepared)
+        self._ready.set()
+        del prepared
+        release_freed_memory()
+
+    def emit(self, event, **fields):
+        """Write one JSON line."""
+        line = json.dumps({"event": event, **fields})
+        with self._lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle_scan(self, scanned_code):
+        """Validate and report a scan; called on the reader thread."""
+        if self.stopped.is_set():
+            return  # Scans read after the run stopped are not validated, as in the GUI
+        validator = self.validator
+        if not self._ready.is_set() and scanned_code != validator.expected_iccid():
+            self._ready.wait()  # Anything but the expected card needs the index
+            if self.stopped.is_set():
+                return
+        with self._swap_lock:
+            verdict = validator.scan(scanned_code)
+            sequence = validator.sequence
+        now = datetime.now()
+        timestamp = now.strftime("%H:%M:%S.%f")[:-3]
+        for row in verdict_log_rows(verdict, sequence):
+            self._log_index += 1
+            self._writer.writerow((self._log_index, timestamp, *row))
+        self.counts[verdict.status] += 1
+
+        position = verdict.position
+        self.emit(
+            "scan",
+            time=now.isoformat(timespec="milliseconds"),
+            scan=scanned_code,
+            status=verdict.status,
+            position=position,
+            numcard=sequence.numcard(position) if position is not None and position < len(sequence) else None,
+            expected=verdict.expected_iccid,
+            skipped=len(verdict.skipped) if verdict.skipped else 0,
+            reason=verdict.reason,
+        )
+        if verdict.stop_reading and not self.keep_going:
+            self.stop("not ok")
+
+    def fail(self, message):
+        """Report an error and stop; the reader's error callback."""
+        self.emit("error", message=message)
+        self.stop("error")
+
+    def stop(self, reason):
+        """End the run; the first reason given is kept."""
+        with self._lock:
+            if self.stop_reason is None:
+                self.stop_reason = reason
+        self.stopped.set()
+        self._ready.set()  # A scan waiting for the index is let go, and not validated
+
+    def close(self):
+        """Close the log and report the run; call once the reader has stopped."""
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._log.close()
+        self.emit("stopped", reason=self.stop_reason, scans=sum(self.counts.values()),
+                  counts=dict(self.counts), cursor=self.validator.cursor, log=self.log_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate scans from a serial port against a job, without the GUI.")
+    parser.add_argument("job", help="The job's .cpd, .txt or .csv file.")
+    parser.add_argument("--port", required=True, help="Serial port the scanner is on, e.g. COM3 or /dev/ttyUSB0.")
+    parser.add_argument("--baudrate", type=int, default=115200, help="Baud rate (default: 115200).")
+    parser.add_argument("--log", help="CSV log to append to (default: <job>_log.csv in the current directory).")
+    parser.add_argument("--start", type=int, default=0, help="Cursor before the first scan (default: 0).")
+    parser.add_argument("--window", type=int, default=constants.OUT_OF_ORDER_WINDOW,
+                        help=f"Out-of-order window (default: {constants.OUT_OF_ORDER_WINDOW}).")
+    parser.add_argument("--keep-going", action="store_true", help="Keep validating after a NOT OK.")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the job without the sequence cache.")
+    parser.add_argument("--profile", action="store_true", default=profiling.ENABLED,
+                        help="Profile the run and write a bundle to the profile directory on exit.")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout
+    sys.stdout = sys.stderr  # The reader's diagnostics must not mix with the JSON lines
+    profiler = None
+    if args.profile:
+        profiler = profiling.Profiler(constants.PROFILE_DIR, "headless")
+        profiler.start()
+    try:
+        return _validate(args, output)
+    finally:
+        sys.stdout = output
+        if profiler is not None:
+            path = profiler.write({"job": args.job, "port": args.port})
+            profiler.stop()
+            print(constants.MSG_PROFILE_WRITTEN.format(path=path), file=sys.stderr)
+
+
+def _validate(args, output):
+    try:
+        sequence = parse_file(args.job, use_cache=not args.no_cache)
+    except (OSError, ValueError) as e:
+        output.write(json.dumps({"event": "error", "message": f"Could not load {args.job}: {e}"}) + "\n")
+        return ERROR_EXIT
+    log_path = args.log or f"{os.path.splitext(os.path.basename(args.job))[0]}_log.csv"
+    service = HeadlessValidator(sequence, log_path, output, window=args.window, keep_going=args.keep_going)
+    service.validator.seek(args.start)
+    cards = len(sequence)
+    del sequence  # Once the prepared job is swapped in, the loaded one (and its cache mapping) can go
+
+    def opened():
+        service.emit("ready", job=args.job, cards=cards, port=args.port, baudrate=args.baudrate,
+                     log=log_path, startup_ms=round((time.perf_counter() - STARTED) * 1e3, 1))
+
+    reader = ComPortReader(args.port, args.baudrate, callback=service.handle_scan,
+                           error_callback=service.fail, opened_callback=opened)
+    reader.start_reading()
+    try:
+        service.prepare()
+        while not service.stopped.wait(0.5):  # Timed, so Ctrl+C is handled on every platform
+            pass
+    except KeyboardInterrupt:
+        service.stop("interrupted")
+    reader.stop_reading()
+    service.close()
+    return {"not ok": NOT_OK_EXIT, "error": ERROR_EXIT}.get(service.stop_reason, 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Structural checks on ICCIDs, to reject malformed reads before validation.
+
+A garbage or partial read that reaches the validator is a NOT OK scan: it
+triggers a resynchronisation search and stops the reader. IccidCheck
+recognises most of them from their shape alone, with the rules a loaded job
+itself follows:
+
+- length: every ICCID in the job has the same length
+- digits: every ICCID is ASCII digits only
+- prefix: the issuer prefix the job's ICCIDs share
+- luhn: every ICCID ends in a valid Luhn check digit
+
+A rule the job itself breaks is left out, so a real card from the job is
+never rejected. Lengths are counted in UTF-8 bytes, as in SequenceIndex.
+"""
+import numpy as np
+
+import constants
+
+REASON_LENGTH = "wrong length"
+REASON_DIGITS = "not all digits"
+REASON_PREFIX = "wrong issuer prefix"
+REASON_LUHN = "bad check digit"
+
+_DOUBLED = bytes.maketrans(b"0123456789", b"0246813579")  # Digit -> digit sum of twice the digit
+# Byte -> packed counters for the vectorised checks. Each byte contributes to one
+# 13-bit field of a float64 (exact up to 2**53): its digit value, the digit sum of
+# twice its value (for Luhn), 1 if it is neither a digit nor NUL, and 1 if NUL.
+# Summing a record's bytes with one matrix product then yields all four totals
+# (exact for records up to 1800 bytes).
+_FIELD_BITS = 13
+_FIELD_MASK = (1 << _FIELD_BITS) - 1
+_BYTE_COUNTERS = np.full(256, float(1 << 2 * _FIELD_BITS))
+_BYTE_COUNTERS[48:58] = np.arange(10) + np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9]) * float(1 << _FIELD_BITS)
+_BYTE_COUNTERS[0] = float(1 << 3 * _FIELD_BITS)
+_BLOCK = 1 << 16  # Records per block in the vectorised checks
+
+
+def luhn_valid(digits):
+    """Return True if ``digits`` (ASCII digit bytes) ends in a valid Luhn check digit."""
+    return (sum(digits[-1::-2] + digits[-2::-2].translate(_DOUBLED)) - 48 * len(digits)) % 10 == 0
+
+
+def luhn_check_digit(body):
+    """Return the Luhn check digit (0-9) that completes ``body`` (ASCII digit bytes)."""
+    return -(sum(body[-1::-2].translate(_DOUBLED) + body[-2::-2]) - 48 * len(body)) % 10
+
+
+def record_checks(block, width):
+    """
+    Vectorised checks over fixed-width NUL-padded records, such as
+    CardSequence.iccid_records() returns.
+
+    Args:
+        block (bytes): The packed records.
+        width (int): Bytes per record.
+
+    Returns:
+        tuple: (lengths, digits, luhn) arrays: each record's length, whether
+               it is all ASCII digits, and whether it is digits with a valid
+               Luhn check digit.
+    """
+    count = len(block) // width if width else 0
+    lengths = np.empty(count, dtype=np.int64)
+    digits = np.empty(count, dtype=bool)
+    luhn = np.empty(count, dtype=bool)
+    if not count:
+        return lengths, digits, luhn
+
+    rows = np.frombuffer(block, dtype=np.uint8).reshape(count, width)
+    parity = np.zeros((width, 2))  # Sums even and odd columns separately
+    parity[0::2, 0] = 1
+    parity[1::2, 1] = 1
+    for start in range(0, count, _BLOCK):
+        part = rows[start:start + _BLOCK]
+        part_lengths = np.char.str_len(part.view(f"S{width}").ravel())
+        sums = (_BYTE_COUNTERS[part] @ parity).astype(np.int64)
+        even, odd = sums[:, 0], sums[:, 1]
+        other = (sums[:, 0] + sums[:, 1]) >> 2 * _FIELD_BITS
+        padding = other >> _FIELD_BITS
+        other &= _FIELD_MASK
+        # All digits: no other bytes, and no NULs before the trailing padding
+        part_digits = (other == 0) & (padding == width - part_lengths) & (part_lengths > 0)
+
+        # Luhn doubles every second digit from the right: the even columns of an
+        # even-length record, the odd columns of an odd-length one
+        total = np.where(part_lengths % 2 == 0,
+                         (even >> _FIELD_BITS & _FIELD_MASK) + (odd & _FIELD_MASK),
+                         (even & _FIELD_MASK) + (odd >> _FIELD_BITS & _FIELD_MASK))
+
+        lengths[start:start + len(part)] = part_lengths
+        digits[start:start + len(part)] = part_digits
+        luhn[start:start + len(part)] = part_digits & (total % 10 == 0)
+    return lengths, digits, luhn
+
+
+class IccidCheck:
+    """
+    Length, digit, issuer prefix and Luhn checks for scanned codes.
+
+    Args:
+        length (int): Required length in bytes, or None for any.
+        prefix (str): Required issuer prefix, or "" for any.
+        digits (bool): Require ASCII digits only.
+        luhn (bool): Require a valid Luhn check digit. Implies ``digits``.
+    """
+
+    __slots__ = ("length", "prefix", "digits", "luhn")
+
+    def __init__(self, length=None, prefix="", digits=True, luhn=True):
+        self.length = length
+        self.prefix = prefix.encode("utf-8")
+        self.digits = digits or luhn
+        self.luhn = luhn
+
+    @classmethod
+    def from_sequence(cls, sequence, prefix_length=constants.ICCID_PREFIX_LENGTH):
+        """
+        Return the strictest check every ICCID in ``sequence`` passes, or
+        None for an empty sequence or one that leaves nothing to check.
+        """
+        if not len(sequence):
+            return None
+        block, width = sequence.iccid_records()
+        lengths, digits, luhn = record_checks(block, width)
+
+        length = int(lengths[0]) if (lengths == lengths[0]).all() else None
+
+        # Common prefix: leading columns where every record matches the first
+        rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, width)[:, :min(prefix_length, int(lengths.min()))]
+        differs = (rows != rows[0]).any(axis=0)
+        shared = int(np.argmax(differs)) if differs.any() else rows.shape[1]
+        prefix = bytes(rows[0, :shared]).decode("utf-8", "ignore")
+
+        check = cls(length, prefix, digits=bool(digits.all()), luhn=bool(luhn.all()))
+        if check.length is None and not check.prefix and not check.digits:
+            return None
+        return check
+
+    def reject_reason(self, scanned_code):
+        """Return why ``scanned_code`` cannot be an ICCID of the job, or None if it may be one."""
+        data = scanned_code.encode("utf-8", "replace")
+        if self.length is not None and len(data) != self.length:
+            return REASON_LENGTH
+        if self.digits and not data.isdigit():
+            return REASON_DIGITS
+        if not data.startswith(self.prefix):
+            return REASON_PREFIX
+        if self.luhn and (sum(data[-1::-2] + data[-2::-2].translate(_DOUBLED)) - 48 * len(data)) % 10:
+            return REASON_LUHN
+        return None
+
+    def reject_mask(self, block, width):
+        """Vectorised reject_reason(): True for each fixed-width record the check rejects."""
+        lengths, digits, luhn = record_checks(block, width)
+        rejected = np.zeros(len(lengths), dtype=bool)
+        if self.length is not None:
+            rejected |= lengths != self.length
+        if self.digits:
+            rejected |= ~digits
+        if self.prefix:
+            size = len(self.prefix)
+            if size > width:
+                rejected[:] = True
+            else:
+                rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, width)[:, :size]
+                rejected |= (rows != np.frombuffer(self.prefix, dtype=np.uint8)).any(axis=1)
+        if self.luhn:
+            rejected |= ~luhn
+        return rejected
+
+    def __repr__(self):
+        return (f"IccidCheck(length={self.length}, prefix={self.prefix.decode('utf-8')!r}, "
+                f"digits={self.digits}, luhn={self.luhn})")
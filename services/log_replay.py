@@ -0,0 +1,436 @@
+"""
+Offline replay of scan logs against an expected card sequence.
+
+A replay re-runs the SequenceValidator rules over a whole list of scans
+using NumPy instead of one Python call per scan. When every ICCID in the
+job has the same length L and a scan is L bytes long, "similar" reduces to
+"equal", so the only card a scan can land on is its exact position p (found
+with a sorted lookup). The cursor then follows
+
+    c[k + 1] = max(c[k], p[k]) + 1
+
+(p = -1 when the scan is not in the job), which is a running maximum of
+p[k] - k, and each verdict follows from comparing p[k] with c[k]:
+equal is OK, greater is JUMPED, anything else NOT OK (or END past the last
+card). Scans this shortcut cannot decide (other lengths, ICCIDs that occur
+more than once, jobs with mixed ICCID lengths, reads an IccidCheck
+rejects, and repeats of an earlier scan, which may be DUPLICATEs) are
+validated one at a time by SequenceValidator, from the cursor and seen
+cards the vectorised part arrived at, so the result is always the one the
+GUI would have produced. With an out-of-order window each verdict depends
+on the cards still pending, so every scan is validated one at a time.
+
+    python -m services.log_replay JOB.CPD logs_20250101_080000.csv
+
+With ``--profile`` the replay is profiled and a bundle is written to
+PROFILE_DIR (see services.profiling).
+"""
+import argparse
+import csv
+import os
+import sys
+import heapq
+import time
+
+import numpy as np
+
+import constants
+from services import profiling, sequence_validator
+from services.iccid_check import IccidCheck
+from services.sequence_index import SequenceIndex
+from services.sequence_validator import SequenceValidator, ScanVerdict, verdict_log_rows
+
+# Status codes used in ReplayResult.status, indexing STATUSES
+STATUSES = (
+    sequence_validator.OK,
+    sequence_validator.NOT_OK,
+    sequence_validator.JUMPED,
+    sequence_validator.REJECTED,
+    sequence_validator.DUPLICATE,
+    sequence_validator.OUT_OF_ORDER,
+    sequence_validator.END,
+    sequence_validator.NO_SEQUENCE,
+)
+_CODES = {status: code for code, status in enumerate(STATUSES)}
+(OK_CODE, NOT_OK_CODE, JUMPED_CODE, REJECTED_CODE, DUPLICATE_CODE, OUT_OF_ORDER_CODE, END_CODE,
+ NO_SEQUENCE_CODE) = range(len(STATUSES))
+
+# How each verdict appears in the status column of an exported log
+_LOG_STATUSES = np.array(["OK", "NOT OK", "JUMPED", "REJECTED", "DUPLICATE", "OUT OF ORDER", "N/A", "N/A"])
+
+
+class ScanLog:
+    """
+    Scans read back from an exported log.
+
+    Attributes:
+        scans (list): Scanned codes in arrival order, one per scan.
+        statuses (numpy.ndarray): Recorded status of each scan: OK, NOT OK,
+                                  JUMPED, REJECTED, DUPLICATE, OUT OF ORDER
+                                  or N/A. None for plain scan lists.
+    """
+
+    def __init__(self, scans, statuses=None):
+        self.scans = scans
+        self.statuses = statuses
+
+    def __len__(self):
+        return len(self.scans)
+
+
+def read_scan_log(file_path):
+    """
+    Reads the scans from a log written by "Download Logs", or from a plain
+    text file with one scanned code per line.
+
+    A log holds one row per scan plus, for a jump, one MISSING/SKIPPED row
+    per skipped card and a second OK row for the scan itself. Those extra
+    rows are dropped, and the scan's first row is reported as JUMPED. With
+    an out-of-order window a jump may skip no card (the cards it passed were
+    accepted out of order already), so its NOT OK row is followed directly
+    by the OK row: a NOT OK row and an OK row for the same scan cannot come
+    from two scans, since a scan that was NOT OK is a DUPLICATE the next
+    time. An OUT OF ORDER row may be followed by SKIPPED rows too, but not
+    by a second row.
+
+    Args:
+        file_path (str): Path to the log.
+
+    Returns:
+        ScanLog: The scans and, for exported logs, their recorded statuses.
+    """
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        first_line = f.readline()
+        if 'scanned_code' not in first_line.split(','):
+            lines = [first_line] + f.readlines()
+            return ScanLog([line.rstrip('\r\n') for line in lines if line.strip()])
+
+        f.seek(0)
+        reader = csv.DictReader(f)
+        scanned = []
+        recorded = []
+        for row in reader:
+            scanned.append(row['scanned_code'])
+            recorded.append(row['status'])
+
+    recorded = np.array(recorded, dtype=object)
+    skipped = recorded == "SKIPPED"
+    # The second row of a jump repeats the scan of the NOT OK row before its SKIPPED rows, if any
+    rows = np.arange(len(recorded))
+    last_kept = np.maximum.accumulate(np.where(skipped, -1, rows)) if len(rows) else rows
+    jump_start = np.concatenate(([-1], last_kept[:-1])).astype(np.int64)
+    scanned_codes = np.array(scanned, dtype=object)
+    second_row = ~skipped & (recorded == "OK") & (jump_start >= 0)
+    second_row[second_row] &= recorded[jump_start[second_row]] == "NOT OK"
+    second_row[second_row] &= scanned_codes[jump_start[second_row]] == scanned_codes[second_row]
+    jumped = np.zeros(len(recorded), dtype=bool)
+    jumped[jump_start[second_row]] = True
+    keep = ~skipped & ~second_row
+
+    statuses = np.where(jumped, "JUMPED", recorded)[keep].astype(str)
+    scans = [scanned[i] for i in np.flatnonzero(keep)]
+    return ScanLog(scans, statuses)
+
+
+class ReplayResult:
+    """
+    Verdicts of a replayed scan list, one array entry per scan.
+
+    Attributes:
+        scans (list): The replayed scans.
+        sequence (CardSequence): The expected cards.
+        check (IccidCheck): The check malformed reads were rejected with, or None.
+        status (numpy.ndarray): Status codes, indexes into STATUSES.
+        cursor (numpy.ndarray): Position expected when each scan arrived.
+        position (numpy.ndarray): Position each scan was validated at: the
+                                  matched card for JUMPED, else the cursor.
+        final_cursor (int): Cursor after the last scan.
+        skipped (dict): Scan index -> positions it skipped, for replays with
+                        an out-of-order window. None when JUMPED scans skip
+                        every card from the cursor to their position.
+    """
+
+    def __init__(self, scans, sequence, check, status, cursor, position, final_cursor, skipped=None):
+        self.scans = scans
+        self.sequence = sequence
+        self.check = check
+        self.status = status
+        self.cursor = cursor
+        self.position = position
+        self.final_cursor = final_cursor
+        self.skipped = skipped
+
+    def __len__(self):
+        return len(self.scans)
+
+    def counts(self):
+        """Return {status: count}, with SKIPPED counting the cards jumped over."""
+        totals = np.bincount(self.status, minlength=len(STATUSES))
+        counts = {status: int(total) for status, total in zip(STATUSES, totals)}
+        if self.skipped is not None:
+            counts["SKIPPED"] = sum(map(len, self.skipped.values()))
+        else:
+            jumped = self.status == JUMPED_CODE
+            counts["SKIPPED"] = int((self.position[jumped] - self.cursor[jumped]).sum())
+        return counts
+
+    def log_statuses(self):
+        """Return each scan's status as an exported log records it."""
+        return _LOG_STATUSES[self.status]
+
+    def disagreements(self, recorded):
+        """Return the indices of scans whose recorded status differs from the replay."""
+        return np.flatnonzero(self.log_statuses() != np.asarray(recorded))
+
+    def verdicts(self):
+        """Yield a ScanVerdict per scan, as SequenceValidator.scan would have returned."""
+        length = len(self.sequence)
+        for k, (scan, code, cursor, position) in enumerate(zip(self.scans, self.status.tolist(),
+                                                               self.cursor.tolist(), self.position.tolist())):
+            expected = self.sequence.iccid(cursor) if cursor < length else None
+            if self.skipped is not None:
+                skipped = self.skipped.get(k)
+            else:
+                skipped = range(cursor, position) if code == JUMPED_CODE else None
+            reason = self.check.reject_reason(scan) if code == REJECTED_CODE else None
+            yield ScanVerdict(STATUSES[code], scan, position, expected, skipped, reason)
+
+    def log_rows(self):
+        """
+        Yield (scanned_code, expected_code, status) rows the way the GUI logs
+        them: a jump is a NOT OK row, a SKIPPED row per missing card and an
+        OK row for the card the scan landed on. A scan accepted out of order
+        is followed by a SKIPPED row per card that fell out of the window.
+        """
+        for verdict in self.verdicts():
+            yield from verdict_log_rows(verdict, self.sequence)
+
+
+def replay(sequence, scans, start=0, index=None, check=None, window=0):
+    """
+    Validates a list of scans against a sequence in one pass.
+
+    Args:
+        sequence (CardSequence): The expected cards.
+        scans (list): Scanned codes in arrival order.
+        start (int): Cursor before the first scan (the "Set Start Card" position).
+        index (SequenceIndex): Index over ``sequence`` for scans that need a
+                               similarity search. Built on demand if omitted.
+        check (IccidCheck): Reject malformed reads as the GUI does, or None.
+        window (int): Out-of-order window the scans were validated with.
+
+    Returns:
+        ReplayResult: One verdict per scan.
+    """
+    count = len(scans)
+    length = len(sequence)
+    status = np.empty(count, dtype=np.int8)
+    cursor = np.empty(count, dtype=np.int64)
+    position = np.empty(count, dtype=np.int64)
+
+    if length == 0:
+        cursor[:] = np.arange(start, start + count)
+        position[:] = cursor
+        status[:] = NO_SEQUENCE_CODE
+        return ReplayResult(scans, sequence, check, status, cursor, position, start + count)
+
+    if window:
+        validator = SequenceValidator(sequence, index if index is not None else SequenceIndex(sequence), check, window)
+        validator.seek(start)
+        skipped = {}
+        for k, scan in enumerate(scans):
+            cursor[k] = validator.cursor
+            verdict = validator.scan(scan)
+            status[k] = _CODES[verdict.status]
+            position[k] = verdict.position
+            if verdict.skipped is not None:
+                skipped[k] = verdict.skipped
+        return ReplayResult(scans, sequence, check, status, cursor, position, validator.cursor, skipped)
+
+    exact, regular = _exact_positions(sequence, scans, check)
+
+    validator = None
+    c = start
+    segment_start = 0
+    pending = np.flatnonzero(~regular).tolist()[::-1]  # Scans for the validator, next one last
+    landed_on = []  # Heap of scans whose card a validated scan jumped to by similarity
+    by_position = None
+    while True:
+        k = pending[-1] if pending else count
+        if landed_on and landed_on[0] < k:
+            k = landed_on[0]
+        if k > segment_start:
+            c = _replay_segment(exact[segment_start:k], c, length, status[segment_start:k],
+                                cursor[segment_start:k], position[segment_start:k])
+        if k == count:
+            break
+        if pending and pending[-1] == k:
+            pending.pop()
+        while landed_on and landed_on[0] == k:
+            heapq.heappop(landed_on)
+
+        if validator is None:
+            validator = SequenceValidator(sequence, index if index is not None else SequenceIndex(sequence), check)
+        _mark_seen(validator.seen, scans, segment_start, exact[segment_start:k], status[segment_start:k],
+                   position[segment_start:k])
+        validator.seek(c)
+        verdict = validator.scan(scans[k])
+        status[k] = _CODES[verdict.status]
+        cursor[k] = c
+        position[k] = verdict.position
+        c = validator.cursor
+        segment_start = k + 1
+
+        if verdict.status == sequence_validator.JUMPED:
+            # Later scans of the card jumped to are duplicates now, which their exact positions cannot tell
+            if by_position is None:
+                by_position = np.argsort(exact, kind="stable")
+            lo, hi = exact[by_position].searchsorted([verdict.position, verdict.position + 1])
+            for later in by_position[lo:hi].tolist():
+                if later > k:
+                    heapq.heappush(landed_on, later)
+
+    return ReplayResult(scans, sequence, check, status, cursor, position, c)
+
+
+def _exact_positions(sequence, scans, check):
+    """
+    Return (positions, regular): the position of each scan in the sequence
+    (-1 if absent), and whether that position alone decides its verdict.
+    """
+    count = len(scans)
+    block, width = sequence.iccid_records(0, len(sequence))
+    expected = np.frombuffer(block, dtype=f"S{width}")
+    lengths = np.char.str_len(expected)
+    iccid_length = int(lengths[0])
+    if iccid_length == 0 or (lengths != iccid_length).any():
+        # Mixed lengths: a scan can be similar to cards it does not equal
+        return np.full(count, -1, dtype=np.int64), np.zeros(count, dtype=bool)
+
+    joined = "\0".join(scans)
+    if joined.count("\0") == count - 1:
+        # No NULs in the scans: one C-level encode, and numpy's string lengths are exact
+        keys = np.array(joined.encode("utf-8").split(b"\0"), dtype=f"S{iccid_length + 1}")
+        regular = np.char.str_len(keys) == iccid_length
+    else:
+        encoded = [scan.encode("utf-8") for scan in scans]
+        keys = np.array(encoded, dtype=f"S{iccid_length + 1}")
+        regular = np.fromiter(map(len, encoded), dtype=np.int64, count=count) == iccid_length
+        regular &= np.char.str_len(keys) == iccid_length
+    if check is not None:
+        regular &= ~check.reject_mask(keys.tobytes(), keys.itemsize)
+
+    order = np.argsort(expected, kind="stable")
+    ordered = expected[order]
+    repeated = np.zeros(len(ordered), dtype=bool)  # ICCIDs that occur more than once
+    repeated[1:] = ordered[1:] == ordered[:-1]
+    repeated[:-1] |= repeated[1:]
+
+    slots = np.minimum(ordered.searchsorted(keys), len(ordered) - 1)
+    found = ordered[slots] == keys
+    regular &= ~(found & repeated[slots])  # A repeated ICCID's next occurrence depends on the cursor
+    positions = np.where(found, order[slots], -1).astype(np.int64)
+
+    # A repeat of an earlier scan may be a DUPLICATE, depending on what was seen in between
+    in_job = np.flatnonzero(found)
+    by_position = in_job[np.argsort(positions[in_job], kind="stable")]
+    sorted_positions = positions[by_position]
+    regular[by_position[1:][sorted_positions[1:] == sorted_positions[:-1]]] = False
+    off_list = np.flatnonzero(~found)
+    repeats = np.ones(len(off_list), dtype=bool)
+    repeats[np.unique(keys[off_list], return_index=True)[1]] = False
+    regular[off_list[repeats]] = False
+    return positions, regular
+
+
+def _mark_seen(seen, scans, start, exact, status, position):
+    """Record the cards a replayed segment saw, as SequenceValidator would have."""
+    landed = (status == OK_CODE) | (status == JUMPED_CODE)
+    seen.add_many(position[landed])
+    not_ok = status == NOT_OK_CODE
+    seen.add_many(exact[not_ok & (exact >= 0)])  # Cards behind the cursor
+    seen.off_list.update(scans[start + i] for i in np.flatnonzero(not_ok & (exact < 0)).tolist())
+
+
+def _replay_segment(exact, c, length, status, cursor, position):
+    """Fill in verdicts for scans decided by their exact positions; returns the cursor after them."""
+    steps = np.arange(len(exact))
+    lead = np.empty(len(exact), dtype=np.int64)  # cursor - k, a running maximum
+    lead[0] = c
+    lead[1:] = exact[:-1] - steps[:-1]
+    np.maximum.accumulate(lead, out=lead)
+    cursor[:] = lead + steps
+
+    status[:] = NOT_OK_CODE
+    status[cursor >= length] = END_CODE
+    status[exact == cursor] = OK_CODE
+    jumped = exact > cursor
+    status[jumped] = JUMPED_CODE
+    position[:] = np.where(jumped, exact, cursor)
+    return int(max(cursor[-1], exact[-1])) + 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay exported scan logs against a card file.")
+    parser.add_argument("job", help="Expected cards (.cpd, .txt or .csv).")
+    parser.add_argument("logs", nargs="+", help="Logs from Download Logs, or files with one scan per line.")
+    parser.add_argument("--start", type=int, default=0, help="Cursor before the first scan (default: 0).")
+    parser.add_argument("--no-check", action="store_true", help="Do not reject malformed reads (logs from before the check).")
+    parser.add_argument("--window", type=int, default=constants.OUT_OF_ORDER_WINDOW,
+                        help=f"Out-of-order window the line ran with (default: {constants.OUT_OF_ORDER_WINDOW}).")
+    parser.add_argument("--output", help="Write the replayed log rows of the (single) log to this CSV.")
+    parser.add_argument("--profile", action="store_true", default=profiling.ENABLED,
+                        help="Profile the replay and write a bundle to the profiles directory.")
+    args = parser.parse_args(argv)
+    if args.output and len(args.logs) > 1:
+        parser.error("--output takes a single log")
+
+    profiler = None
+    if args.profile:
+        profiler = profiling.Profiler(constants.PROFILE_DIR, "log_replay")
+        profiler.start()
+    scans = 0
+    try:
+        scans = _replay_logs(args)
+    finally:
+        if profiler is not None:
+            path = profiler.write({"job": args.job, "logs": args.logs, "scans": scans})
+            profiler.stop()
+            print(constants.MSG_PROFILE_WRITTEN.format(path=path))
+    return 0
+
+
+def _replay_logs(args):
+    """Replay and report each log of the command line; returns the scans replayed."""
+    from logic.file_parser import parse_file
+
+    sequence = parse_file(args.job)
+    check = None if args.no_check else IccidCheck.from_sequence(sequence)
+    print(f"{args.job}: {len(sequence)} cards, {check}")
+    scans = 0
+    for log_path in args.logs:
+        log = read_scan_log(log_path)
+        scans += len(log)
+        started = time.perf_counter()
+        result = replay(sequence, log.scans, args.start, check=check, window=args.window)
+        elapsed = time.perf_counter() - started
+
+        counts = ", ".join(f"{status} {total}" for status, total in result.counts().items() if total)
+        print(f"{os.path.basename(log_path)}: {len(log)} scans in {elapsed:.3f} s - {counts or 'no scans'}")
+        if log.statuses is not None:
+            differing = result.disagreements(log.statuses)
+            print(f"  {len(differing)} scans recorded differently from the replay")
+            for i in differing[:20].tolist():
+                print(f"    scan {i + 1}: {log.scans[i]!r} recorded {log.statuses[i]}, replayed {result.log_statuses()[i]}")
+
+        if args.output:
+            with open(args.output, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(['index', 'scanned_code', 'expected_code', 'status'])
+                for row_index, row in enumerate(result.log_rows(), 1):
+                    writer.writerow((row_index,) + row)
+    return scans
+
+
+if __name__ == "__main__":
+    sys.exit(main())
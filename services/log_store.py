@@ -0,0 +1,159 @@
+"""
+Append-only, columnar store for the scan log.
+
+The log used to be a list with one dict of five strings per row, which
+costs several hundred bytes a row and keeps growing for the whole session.
+LogStore keeps each column in one array instead:
+
+- timestamps as milliseconds since midnight (4 bytes)
+- scanned and expected codes as UTF-8 bytes packed back to back in one
+  buffer per column, with a 4-byte end offset per row
+- statuses as a 1-byte code into a table of interned status strings
+
+A row of two ICCIDs costs about 50 bytes. With a ``limit`` only the most
+recent rows are kept (the full log is in the AuditJournal), so memory
+stays bounded for the whole shift. The row number (the log's "index") is
+not stored; it is derived from the row's position and ``first``.
+"""
+from array import array
+
+LOG_FIELDS = ["index", "timestamp", "scanned_code", "expected_code", "status"]
+
+
+class _TextColumn:
+    """Variable-length strings stored back to back in one buffer."""
+
+    __slots__ = ("data", "ends")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("I")  # End offset of each row in ``data``
+
+    def append(self, value):
+        self.data += value.encode("utf-8")
+        self.ends.append(len(self.data))
+
+    def get(self, row):
+        start = self.ends[row - 1] if row else 0
+        return self.data[start:self.ends[row]].decode("utf-8")
+
+    def nbytes(self):
+        return len(self.data) + self.ends.itemsize * len(self.ends)
+
+    def drop(self, count):
+        """Remove the first ``count`` strings."""
+        import numpy as np  # Only needed once a bounded store trims; kept off the GUI's startup path
+        cut = self.ends[count - 1]
+        del self.data[:cut]
+        ends = array("I")
+        ends.frombytes((np.frombuffer(self.ends, dtype=np.uint32)[count:] - np.uint32(cut)).tobytes())
+        self.ends = ends
+
+
+class LogStore:
+    """
+    The scan log's rows, one array per column.
+
+    Rows are appended and never changed. ``len()`` is the number of rows
+    held; indexing and iterating give them as dicts keyed by LOG_FIELDS (the
+    CSV columns), built on demand.
+
+    Args:
+        limit (int): Most rows kept, or None to keep them all. Older rows are
+                     dropped a batch at a time once the store is an eighth
+                     over the limit.
+
+    Attributes:
+        first (int): Number of rows dropped so far; row ``i`` is log row
+                     ``first + i + 1``.
+    """
+
+    __slots__ = ("limit", "first", "_times", "_scanned", "_expected", "_status", "_status_codes", "statuses")
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.clear()
+
+    def clear(self, first=0):
+        """Drop every row; the next one appended is log row ``first + 1``."""
+        self.first = first
+        self._times = array("I")
+        self._scanned = _TextColumn()
+        self._expected = _TextColumn()
+        self._status = array("B")
+        self._status_codes = {}  # Status string -> code
+        self.statuses = []  # Code -> status string
+
+    def append(self, timestamp, scanned_code, expected_code, status):
+        """
+        Add a row.
+
+        Args:
+            timestamp (str): Time of the scan as "HH:MM:SS.mmm".
+            scanned_code (str): The scan as received, or "MISSING".
+            expected_code (str): What was expected, or a placeholder such as "N/A".
+            status (str): The row's status.
+
+        Returns:
+            int: The row's position.
+        """
+        code = self._status_codes.get(status)
+        if code is None:
+            code = self._status_codes[status] = len(self.statuses)
+            self.statuses.append(status)
+        self._times.append(int(timestamp[0:2]) * 3600000 + int(timestamp[3:5]) * 60000
+                           + int(timestamp[6:8]) * 1000 + int(timestamp[9:12]))
+        self._scanned.append(scanned_code)
+        self._expected.append(expected_code)
+        self._status.append(code)
+        if self.limit is not None and len(self._status) > self.limit + max(1, self.limit >> 3):
+            self._drop(len(self._status) - self.limit)
+        return len(self._status) - 1
+
+    def _drop(self, count):
+        del self._times[:count]
+        del self._status[:count]
+        self._scanned.drop(count)
+        self._expected.drop(count)
+        self.first += count
+
+    def timestamp(self, row):
+        ms = self._times[row]
+        return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+    def scanned_code(self, row):
+        return self._scanned.get(row)
+
+    def expected_code(self, row):
+        return self._expected.get(row)
+
+    def status(self, row):
+        return self.statuses[self._status[row]]
+
+    def row(self, row):
+        """The row as a dict keyed by LOG_FIELDS."""
+        return {"index": self.first + row + 1, "timestamp": self.timestamp(row), "scanned_code": self._scanned.get(row),
+                "expected_code": self._expected.get(row), "status": self.status(row)}
+
+    def __len__(self):
+        return len(self._status)
+
+    def __getitem__(self, row):
+        count = len(self._status)
+        if row < 0:
+            row += count
+        if not 0 <= row < count:
+            raise IndexError("log row out of range")
+        return self.row(row)
+
+    def __iter__(self):
+        for row in range(len(self._status)):
+            yield self.row(row)
+
+    def nbytes(self):
+        """Bytes held by the columns."""
+        return (self._times.itemsize * len(self._times) + self._scanned.nbytes() + self._expected.nbytes()
+                + len(self._status))
+
+    def __repr__(self):
+        return f"LogStore({len(self)} rows after {self.first} dropped, {self.nbytes()} bytes)"
@@ -0,0 +1,140 @@
+"""
+Multi-process parsing of very large CPD and CSV files.
+
+The data section (everything after the header row) is split into
+newline-aligned byte ranges. Each range is parsed in a worker process that
+extracts only NUMCARD and ICCID and sends them back as packed records, which
+are appended to one CardSequence in file order. Line handling mirrors the
+serial parsers in services.file_service, so both produce the same sequence.
+"""
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from services.card_sequence import CardSequence, ICCID_WIDTH, NUMCARD_WIDTH
+from services.file_service import CPD_HEADER_PREFIX
+
+RANGES_PER_WORKER = 4          # More ranges than workers evens out uneven rows
+MIN_RANGE_BYTES = 1 << 20      # Do not bother splitting below 1 MiB per range
+
+
+def parse_cpd_parallel(file_path, workers=None):
+    """
+    Parses a CPD file's NUMCARD and ICCID columns using several processes.
+
+    Args:
+        file_path (str): Path to the input CPD file.
+        workers (int): Number of worker processes; defaults to the CPU count.
+
+    Returns:
+        CardSequence: The same records parse_cpd_cards returns.
+    """
+    offset = 0
+    header = None
+    with open(file_path, "rb") as f:
+        for raw_line in f:
+            offset += len(raw_line)
+            line = raw_line.decode("utf-8").strip()
+            if line.startswith(CPD_HEADER_PREFIX):
+                header = line.split(";")
+                break
+
+    if header is None:
+        return CardSequence()  # No card section, as with the serial parser
+    return _parse_ranges(file_path, offset, "cpd", header.index("NUMCARD"), header.index("ICCID"), workers)
+
+
+def parse_csv_parallel(file_path, workers=None):
+    """
+    Parses a CSV file's NUMCARD and ICCID columns using several processes.
+
+    Quoted fields must not contain line breaks, since ranges are split on
+    newlines.
+
+    Args:
+        file_path (str): Path to the input CSV file.
+        workers (int): Number of worker processes; defaults to the CPU count.
+
+    Returns:
+        CardSequence: The same records parse_csv_file returns.
+    """
+    with open(file_path, "rb") as f:
+        header_line = f.readline()
+    header = next(csv.reader([header_line.decode("utf-8")]))
+
+    try:
+        numcard_idx = header.index("NUMCARD")
+        iccid_idx = header.index("ICCID")
+    except ValueError:
+        raise ValueError("CSV file must contain 'NUMCARD' and 'ICCID' columns.")
+    return _parse_ranges(file_path, len(header_line), "csv", numcard_idx, iccid_idx, workers)
+
+
+def split_ranges(file_path, start, parts):
+    """Split [start, EOF) into at most ``parts`` byte ranges that each end on a newline."""
+    size = os.path.getsize(file_path)
+    parts = max(1, min(parts, (size - start) // MIN_RANGE_BYTES))
+    bounds = [start]
+    with open(file_path, "rb") as f:
+        for k in range(1, parts):
+            f.seek(start + (size - start) * k // parts)
+            f.readline()  # Move to the start of the next line
+            position = f.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_ranges(file_path, start, kind, numcard_idx, iccid_idx, workers):
+    workers = workers or os.cpu_count() or 1
+    tasks = [
+        (file_path, range_start, range_end, kind, numcard_idx, iccid_idx)
+        for range_start, range_end in split_ranges(file_path, start, workers * RANGES_PER_WORKER)
+    ]
+
+    sequence = CardSequence()
+    if workers == 1 or len(tasks) == 1:
+        for result in map(_parse_range, tasks):
+            sequence.extend_packed(*result)
+        return sequence
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(_parse_range, tasks):  # map() keeps file order
+            sequence.extend_packed(*result)
+    return sequence
+
+
+def _parse_range(task):
+    """Worker: parse one byte range and return its records packed for CardSequence."""
+    file_path, start, end, kind, numcard_idx, iccid_idx = task
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    numcards = []
+    iccids = []
+    if kind == "csv":
+        for row in csv.reader(io.StringIO(text, newline="")):
+            numcards.append(row[numcard_idx])
+            iccids.append(row[iccid_idx])
+    else:
+        # Universal newlines, as the serial parser's text-mode file gives it
+        last_column = max(numcard_idx, iccid_idx)
+        for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+            line = line.strip()
+            if line:
+                parts = line.split(";", last_column + 1)  # Split only as far as needed
+                numcards.append(parts[numcard_idx])
+                iccids.append(parts[iccid_idx])
+
+    numcard_bytes = [value.encode("utf-8") for value in numcards]
+    iccid_bytes = [value.encode("utf-8") for value in iccids]
+    numcard_width = max([NUMCARD_WIDTH] + [len(value) for value in numcard_bytes])
+    iccid_width = max([ICCID_WIDTH] + [len(value) for value in iccid_bytes])
+    return (
+        len(iccid_bytes),
+        b"".join(value.ljust(iccid_width, b"\0") for value in iccid_bytes), iccid_width,
+        b"".join(value.ljust(numcard_width, b"\0") for value in numcard_bytes), numcard_width,
+    )
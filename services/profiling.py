@@ -0,0 +1,241 @@
+"""
+Profiling mode, for capturing what happened when an operator reports that
+the app is sluggish.
+
+Start the app (or a headless entry point) with ``--profile``, or with
+CARD_VALIDATOR_PROFILE=1, and a Profiler runs for the whole session:
+
+- cProfile on the thread that started it, the GUI thread in the app (on
+  Python 3.12 and later cProfile sees every thread);
+- a sampling profiler over every thread, reader threads included, which
+  records each thread's call stack every ``interval`` seconds;
+- tracemalloc, from the first snapshot taken on demand (the app's Profile
+  menu) on, with another snapshot whenever a bundle is written. Tracing
+  every allocation slows allocation-heavy Python code many times over, so
+  it only runs once asked for.
+
+write() saves a timestamped bundle directory for offline analysis:
+
+    profile.pstats     cProfile data, for pstats or snakeviz
+    profile.txt        the slowest functions by cumulative time
+    samples.txt        per thread, the functions most often on CPU and on the stack
+    samples.collapsed  the samples as collapsed stacks, for flame graph tools
+    allocations.txt    top allocators of the last snapshot, and growth since the previous one
+    summary.json       session times, sample and snapshot counts, and what the caller adds
+    metrics.prom       the scan metrics, when the caller passes them
+
+Without the option nothing here runs and nothing is imported beyond this
+module, so profiling costs nothing when it is off.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+ENABLED = "--profile" in sys.argv or os.environ.get("CARD_VALIDATOR_PROFILE") == "1"
+SAMPLE_INTERVAL = 0.005  # Seconds between two samples of every thread's stack
+MAX_DEPTH = 64  # Deepest frames kept per sampled stack
+TRACEMALLOC_FRAMES = 8  # Frames kept per allocation traceback
+TOP = 40  # Lines listed per table of a bundle
+
+
+def _function(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+class Profiler:
+    """
+    cProfile, a stack sampler and tracemalloc for one session.
+
+    Args:
+        directory (str): Where bundles are written.
+        name (str): Prefix of the bundle directories, e.g. the entry point.
+        interval (float): Seconds between two stack samples.
+
+    Attributes:
+        samples (int): Sampling passes taken so far.
+        snapshots (list): The last two tracemalloc snapshots, as (label, snapshot).
+        snapshots_taken (int): tracemalloc snapshots taken so far.
+    """
+
+    def __init__(self, directory, name="profile", interval=SAMPLE_INTERVAL):
+        self.directory = directory
+        self.name = name
+        self.interval = interval
+        self.samples = 0
+        self.snapshots = []
+        self.snapshots_taken = 0
+        self.started = None
+        self._profile = None
+        self._stacks = Counter()  # (thread name, stack of code objects, root first) -> samples
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        """Start profiling; cProfile covers the calling thread."""
+        import cProfile
+
+        self.started = time.time()
+        self._sampler = threading.Thread(target=self._sample, name="Profiler sampler", daemon=True)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        """Stop profiling. Write the last bundle first: stopping tracemalloc drops what it traced."""
+        import tracemalloc
+
+        if self._profile is not None:
+            self._profile.disable()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def snapshot(self, label=None):
+        """
+        Take a tracemalloc snapshot, starting tracing with the first one.
+        Only what is allocated after the first snapshot is traced, so the
+        first is the baseline later ones show growth from.
+
+        Args:
+            label (str): Shown in allocations.txt; defaults to the time taken.
+
+        Returns:
+            int: Snapshots taken so far.
+        """
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._snapshot(label)
+        return self.snapshots_taken
+
+    def _snapshot(self, label=None):
+        import tracemalloc
+
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ))
+            self.snapshots = self.snapshots[-1:] + [(label or datetime.now().strftime("%H:%M:%S"), snapshot)]
+            self.snapshots_taken += 1
+
+    def write(self, extra=None, metrics=None):
+        """
+        Write a bundle of everything captured so far. cProfile keeps running
+        if it was, and the sampler and tracemalloc never stop for it.
+
+        Args:
+            extra (dict): Added to summary.json, e.g. the scan count.
+            metrics (str): Scan metrics in the Prometheus text format.
+
+        Returns:
+            str: The bundle directory.
+        """
+        import pstats
+
+        path = os.path.join(self.directory, f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        os.makedirs(path, exist_ok=True)
+        self._snapshot("bundle written")  # If memory is being traced
+
+        if self._profile is not None:
+            # Reading the stats disables the profile, so it is enabled again after; this runs
+            # on the GUI thread in the app, which is the thread cProfile was started on
+            running = not self._stop.is_set()
+            with open(os.path.join(path, "profile.txt"), "w", encoding="utf-8") as stream:
+                stats = pstats.Stats(self._profile, stream=stream)
+                if running:
+                    self._profile.enable()
+                stats.dump_stats(os.path.join(path, "profile.pstats"))
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP)
+
+        stacks = self._stacks.copy()  # Copied in one step: the sampler keeps adding to it
+        self._write_samples(path, stacks)
+        self._write_allocations(path)
+        summary = {
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds") if self.started else None,
+            "written": datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(time.time() - self.started, 3) if self.started else None,
+            "python": sys.version,
+            "platform": sys.platform,
+            "sample_interval": self.interval,
+            "samples": self.samples,
+            "snapshots": self.snapshots_taken,
+        }
+        summary.update(extra or {})
+        with open(os.path.join(path, "summary.json"), "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+        if metrics:
+            with open(os.path.join(path, "metrics.prom"), "w", encoding="utf-8", newline="\n") as file:
+                file.write(metrics)
+        return path
+
+    def _sample(self):
+        own = threading.get_ident()
+        stacks = self._stacks
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                stacks[names.get(ident, str(ident)), tuple(stack)] += 1
+            self.samples += 1
+
+    def _write_samples(self, path, stacks):
+        by_thread = {}
+        for (thread, stack), count in stacks.items():
+            by_thread.setdefault(thread, []).append((stack, count))
+        with open(os.path.join(path, "samples.collapsed"), "w", encoding="utf-8") as file:
+            for (thread, stack), count in stacks.most_common():
+                file.write(";".join([thread.replace(";", ","), *map(_function, stack)]) + f" {count}\n")
+        lines = [f"{self.samples} samples, every {self.interval * 1e3:g} ms"]
+        for thread, entries in sorted(by_thread.items(), key=lambda item: -sum(count for _, count in item[1])):
+            total = sum(count for _, count in entries)
+            leaf, inclusive = Counter(), Counter()
+            for stack, count in entries:
+                if stack:
+                    leaf[stack[-1]] += count
+                for code in set(stack):
+                    inclusive[code] += count
+            lines.append(f"\nThread {thread}: {total} samples")
+            lines.append(f"  {'on CPU':>8} | {'on stack':>8} | function")
+            for code, count in leaf.most_common(TOP):
+                lines.append(f"  {count / total:8.1%} | {inclusive[code] / total:8.1%} | {_function(code)}")
+            lines.append("  Most often on the stack:")
+            for code, count in inclusive.most_common(TOP):
+                lines.append(f"  {'':8} | {count / total:8.1%} | {_function(code)}")
+        with open(os.path.join(path, "samples.txt"), "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    def _write_allocations(self, path):
+        lines = []
+        if self.snapshots:
+            label, snapshot = self.snapshots[-1]
+            statistics = snapshot.statistics("lineno")
+            lines.append(f"Snapshot {label}: {sum(stat.size for stat in statistics) / 2**20:.1f} MiB "
+                         f"in {sum(stat.count for stat in statistics)} blocks")
+            lines.append("Top allocators:")
+            for stat in statistics[:TOP]:
+                lines.append(f"  {stat.size / 2**10:10.1f} KiB in {stat.count:8} blocks  {stat.traceback}")
+            lines.append("\nLargest allocation tracebacks, most recent call first:")
+            for stat in snapshot.statistics("traceback")[:TOP // 4]:
+                lines.append(f"  {stat.size / 2**10:10.1f} KiB in {stat.count:8} blocks")
+                lines.extend(f"      {line}" for line in stat.traceback.format(most_recent_first=True))
+        if len(self.snapshots) > 1:
+            (previous_label, previous), (label, snapshot) = self.snapshots[-2:]
+            lines.append(f"\nGrowth from snapshot {previous_label} to {label}:")
+            for stat in snapshot.compare_to(previous, "lineno")[:TOP]:
+                lines.append(f"  {stat.size_diff / 2**10:+10.1f} KiB {stat.count_diff:+8} blocks  {stat.traceback}")
+        with open(os.path.join(path, "allocations.txt"), "w", encoding="utf-8") as file:
+            file.write("\n".join(lines or ["Memory was not traced: no memory snapshot was taken."]) + "\n")
@@ -0,0 +1,347 @@
+"""
+Range-compressed, read-only card sequence.
+
+Jobs are personalised in serial-number order: each ICCID is the previous
+one's body (the ICCID without its check digit) plus one, with a fresh Luhn
+check digit appended, and NUMCARD counts up alongside. RangeSequence stores
+such a run as a single (position, length, first body, first NUMCARD) entry
+and computes each card from its position, so a clean job of any size costs
+a few hundred bytes. Cards that break the pattern, and runs too short to be
+worth it, stay explicit in a small CardSequence.
+
+It offers the CardSequence interface the rest of the application reads
+through, plus first_after() for exact ICCID lookups in O(log runs), which
+SequenceIndex uses instead of sorting a key per card.
+"""
+import bisect
+
+import numpy as np
+
+from services.card_sequence import CardSequence
+from services.iccid_check import luhn_check_digit, record_checks
+
+MIN_RUN = 16           # Shorter runs are cheaper to store explicitly
+_MAX_BODY_DIGITS = 19  # Largest body that fits in a uint64
+
+_DOUBLED_VALUES = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.int64)
+
+
+def _decimal_values(rows, lengths, usable):
+    """Parse the leading ``lengths`` ASCII digits of each usable row as a uint64 (0 elsewhere)."""
+    values = np.zeros(len(rows), dtype=np.uint64)
+    for column in range(int(lengths[usable].max(initial=0))):
+        take = usable & (column < lengths)
+        digits = rows[:, column].astype(np.uint64) - np.uint64(48)
+        values = np.where(take, values * np.uint64(10) + digits, values)
+    return values
+
+
+def _range_records(body_start, body_width, count, width):
+    """Pack ``count`` ICCIDs with consecutive bodies from ``body_start`` into ``width``-byte records."""
+    # Digits above the last `varying` ones are the same for every body in the range
+    first, last = str(body_start), str(body_start + count - 1)
+    varying = body_width
+    while varying and first[body_width - varying] == last[body_width - varying]:
+        varying -= 1
+    fixed = first[:body_width - varying].encode("ascii")
+
+    rows = np.zeros((count, width), dtype=np.uint8)
+    rows[:, :len(fixed)] = np.frombuffer(fixed, dtype=np.uint8)
+    low = np.arange(count, dtype=np.int64) + int(first[body_width - varying:] or 0)
+    # Luhn doubles every second digit of the body, starting from its last
+    total = np.full(count, sum(_DOUBLED_VALUES[int(d)] if (body_width - 1 - i) % 2 == 0 else int(d)
+                               for i, d in enumerate(fixed.decode("ascii"))), dtype=np.int64)
+    for i in range(body_width - 1, body_width - varying - 1, -1):
+        low, digit = np.divmod(low, 10)
+        rows[:, i] = digit + 48
+        total += _DOUBLED_VALUES[digit] if (body_width - 1 - i) % 2 == 0 else digit
+    rows[:, body_width] = (-total) % 10 + 48
+    return rows.tobytes()
+
+
+class _Run:
+    """Cards [start, start + length) computed from their position."""
+
+    __slots__ = ("start", "length", "body", "body_width", "numcard")
+
+    def __init__(self, start, length, body, body_width, numcard):
+        self.start = start
+        self.length = length
+        self.body = body              # Body of the first card
+        self.body_width = body_width
+        self.numcard = numcard        # NUMCARD of the first card, or None
+
+    def iccid(self, offset):
+        body = str(self.body + offset).encode("ascii")
+        return (body + b"%d" % luhn_check_digit(body)).decode("ascii")
+
+
+class _Explicit:
+    """Cards [start, start + length) stored at ``offset`` in the explicit CardSequence."""
+
+    __slots__ = ("start", "length", "offset")
+
+    def __init__(self, start, length, offset):
+        self.start = start
+        self.length = length
+        self.offset = offset
+
+
+class RangeSequence:
+    """
+    A CardSequence stored as arithmetic runs plus explicitly stored cards.
+
+    Build one with from_sequence(). Like a memory-mapped CardSequence it
+    cannot be appended to.
+    """
+
+    def __init__(self, segments, explicit, iccid_width, numcard_width):
+        self._segments = segments                      # _Run / _Explicit, in position order
+        self._starts = [segment.start for segment in segments]
+        self._explicit = explicit
+        self._count = segments[-1].start + segments[-1].length if segments else 0
+        self._iccid_width = iccid_width
+        self._numcard_width = numcard_width
+
+        # Runs ordered by (body width, first body) for arithmetic lookups. _reach[i]
+        # is the largest body end among runs [0, i] of the same width, so a lookup
+        # can stop walking back as soon as no earlier run can contain the body.
+        self._runs = sorted((s for s in segments if isinstance(s, _Run)), key=lambda r: (r.body_width, r.body))
+        self._run_keys = [(run.body_width, run.body) for run in self._runs]
+        self._reach = []
+        for i, run in enumerate(self._runs):
+            reach = run.body + run.length
+            if i and self._runs[i - 1].body_width == run.body_width:
+                reach = max(reach, self._reach[-1])
+            self._reach.append(reach)
+
+        # Explicit cards sorted by (ICCID, position)
+        block, width = explicit.iccid_records()
+        keys = np.frombuffer(block, dtype=f"S{width}")
+        positions = np.empty(len(keys), dtype=np.int64)
+        for segment in segments:
+            if isinstance(segment, _Explicit):
+                positions[segment.offset:segment.offset + segment.length] = np.arange(
+                    segment.start, segment.start + segment.length)
+        order = np.lexsort((positions, keys))
+        self._explicit_keys = keys[order]
+        self._explicit_positions = positions[order]
+
+    @classmethod
+    def from_sequence(cls, sequence, min_run=MIN_RUN):
+        """
+        Compress a sequence. Runs of at least ``min_run`` cards with
+        consecutive bodies, valid Luhn digits and consecutive (or no)
+        NUMCARDs become arithmetic; everything else is copied as is.
+        """
+        count = len(sequence)
+        iccid_width, numcard_width = sequence.record_widths
+        explicit = CardSequence(iccid_width, numcard_width)
+        if not count:
+            return cls([], explicit, iccid_width, numcard_width)
+
+        block, width = sequence.iccid_records()
+        rows = np.frombuffer(block, dtype=np.uint8).reshape(count, width)
+        lengths, _, luhn = record_checks(block, width)
+        candidate = luhn & (lengths >= 2) & (lengths <= _MAX_BODY_DIGITS + 1) & (rows[:, 0] != 48)
+        bodies = _decimal_values(rows, lengths - 1, candidate)
+
+        numcard_block, numcard_record_width = sequence.numcard_records()
+        numcard_rows = np.frombuffer(numcard_block, dtype=np.uint8).reshape(count, numcard_record_width)
+        numcard_lengths, numcard_digits, _ = record_checks(numcard_block, numcard_record_width)
+        unnumbered = numcard_lengths == 0
+        numbered = (numcard_digits & (numcard_lengths <= _MAX_BODY_DIGITS)
+                    & ((numcard_rows[:, 0] != 48) | (numcard_lengths == 1)))  # Canonical decimals only
+        numbers = _decimal_values(numcard_rows, numcard_lengths, numbered)
+
+        candidate &= numbered | unnumbered
+
+        # link[i]: card i continues the run of card i - 1
+        link = np.zeros(count, dtype=bool)
+        link[1:] = (candidate[1:] & candidate[:-1] & (lengths[1:] == lengths[:-1])
+                    & (bodies[1:] == bodies[:-1] + np.uint64(1))
+                    & ((unnumbered[1:] & unnumbered[:-1])
+                       | (numbered[1:] & numbered[:-1] & (numbers[1:] == numbers[:-1] + np.uint64(1)))))
+        run_starts = np.flatnonzero(~link)
+        run_lengths = np.diff(np.append(run_starts, count))
+        keep = (run_lengths >= min_run) & candidate[run_starts]
+
+        segments = []
+        position = 0
+        for start, length in zip(run_starts[keep].tolist(), run_lengths[keep].tolist()):
+            if start > position:
+                segments.append(cls._copy(sequence, explicit, position, start))
+            numcard = None if unnumbered[start] else int(numbers[start])
+            segments.append(_Run(start, length, int(bodies[start]), int(lengths[start]) - 1, numcard))
+            position = start + length
+        if position < count:
+            segments.append(cls._copy(sequence, explicit, position, count))
+        return cls(segments, explicit, iccid_width, numcard_width)
+
+    @staticmethod
+    def _copy(sequence, explicit, start, stop):
+        """Copy cards [start, stop) into the explicit store; returns their segment."""
+        offset = len(explicit)
+        iccids, iccid_width = sequence.iccid_records(start, stop)
+        numcards, numcard_width = sequence.numcard_records(start, stop)
+        explicit.extend_packed(stop - start, iccids, iccid_width, numcards, numcard_width)
+        return _Explicit(start, stop - start, offset)
+
+    def _segment(self, index):
+        return self._segments[bisect.bisect_right(self._starts, index) - 1]
+
+    def _overlapping(self, start, stop):
+        """Yield (segment, first, last) for the parts of [start, stop) each segment holds."""
+        i = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        while start < stop and i < len(self._segments):
+            segment = self._segments[i]
+            end = min(stop, segment.start + segment.length)
+            if end > start:
+                yield segment, start - segment.start, end - segment.start
+                start = end
+            i += 1
+
+    @property
+    def record_widths(self):
+        """(ICCID width, NUMCARD width) of the records this sequence hands out."""
+        return self._iccid_width, self._numcard_width
+
+    @property
+    def runs(self):
+        """Number of arithmetic runs."""
+        return len(self._runs)
+
+    @property
+    def explicit_count(self):
+        """Number of cards stored explicitly."""
+        return len(self._explicit)
+
+    def column_buffers(self):
+        """Return the packed ICCID and NUMCARD records, materialised."""
+        return self.iccid_records()[0], self.numcard_records()[0]
+
+    def iccid(self, index):
+        """Return the ICCID at ``index``."""
+        segment = self._segment(index)
+        if isinstance(segment, _Run):
+            return segment.iccid(index - segment.start)
+        return self._explicit.iccid(segment.offset + index - segment.start)
+
+    def numcard(self, index):
+        """Return the NUMCARD at ``index``, or None if the source had none."""
+        segment = self._segment(index)
+        if isinstance(segment, _Run):
+            return None if segment.numcard is None else str(segment.numcard + index - segment.start)
+        return self._explicit.numcard(segment.offset + index - segment.start)
+
+    def iccid_records(self, start=0, stop=None):
+        """
+        Return (records, width): the ICCID records for cards [start, stop),
+        packed like CardSequence.iccid_records().
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        width = self._iccid_width
+        parts = []
+        for segment, first, last in self._overlapping(start, stop):
+            if isinstance(segment, _Run):
+                parts.append(_range_records(segment.body + first, segment.body_width, last - first, width))
+            else:
+                records, explicit_width = self._explicit.iccid_records(segment.offset + first, segment.offset + last)
+                if explicit_width != width:
+                    records = np.frombuffer(records, dtype=f"S{explicit_width}").astype(f"S{width}").tobytes()
+                parts.append(records)
+        return b"".join(parts), width
+
+    def numcard_records(self, start=0, stop=None):
+        """Return (records, width): the NUMCARD records for cards [start, stop)."""
+        stop = self._count if stop is None else min(stop, self._count)
+        width = self._numcard_width
+        parts = []
+        for segment, first, last in self._overlapping(start, stop):
+            if isinstance(segment, _Run):
+                if segment.numcard is None:
+                    parts.append(bytes((last - first) * width))
+                else:
+                    numbers = np.arange(segment.numcard + first, segment.numcard + last, dtype=np.uint64)
+                    parts.append(numbers.astype(f"S{width}").tobytes())
+            else:
+                records, explicit_width = self._explicit.numcard_records(segment.offset + first, segment.offset + last)
+                if explicit_width != width:
+                    records = np.frombuffer(records, dtype=f"S{explicit_width}").astype(f"S{width}").tobytes()
+                parts.append(records)
+        return b"".join(parts), width
+
+    def iccid_block(self, start, stop):
+        """Return (text, width): ICCIDs [start, stop) decoded as in CardSequence.iccid_block()."""
+        records, width = self.iccid_records(start, stop)
+        return records.decode("latin-1"), width
+
+    def iccid_lengths(self):
+        """Return the set of distinct ICCID lengths, in bytes."""
+        lengths = {run.body_width + 1 for run in self._runs}
+        lengths.update(int(length) for length in np.unique(np.char.str_len(self._explicit_keys)))
+        return lengths
+
+    def first_after(self, iccid, after):
+        """Smallest position > ``after`` holding exactly ``iccid`` (UTF-8 bytes), or None."""
+        best = None
+        size = len(iccid)
+        if 2 <= size <= _MAX_BODY_DIGITS + 1 and iccid.isdigit() and iccid[0] != 48:
+            body_digits = iccid[:-1]
+            if iccid[-1] - 48 == luhn_check_digit(body_digits):
+                body_width, body = size - 1, int(body_digits)
+                i = bisect.bisect_right(self._run_keys, (body_width, body)) - 1
+                while i >= 0 and self._run_keys[i][0] == body_width and self._reach[i] > body:
+                    run = self._runs[i]
+                    if body < run.body + run.length:
+                        position = run.start + body - run.body
+                        if position > after and (best is None or position < best):
+                            best = position
+                    i -= 1
+
+        keys = self._explicit_keys
+        lo = keys.searchsorted(iccid, "left")
+        hi = keys.searchsorted(iccid, "right")
+        if lo < hi:
+            positions = self._explicit_positions[lo:hi]
+            i = positions.searchsorted(after, "right")
+            if i < len(positions) and (best is None or positions[i] < best):
+                best = int(positions[i])
+        return best
+
+    def next_card(self, index):
+        """Return the card following ``index``, or None if it is the last one."""
+        if index + 1 < self._count:
+            return self[index + 1]
+        return None
+
+    def pairs(self):
+        """Lazily yield (current_card, next_card) tuples, as CardSequence.pairs() does."""
+        for i in range(self._count):
+            yield self[i], self.next_card(i)
+
+    @property
+    def nbytes(self):
+        """Approximate number of bytes held: explicit records, lookup keys and runs."""
+        return (self._explicit.nbytes + self._explicit_keys.nbytes + self._explicit_positions.nbytes
+                + 64 * len(self._segments))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("card index out of range")
+        return self.numcard(index), self.iccid(index)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self.numcard(i), self.iccid(i)
+
+    def __repr__(self):
+        return (f"<RangeSequence cards={self._count} runs={len(self._runs)} "
+                f"explicit={len(self._explicit)} bytes={self.nbytes}>")
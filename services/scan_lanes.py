@@ -0,0 +1,114 @@
+"""
+Several scanning heads validating one job at the same time.
+
+Each ScanLane is one head: its own SequenceValidator, with its own cursor
+and seen cards, over a NUMCARD sub-range of the job. All lanes share the
+one read-only sequence, SequenceIndex and IccidCheck, so adding a head
+costs a cursor and a bitset rather than another parse of the CPD.
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+from services import sequence_validator
+from services.sequence_validator import SequenceValidator
+
+RATE_WINDOW = 5.0  # Seconds of scans a lane's throughput is averaged over
+
+
+def split_ranges(length, lanes):
+    """Split positions [0, length) into ``lanes`` contiguous (start, stop) ranges of near-equal size."""
+    bounds = [length * i // lanes for i in range(lanes + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def find_numcard(sequence, numcard, start=0):
+    """Return the first position >= start holding ``numcard``, or None."""
+    block, width = sequence.numcard_records(start)
+    key = numcard.encode("utf-8")
+    if not width or len(key) > width:
+        return None
+    hits = np.flatnonzero(np.frombuffer(block, dtype=f"S{width}") == key)
+    return start + int(hits[0]) if len(hits) else None
+
+
+def ranges_from_numcards(sequence, numcards):
+    """
+    (start, stop) ranges for lanes starting at the given NUMCARDs, each
+    running up to the next lane's start (the last one to the end of the job).
+
+    Raises:
+        ValueError: If a NUMCARD is not in the job, or they are not in job order.
+    """
+    starts = []
+    for numcard in numcards:
+        position = find_numcard(sequence, numcard)
+        if position is None:
+            raise ValueError(f"NUMCARD {numcard} is not in the job")
+        starts.append(position)
+    if starts != sorted(starts):
+        raise ValueError("Lane start NUMCARDs must be in job order")
+    return list(zip(starts, starts[1:] + [len(sequence)]))
+
+
+class ScanLane:
+    """
+    One scanning head over a sub-range of the job.
+
+    Args:
+        name (str): The lane's label, usually its COM port.
+        sequence (CardSequence): The shared expected cards.
+        index (SequenceIndex): The shared index over ``sequence``.
+        check (IccidCheck): The shared structural check, or None.
+        start (int): First position of the lane's range.
+        stop (int): End of the lane's range, or None for the end of the job.
+        window (int): Out-of-order window in positions.
+    """
+
+    def __init__(self, name, sequence, index, check=None, start=0, stop=None, window=0):
+        self.name = name
+        self.start = start
+        self.stop = len(sequence) if stop is None else stop
+        self.validator = SequenceValidator(sequence, index, check, window, self.stop)
+        self.validator.seek(start)
+        self.counts = {}  # Verdict status -> scans
+        self.scanned = 0
+        self._times = deque()  # Arrival times of the scans in the last RATE_WINDOW seconds
+
+    def scan(self, scanned_code, now=None):
+        """Validate one scan on this lane; returns its ScanVerdict."""
+        verdict = self.validator.scan(scanned_code)
+        self.scanned += 1
+        self.counts[verdict.status] = self.counts.get(verdict.status, 0) + 1
+
+        times = self._times
+        now = time.monotonic() if now is None else now
+        times.append(now)
+        while now - times[0] > RATE_WINDOW:
+            times.popleft()
+        return verdict
+
+    def throughput(self, now=None):
+        """Scans per second over the last RATE_WINDOW seconds."""
+        times = self._times
+        now = time.monotonic() if now is None else now
+        while times and now - times[0] > RATE_WINDOW:
+            times.popleft()
+        return len(times) / RATE_WINDOW
+
+    @property
+    def done(self):
+        """True once the cursor has passed the end of the lane's range."""
+        return self.validator.cursor >= self.stop
+
+    @property
+    def errors(self):
+        """Scans that were not accepted: NOT OK, rejected and duplicates."""
+        counts = self.counts
+        return (counts.get(sequence_validator.NOT_OK, 0) + counts.get(sequence_validator.REJECTED, 0)
+                + counts.get(sequence_validator.DUPLICATE, 0))
+
+    def __repr__(self):
+        return (f"ScanLane({self.name!r}, [{self.start}, {self.stop}), cursor={self.validator.cursor}, "
+                f"{self.scanned} scans)")
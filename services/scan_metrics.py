@@ -0,0 +1,258 @@
+"""
+Latency of the scan hot path, from the scanner's bytes reaching the port to
+the verdict's rows reaching the log table, split into stages:
+
+- READ: bytes arrived in the reader's read loop -> framed into scans.
+- QUEUE: framed and handed to the GUI thread -> handle_com_data entered.
+- VALIDATE: handle_com_data entered -> returned with the verdict rendered.
+- DISPLAY: verdict rendered -> its rows inserted in the log table.
+- TOTAL: bytes arrived -> rows inserted in the log table.
+
+Each stage feeds a LatencyHistogram, an HDR-style log-linear histogram: a
+record is a few integer operations and one counter increment, every value
+is kept to within 1/64 of itself, and it never allocates. A histogram has a
+single writer thread (READ the reader's, the others the GUI's), so none is
+locked; readers copy the counters and work on the copy.
+
+ScanMetrics.summary() gives scans per second, queue depth and p50/p95/p99
+of every stage over the last ``window`` seconds, and prometheus_text() the
+same as a Prometheus text exposition for the line dashboard.
+"""
+import os
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import accumulate
+from math import ceil
+
+READ = "read"
+QUEUE = "queue"
+VALIDATE = "validate"
+DISPLAY = "display"
+TOTAL = "total"
+STAGES = (READ, QUEUE, VALIDATE, DISPLAY, TOTAL)
+QUANTILES = (0.5, 0.95, 0.99)
+
+SUB_BUCKET_BITS = 7  # Values are kept to 1 / 2 ** (SUB_BUCKET_BITS - 1) of themselves
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF = SUB_BUCKETS >> 1
+MAX_SECONDS = 60  # Longer latencies are counted as this long
+
+
+def _index(value):
+    """Counter of a value in microseconds: exact below SUB_BUCKETS, then HALF counters per power of two."""
+    if value < SUB_BUCKETS:
+        return max(value, 0)
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF + (value >> shift) - HALF
+
+
+def _midpoint(index):
+    """Middle of the values counted in counter ``index``, in microseconds."""
+    if index < SUB_BUCKETS:
+        return index + 0.5
+    shift = (index - SUB_BUCKETS) // HALF + 1
+    low = ((index - SUB_BUCKETS) % HALF + HALF) << shift
+    return low + (1 << shift) / 2
+
+
+_LAST = _index(MAX_SECONDS * 1_000_000)
+
+
+class LatencyHistogram:
+    """
+    Counts of latencies in log-linear buckets, 1 µs to MAX_SECONDS.
+
+    Attributes:
+        counts (array): Latencies counted in each bucket.
+        sum (float): Seconds recorded, in total.
+    """
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * (_LAST + 1)))
+        self.sum = 0.0
+
+    def record(self, seconds):
+        """Count one latency; called on the histogram's writer thread only."""
+        self.counts[min(_index(int(seconds * 1_000_000)), _LAST)] += 1
+        self.sum += seconds
+
+    def snapshot(self):
+        """Copy of the counts, safe to take from any thread."""
+        return self.counts[:]
+
+    @staticmethod
+    def quantiles(counts, quantiles=QUANTILES):
+        """
+        Latencies at the given quantiles of a snapshot (or a difference of two).
+
+        Args:
+            counts (Sequence[int]): Bucket counts.
+            quantiles (Sequence[float]): Quantiles, between 0 and 1.
+
+        Returns:
+            list[float | None]: Seconds at each quantile; None when nothing was counted.
+        """
+        cumulative = list(accumulate(counts))
+        total = cumulative[-1]
+        if not total:
+            return [None] * len(quantiles)
+        return [_midpoint(bisect_left(cumulative, max(1, ceil(q * total)))) / 1_000_000 for q in quantiles]
+
+
+class ScanMetrics:
+    """
+    Stage latencies, throughput and queue depth of the scans validated.
+
+    Args:
+        window (float): Seconds of history the quantiles and rates of
+                        summary() cover.
+
+    Attributes:
+        histograms (dict[str, LatencyHistogram]): One per stage in STAGES.
+        scans (int): Scans validated.
+        depth_peak (int): Deepest the queue was seen since the last summary.
+    """
+
+    def __init__(self, window=30.0):
+        self.window = window
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.scans = 0
+        self.depth_peak = 0
+        self._unlogged = deque()  # (arrived, validated) of validated scans whose rows are not in the table yet
+        self._snapshots = deque()  # (taken at, scans, {stage: counts}), one per summary() within the window
+
+    def record(self, stage, seconds):
+        """Count a latency of ``stage``; the READ stage is recorded by the reader thread."""
+        self.histograms[stage].record(seconds)
+
+    def validated(self, arrived, queued, entered, exited):
+        """
+        Time a scan through the GUI thread.
+
+        Args:
+            arrived (float): When its bytes arrived (time.perf_counter()).
+            queued (float): When it was handed to the GUI thread.
+            entered (float): When handle_com_data was entered.
+            exited (float): When handle_com_data returned.
+        """
+        histograms = self.histograms
+        histograms[QUEUE].record(entered - queued)
+        histograms[VALIDATE].record(exited - entered)
+        self._unlogged.append((arrived, exited))
+        self.scans += 1
+
+    def logged(self):
+        """Note that the rows of every scan validated so far are now in the log table."""
+        unlogged = self._unlogged
+        if not unlogged:
+            return
+        now = time.perf_counter()
+        display, total = self.histograms[DISPLAY], self.histograms[TOTAL]
+        while unlogged:
+            arrived, validated = unlogged.popleft()
+            display.record(now - validated)
+            total.record(now - arrived)
+
+    def observe_queue(self, depth):
+        """Note the queue depth, for the peak shown by the next summary()."""
+        if depth > self.depth_peak:
+            self.depth_peak = depth
+
+    def summary(self, queue=None):
+        """
+        Take the current figures. Quantiles cover the last ``window`` seconds
+        (the whole session until it is that long), the scan rate the time
+        since the previous summary.
+
+        Args:
+            queue (ScanQueue): The queue scans reach the GUI thread through,
+                               for its depth and losses.
+
+        Returns:
+            dict: ``scans``, ``rate`` (scans/s), ``depth``, ``depth_peak``,
+            ``dropped``, ``late`` and ``stages``: per stage, ``quantiles``
+            (seconds at QUANTILES, or None) over the window and the session's
+            ``count`` and ``sum`` of seconds.
+        """
+        now = time.perf_counter()
+        counts = {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+        snapshots = self._snapshots
+        previous = snapshots[-1] if snapshots else (now, self.scans, None)
+        while len(snapshots) > 1 and snapshots[1][0] <= now - self.window:
+            snapshots.popleft()
+        base = snapshots[0][2] if snapshots else None
+        snapshots.append((now, self.scans, counts))
+
+        stages = {}
+        for stage, stage_counts in counts.items():
+            in_window = stage_counts if base is None else [a - b for a, b in zip(stage_counts, base[stage])]
+            stages[stage] = {"quantiles": LatencyHistogram.quantiles(in_window), "count": sum(stage_counts),
+                             "sum": self.histograms[stage].sum}
+        depth = len(queue) if queue is not None else 0
+        summary = {
+            "scans": self.scans,
+            "rate": (self.scans - previous[1]) / (now - previous[0]) if now > previous[0] else 0.0,
+            "depth": depth,
+            "depth_peak": max(self.depth_peak, depth),
+            "dropped": queue.dropped if queue is not None else 0,
+            "late": queue.late if queue is not None else 0,
+            "stages": stages,
+        }
+        self.depth_peak = 0
+        return summary
+
+
+def prometheus_text(summary, prefix="card_validator"):
+    """
+    A summary() in the Prometheus text exposition format: stage latencies as
+    a summary metric, counters and gauges for the rest.
+    """
+    def number(value):
+        return "NaN" if value is None else repr(float(value))
+
+    lines = [
+        f"# HELP {prefix}_scans_total Scans validated.",
+        f"# TYPE {prefix}_scans_total counter",
+        f"{prefix}_scans_total {summary['scans']}",
+        f"# HELP {prefix}_scans_per_second Scans validated per second, recently.",
+        f"# TYPE {prefix}_scans_per_second gauge",
+        f"{prefix}_scans_per_second {number(summary['rate'])}",
+        f"# HELP {prefix}_queue_depth Scans waiting for the GUI thread.",
+        f"# TYPE {prefix}_queue_depth gauge",
+        f"{prefix}_queue_depth {summary['depth']}",
+        f"# HELP {prefix}_queue_depth_peak Most scans seen waiting since the previous export.",
+        f"# TYPE {prefix}_queue_depth_peak gauge",
+        f"{prefix}_queue_depth_peak {summary['depth_peak']}",
+        f"# HELP {prefix}_queue_dropped_total Scans lost to the queue's overflow policy.",
+        f"# TYPE {prefix}_queue_dropped_total counter",
+        f"{prefix}_queue_dropped_total {summary['dropped']}",
+        f"# HELP {prefix}_queue_late_total Scans that waited too long in the queue.",
+        f"# TYPE {prefix}_queue_late_total counter",
+        f"{prefix}_queue_late_total {summary['late']}",
+        f"# HELP {prefix}_stage_latency_seconds Scan latency per hot-path stage.",
+        f"# TYPE {prefix}_stage_latency_seconds summary",
+    ]
+    for stage, figures in summary["stages"].items():
+        for quantile, value in zip(QUANTILES, figures["quantiles"]):
+            lines.append(f'{prefix}_stage_latency_seconds{{stage="{stage}",quantile="{quantile}"}} {number(value)}')
+        lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{stage}"}} {number(figures["sum"])}')
+        lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{stage}"}} {figures["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, summary):
+    """
+    Write a summary() to ``path`` for a Prometheus textfile collector. The
+    file is replaced whole, so a scrape never reads it half written.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8", newline="\n") as file:
+        file.write(prometheus_text(summary))
+    os.replace(temporary, path)
@@ -0,0 +1,83 @@
+"""
+Which cards a scanning session has already seen, for duplicate detection.
+
+Cards of the job are tracked by position in a bitset, one bit per expected
+card (1.25 MB for a 10M-card job), so "was this card scanned before?" is a
+single byte test. Scanned codes that are not in the job at all are kept in
+a set; there are only as many as the line produced off-list reads.
+"""
+
+
+class SeenCards:
+    """
+    Positions and off-list codes scanned in a session.
+
+    Args:
+        size (int): Expected cards to reserve bits for. Positions past it
+                    grow the bitset on demand.
+    """
+
+    __slots__ = ("bits", "off_list")
+
+    def __init__(self, size=0):
+        self.bits = bytearray((size + 7) >> 3)
+        self.off_list = set()  # Scanned codes that are not in the job
+
+    def clear(self, size=0):
+        """Forget every scan and reserve bits for ``size`` cards."""
+        self.bits = bytearray((size + 7) >> 3)
+        self.off_list.clear()
+
+    def reserve(self, size):
+        """Make room for ``size`` cards, keeping what was seen. Grows in place."""
+        missing = ((size + 7) >> 3) - len(self.bits)
+        if missing > 0:
+            self.bits.extend(bytes(missing))
+
+    def add(self, position):
+        byte = position >> 3
+        if byte >= len(self.bits):
+            self.reserve(position + 1)
+        self.bits[byte] |= 1 << (position & 7)
+
+    def add_range(self, start, stop):
+        """Add positions [start, stop), a byte at a time."""
+        if start >= stop:
+            return
+        self.reserve(stop)
+        bits = self.bits
+        first, last = start >> 3, (stop - 1) >> 3
+        head = 0xFF << (start & 7) & 0xFF
+        tail = 0xFF >> (7 - ((stop - 1) & 7))
+        if first == last:
+            bits[first] |= head & tail
+            return
+        bits[first] |= head
+        bits[first + 1:last] = b"\xff" * (last - first - 1)
+        bits[last] |= tail
+
+    def add_many(self, positions):
+        """Vectorised add() of an array of positions."""
+        import numpy as np  # Only needed here; kept off the GUI's startup path
+        positions = np.asarray(positions, dtype=np.int64)
+        if not len(positions):
+            return
+        self.reserve(int(positions.max()) + 1)
+        bits = np.frombuffer(self.bits, dtype=np.uint8)
+        np.bitwise_or.at(bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def __contains__(self, position):
+        byte = position >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] >> (position & 7) & 1)
+
+    def __len__(self):
+        """Number of positions seen."""
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    @property
+    def nbytes(self):
+        """Bytes held by the bitset (off-list codes not included)."""
+        return len(self.bits)
+
+    def __repr__(self):
+        return f"SeenCards({len(self)} positions, {len(self.off_list)} off-list codes)"
@@ -0,0 +1,162 @@
+"""
+Binary cache of parsed card sequences, reloaded with mmap.
+
+A parsed file is written once to a cache file named after its absolute path.
+The file holds a fixed header (source size, mtime and content hash, record
+widths, card count, a CRC32 of the data) followed by the packed ICCID and
+NUMCARD columns exactly as CardSequence keeps them in memory, so a reload
+maps the file instead of parsing it. The data is checked the first time a
+process opens a cache file; a corrupt one is parsed again and rewritten. Read-only maps of the same cache file share page-cache memory
+between every station process on the host.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+
+import constants
+from services.card_sequence import CardSequence
+
+CACHE_MAGIC = b"CSVSEQ\0\0"
+CACHE_VERSION = 2
+CACHE_SUFFIX = ".seqcache"
+
+# magic, version, iccid width, numcard width, card count,
+# source size, source mtime (ns), source content hash, data CRC32, header CRC32
+_HEADER = struct.Struct("<8sHHHQQq16sII")
+_HASH_CHUNK = 1 << 20
+
+_verified = set()  # (path, inode, mtime) of the cache files whose data this process has checked
+
+
+def cache_path_for(file_path, cache_dir=None):
+    """Return the cache file location for a source file."""
+    cache_dir = cache_dir or constants.CACHE_DIR
+    key = hashlib.blake2b(os.path.abspath(file_path).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, key + CACHE_SUFFIX)
+
+
+def content_hash(file_path):
+    """Return the 16-byte BLAKE2b digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def open_cached_sequence(file_path, cache_dir=None):
+    """
+    Return the cached sequence for ``file_path``, or None if there is no valid cache.
+
+    A cache whose size and mtime no longer match the source is still reused
+    when the source contents hash the same; anything else is treated as stale.
+    """
+    stat = os.stat(file_path)
+    cache_path = cache_path_for(file_path, cache_dir)
+    try:
+        sequence, header = _open_cache(cache_path)
+    except (OSError, ValueError):
+        return None  # Missing, truncated or corrupt
+
+    if header["size"] != stat.st_size:
+        return None
+    if header["mtime_ns"] != stat.st_mtime_ns:
+        # Touched or copied but possibly unchanged: compare contents
+        source_hash = content_hash(file_path)
+        if source_hash != header["hash"]:
+            return None
+        _try_write_cache(cache_path, sequence, stat, source_hash)
+    return sequence
+
+
+def store_cached_sequence(file_path, sequence, cache_dir=None):
+    """
+    Write ``sequence`` to the cache for ``file_path``.
+
+    Returns:
+        bool: Whether the cache was written; a failure is not fatal, the
+        next load parses the file again.
+    """
+    stat = os.stat(file_path)
+    return _try_write_cache(cache_path_for(file_path, cache_dir), sequence, stat, content_hash(file_path))
+
+
+def load_cached_sequence(file_path, parser, cache_dir=None):
+    """
+    Return the card sequence for ``file_path``, using the binary cache when valid.
+
+    Args:
+        file_path (str): Path to the source CPD/TXT/CSV file.
+        parser (callable): Parser to run when there is no usable cache entry.
+        cache_dir (str): Cache directory; defaults to constants.CACHE_DIR.
+
+    Returns:
+        CardSequence: The parsed sequence, mmap-backed when loaded from cache.
+    """
+    sequence = open_cached_sequence(file_path, cache_dir)
+    if sequence is None:
+        sequence = parser(file_path)
+        store_cached_sequence(file_path, sequence, cache_dir)
+    return sequence
+
+
+def _open_cache(cache_path):
+    with open(cache_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < _HEADER.size:
+        raise ValueError("cache file truncated")
+    (magic, version, iccid_width, numcard_width, count,
+     size, mtime_ns, source_hash, data_crc, crc) = _HEADER.unpack_from(mapped, 0)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        raise ValueError("not a sequence cache file")
+    if zlib.crc32(mapped[:_HEADER.size - 4]) != crc:
+        raise ValueError("cache header corrupt")
+    if len(mapped) != _HEADER.size + count * (iccid_width + numcard_width):
+        raise ValueError("cache file size does not match its header")
+    identity = (cache_path, stat.st_ino, stat.st_mtime_ns)
+    if identity not in _verified:
+        with memoryview(mapped) as view:
+            if zlib.crc32(view[_HEADER.size:]) != data_crc:
+                raise ValueError("cache data corrupt")
+        _verified.add(identity)
+
+    sequence = CardSequence.from_buffer(
+        mapped, count, iccid_width, numcard_width, offset=_HEADER.size
+    )
+    header = {"size": size, "mtime_ns": mtime_ns, "hash": source_hash}
+    return sequence, header
+
+
+def _try_write_cache(cache_path, sequence, stat, source_hash):
+    """Write the cache atomically and return True, or False if it could not be written."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        iccid_width, numcard_width = sequence.record_widths
+        columns = sequence.column_buffers()
+        data_crc = 0
+        for column in columns:
+            data_crc = zlib.crc32(column, data_crc)
+        header = _HEADER.pack(
+            CACHE_MAGIC, CACHE_VERSION, iccid_width, numcard_width, len(sequence),
+            stat.st_size, stat.st_mtime_ns, source_hash, data_crc, 0
+        )
+        header = header[:-4] + struct.pack("<I", zlib.crc32(header[:-4]))
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for column in columns:
+                f.write(column)
+            f.flush()
+            os.fsync(f.fileno())  # Or a power loss could leave a cache of the right size holding zeros
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
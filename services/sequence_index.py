@@ -0,0 +1,181 @@
+"""
+Sorted lookup index over a CardSequence for fast resynchronisation.
+
+After a NOT OK scan, CardValidator needs the first card after the cursor
+whose ICCID contains the scan or is contained in it. SequenceIndex answers
+that without walking the sequence:
+
+- ICCIDs contained in the scan (including an exact match) are found by
+  looking up every window of the scan whose length is an ICCID length in
+  the job, in a sorted copy of the ICCIDs.
+- A scan contained in a longer ICCID (a truncated read) is looked up in a
+  substring index when its length is one of ``substring_lengths``. Other
+  lengths fall back to a vectorised scan that stops at the best candidate
+  found so far, so results always match the linear search.
+
+Keys are held in NumPy arrays (about 28 bytes per card) as sorted runs that
+are merged as they grow, so the index can follow a sequence that is still
+loading. A sequence that answers exact lookups itself (RangeSequence's
+first_after()) is not copied into keys at all.
+"""
+import numpy as np
+
+_SCAN_BLOCK = 1 << 16  # Cards per block in the fallback substring scan
+
+
+class _Runs:
+    """
+    Sorted (key, position) runs; equal keys keep ascending positions.
+
+    Runs are added on the loader thread while the GUI thread looks keys up,
+    so add() builds the new list of runs aside and publishes it in one
+    assignment: a lookup sees every key either before or after the add.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def add(self, keys, positions):
+        order = np.lexsort((positions, keys))
+        runs = self.runs + [(keys[order], positions[order])]
+        # Merge while the newest run is at least half the size of the one before it
+        while len(runs) > 1 and len(runs[-2][0]) <= 2 * len(runs[-1][0]):
+            (older_keys, older_positions), (newer_keys, newer_positions) = runs[-2:]
+            keys = np.concatenate((older_keys, newer_keys))
+            positions = np.concatenate((older_positions, newer_positions))
+            order = np.lexsort((positions, keys))
+            runs[-2:] = [(keys[order], positions[order])]
+        self.runs = runs
+
+    def first_after(self, key, after):
+        """Smallest position > after stored under ``key``, or None."""
+        best = None
+        for keys, positions in self.runs:
+            lo = keys.searchsorted(key, "left")
+            hi = keys.searchsorted(key, "right")
+            if lo == hi:
+                continue
+            candidates = positions[lo:hi]
+            i = candidates.searchsorted(after, "right")
+            if i < len(candidates) and (best is None or candidates[i] < best):
+                best = int(candidates[i])
+        return best
+
+
+class SequenceIndex:
+    """
+    Position lookups over a CardSequence.
+
+    Args:
+        sequence (CardSequence): The expected cards. Cards appended later are
+                                 picked up by update().
+        substring_lengths (iterable): Scan lengths shorter than the ICCIDs to
+                                      index for truncated reads. Each length k
+                                      costs one key per k-long substring of
+                                      every ICCID.
+    """
+
+    def __init__(self, sequence, substring_lengths=()):
+        self.sequence = sequence
+        self.substring_lengths = tuple(sorted(set(substring_lengths)))
+        self._exact = _Runs()
+        self._own_keys = not hasattr(sequence, "first_after")  # Else the sequence looks ICCIDs up itself
+        self._first_after = self._exact.first_after if self._own_keys else sequence.first_after
+        self._substrings = {length: _Runs() for length in self.substring_lengths}
+        self._lengths = set()  # Distinct ICCID lengths, in bytes
+        self._indexed = 0
+        self.update()
+
+    def __len__(self):
+        return self._indexed
+
+    def update(self):
+        """Index the cards appended since the last call; returns the indexed count."""
+        start, stop = self._indexed, len(self.sequence)
+        if start >= stop:
+            return self._indexed
+
+        if not self._own_keys:
+            self._lengths = self.sequence.iccid_lengths()
+            if not self.substring_lengths:
+                self._indexed = stop
+                return self._indexed
+
+        block, width = self.sequence.iccid_records(start, stop)
+        positions = np.arange(start, stop, dtype=np.int64)
+        if self._own_keys:
+            records = np.frombuffer(block, dtype=f"S{width}")
+            self._exact.add(records, positions)
+            # Replaced, not updated in place: find_next() may be iterating it on the GUI thread
+            self._lengths = self._lengths | {int(length) for length in np.unique(np.char.str_len(records))}
+
+        if self.substring_lengths:
+            rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, width)
+            for length, runs in self._substrings.items():
+                if length > width:
+                    continue
+                grams = []
+                gram_positions = []
+                for offset in range(width - length + 1):
+                    window = np.ascontiguousarray(rows[:, offset:offset + length])
+                    keep = (window != 0).all(axis=1)  # Skip windows reaching into padding
+                    grams.append(window[keep].view(f"S{length}").ravel())
+                    gram_positions.append(positions[keep])
+                runs.add(np.concatenate(grams), np.concatenate(gram_positions))
+
+        self._indexed = stop
+        return self._indexed
+
+    def first_exact(self, iccid, after=-1):
+        """Return the first position > ``after`` holding exactly ``iccid``, or None."""
+        return self._first_after(iccid.encode("utf-8"), after)
+
+    def positions_of(self, iccid):
+        """Return the positions holding exactly ``iccid``, in ascending order."""
+        key = iccid.encode("utf-8")
+        found = []
+        after = -1
+        while (position := self._first_after(key, after)) is not None:
+            found.append(position)
+            after = position
+        return found
+
+    def find_next(self, scanned_code, after):
+        """
+        Return the first position > ``after`` whose ICCID contains
+        ``scanned_code`` or is contained in it, or None.
+        """
+        data = scanned_code.encode("utf-8")
+        size = len(data)
+        best = None
+        lengths = self._lengths  # Read once: update() may replace it meanwhile
+
+        # ICCIDs contained in the scan, including an exact match
+        for length in lengths:
+            if length > size:
+                continue
+            for offset in range(size - length + 1):
+                position = self._first_after(data[offset:offset + length], after)
+                if position is not None and (best is None or position < best):
+                    best = position
+
+        # The scan contained in a longer ICCID
+        if any(length > size for length in lengths):
+            runs = self._substrings.get(size)
+            if runs is not None:
+                position = runs.first_after(data, after)
+            else:
+                position = self._scan_for_substring(data, after, self._indexed if best is None else best)
+            if position is not None and (best is None or position < best):
+                best = position
+        return best
+
+    def _scan_for_substring(self, data, after, limit):
+        """Vectorised linear search of (after, limit) for an ICCID containing ``data``."""
+        for start in range(after + 1, limit, _SCAN_BLOCK):
+            stop = min(start + _SCAN_BLOCK, limit)
+            block, width = self.sequence.iccid_records(start, stop)
+            hits = np.flatnonzero(np.char.find(np.frombuffer(block, dtype=f"S{width}"), data) >= 0)
+            if len(hits):
+                return start + int(hits[0])
+        return None
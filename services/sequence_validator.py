@@ -0,0 +1,374 @@
+"""
+Headless validation engine for scanned card sequences.
+
+SequenceValidator holds the cursor over the expected cards and turns each
+scan into a ScanVerdict using the same rules the GUI has always applied:
+
+- the scan equals the card at the cursor: OK
+- otherwise the first later card similar to the scan (one contains the
+  other) is looked up; if found, the cards in between are SKIPPED and the
+  scan is accepted there: JUMPED
+- if there is no similar card: NOT OK, and the reader should stop
+- past the last card: END
+
+With an IccidCheck set, a mismatching scan that cannot be an ICCID of the
+job at all (wrong length, non-digits, wrong issuer prefix, bad Luhn digit)
+is REJECTED instead: the cursor stays put and no resynchronisation is
+attempted. Matching scans skip the check, so it costs nothing while the
+line runs in order.
+
+Every card a scan lands on is remembered in a SeenCards bitset, and codes
+that are not in the job in its off-list set. A mismatching scan of a card
+seen before is a DUPLICATE: the cursor stays put and no resynchronisation
+is attempted. What was seen is kept when the cursor is moved ("Set Start
+Card") and only forgotten when a new job is loaded. A scan of the card at
+the cursor is always OK, so a rewound line can be validated again.
+
+Lines that swap neighbouring cards can be given an out-of-order window of
+K positions. Any pending card up to K positions past the furthest card
+accepted so far is then accepted where it is (OUT_OF_ORDER), and the cursor
+stays on the oldest pending card. A pending card is only reported SKIPPED
+once the furthest accepted card is more than K positions past it, so a swap
+logs no missing cards at all. Matching the window costs at most 2K + 1
+comparisons, whatever the job size.
+
+It has no Qt dependency; front ends subscribe to verdicts instead.
+"""
+from collections import namedtuple
+
+from services.seen_cards import SeenCards
+
+# Verdict statuses
+OK = "OK"
+NOT_OK = "NOT OK"
+JUMPED = "JUMPED"
+REJECTED = "REJECTED"
+DUPLICATE = "DUPLICATE"
+OUT_OF_ORDER = "OUT OF ORDER"
+END = "END"
+NO_SEQUENCE = "N/A"
+
+READ_AHEAD = 1024  # Expected ICCIDs decoded per block on the OK path
+
+
+class ScanVerdict(namedtuple("ScanVerdict", "status scanned_code position expected_iccid skipped reason",
+                             defaults=(None, None, None))):
+    """
+    Outcome of one scan.
+
+    Attributes:
+        status (str): OK, NOT_OK, JUMPED, REJECTED, DUPLICATE, OUT_OF_ORDER,
+                      END or NO_SEQUENCE.
+        scanned_code (str): The scan as received.
+        position (int): Position the scan was validated at: the cursor, or
+                        the matched card for JUMPED and OUT_OF_ORDER.
+        expected_iccid (str): ICCID expected at the cursor when the scan
+                              arrived, or None past the end.
+        skipped (range): Positions skipped by a JUMPED scan, else None. With
+                         an out-of-order window, the list of pending
+                         positions that fell out of the back of the window
+                         with a JUMPED or OUT_OF_ORDER scan.
+        reason (str): Why a REJECTED scan was rejected, else None.
+    """
+
+    __slots__ = ()
+
+    @property
+    def stop_reading(self):
+        """True when the scan matched nothing ahead and reading should stop."""
+        return self.status is NOT_OK
+
+
+_new_verdict = tuple.__new__  # Skips the Python-level __new__ on the hot path
+
+
+def verdict_log_rows(verdict, sequence):
+    """
+    Yield the (scanned_code, expected_code, status) log rows of a verdict:
+    a jump is a NOT OK row, a SKIPPED row per missing card and an OK row for
+    the card the scan landed on; a scan accepted out of order is followed by
+    a SKIPPED row per card that fell out of the window.
+    """
+    status = verdict.status
+    if status == JUMPED:
+        yield verdict.scanned_code, verdict.expected_iccid, NOT_OK
+        for i in verdict.skipped:
+            yield "MISSING", sequence.iccid(i), "SKIPPED"
+        yield verdict.scanned_code, sequence.iccid(verdict.position), OK
+    elif status == OUT_OF_ORDER:
+        yield verdict.scanned_code, sequence.iccid(verdict.position), status
+        for i in verdict.skipped:
+            yield "MISSING", sequence.iccid(i), "SKIPPED"
+    elif status == END:
+        yield verdict.scanned_code, "End of sequence", "N/A"
+    elif status == NO_SEQUENCE:
+        yield verdict.scanned_code, "N/A", "N/A"
+    else:
+        yield verdict.scanned_code, verdict.expected_iccid, status
+
+
+class SequenceValidator:
+    """
+    Cursor-based validation state machine over a CardSequence.
+
+    Args:
+        sequence (CardSequence): The expected cards, or None for no job.
+        index (SequenceIndex): Resynchronisation index over ``sequence``.
+        check (IccidCheck): Structural check for mismatching scans, or None.
+        window (int): Out-of-order window in positions, or 0 for strict order.
+        stop (int): End of the positions validated against, for a scanning
+                    head covering part of the job (cards past it are END
+                    and never resynchronised to), or None for the whole job.
+    """
+
+    __slots__ = (
+        "sequence", "index", "check", "window", "stop", "_cursor", "rejected", "duplicates", "first_scan_received",
+        "_listeners", "_seen", "_run_start", "_front", "_ahead", "_ahead_start", "_ahead_stop", "_ahead_width",
+    )
+
+    def __init__(self, sequence=None, index=None, check=None, window=0, stop=None):
+        self._listeners = []
+        self._seen = SeenCards()
+        self.window = window
+        self.stop = stop
+        self.load(sequence, index, check)
+
+    def load(self, sequence=None, index=None, check=None):
+        """Switch to a new expected sequence and rewind the cursor, counters and seen cards."""
+        self.sequence = sequence if sequence is not None else ()
+        self.index = index
+        self.check = check
+        self._cursor = 0
+        self.rejected = 0  # Scans rejected by the check, apart from sequence errors
+        self.duplicates = 0
+        self._seen.clear(len(self.sequence))
+        self._run_start = 0  # OK scans since here are seen but not yet in the bitset
+        self._front = 0  # One past the furthest card accepted out of order
+        self.first_scan_received = True
+        self._reset_read_ahead()
+
+    def swap(self, sequence, index, check=None):
+        """Switch to an equivalent copy of the sequence (same cards), keeping the cursor, counters and seen cards."""
+        self.sequence = sequence
+        self.index = index
+        self.check = check
+        self._seen.reserve(len(sequence))
+        self._reset_read_ahead()
+
+    def _end(self):
+        """End of the positions validated against."""
+        length = len(self.sequence)
+        return length if self.stop is None else min(self.stop, length)
+
+    def _reset_read_ahead(self):
+        self._ahead = ""  # Decoded read-ahead block of expected ICCIDs
+        self._ahead_start = self._ahead_stop = 0
+        self._ahead_width = 0
+
+    @property
+    def seen(self):
+        """SeenCards of the session."""
+        self._flush_run()
+        return self._seen
+
+    def _flush_run(self):
+        """Record the cards the OK path went through since the last flush."""
+        self._seen.add_range(self._run_start, self._cursor)
+        self._run_start = self._cursor
+
+    @property
+    def cursor(self):
+        """Position of the next expected card."""
+        return self._cursor
+
+    @cursor.setter
+    def cursor(self, position):
+        self.seek(position)
+
+    def seek(self, position):
+        """Move the cursor to ``position`` ("Set Start Card"), keeping the cards seen."""
+        self._flush_run()
+        self._cursor = self._run_start = self._front = position
+
+    def state(self):
+        """Cursor and counters as plain values, for a checkpoint. The seen positions are in ``seen.bits``."""
+        self._flush_run()
+        return {"cursor": self._cursor, "front": self._front, "rejected": self.rejected,
+                "duplicates": self.duplicates, "first_scan_received": self.first_scan_received,
+                "off_list": sorted(self._seen.off_list)}
+
+    def restore(self, state, seen_bits):
+        """
+        Go back to a checkpointed state() of the loaded job.
+
+        Args:
+            state (dict): What state() returned.
+            seen_bits (bytes): The ``seen.bits`` saved with it.
+        """
+        self._seen.bits = bytearray(seen_bits)
+        self._seen.reserve(len(self.sequence))
+        self._seen.off_list = set(state["off_list"])
+        self._cursor = self._run_start = state["cursor"]
+        self._front = state["front"]
+        self.rejected = state["rejected"]
+        self.duplicates = state["duplicates"]
+        self.first_scan_received = state["first_scan_received"]
+        self._reset_read_ahead()
+
+    def _pass_accepted(self):
+        """Move the cursor over the cards accepted out of order ahead of it."""
+        self._flush_run()
+        cursor = self._cursor
+        while cursor < self._front and cursor in self._seen:
+            cursor += 1
+        self._cursor = self._run_start = cursor
+
+    def subscribe(self, listener):
+        """Call ``listener(verdict)`` for every verdict scan() produces."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def expected_iccid(self, offset=0):
+        """ICCID at cursor + offset, or None past the end."""
+        position = self.cursor + offset
+        if 0 <= position < self._end():
+            return self.sequence[position][1]
+        return None
+
+    def find_similar(self, scanned_code, start=None):
+        """First position >= start (default: after the cursor) similar to the scan, before ``stop``, or None."""
+        if start is None:
+            start = self.cursor + 1
+        matched = self.index.find_next(scanned_code, start - 1)
+        if matched is not None and self.stop is not None and matched >= self.stop:
+            return None
+        return matched
+
+    def unseen_position(self, scanned_code):
+        """
+        First position holding exactly the scan that has not been seen yet:
+        -1 when every one has been, None when the scan is not in the job.
+        """
+        if self.index is None:
+            return None
+        position = self.index.first_exact(scanned_code)
+        if position is None:
+            return None
+        while position in self.seen:
+            position = self.index.first_exact(scanned_code, position)
+            if position is None:
+                return -1
+        return position
+
+    def scan(self, scanned_code):
+        """Validate one scan, advance the cursor and notify subscribers."""
+        self.first_scan_received = False
+        cursor = self._cursor
+
+        if self._ahead_start <= cursor < self._ahead_stop:
+            width = self._ahead_width
+            offset = (cursor - self._ahead_start) * width
+            expected = self._ahead[offset:offset + width]
+        else:
+            expected = self._read_ahead(cursor)
+
+        if expected is not None and (scanned_code == expected or scanned_code == expected.rstrip("\0")):
+            verdict = _new_verdict(ScanVerdict, (OK, scanned_code, cursor, scanned_code, None, None))
+            self._cursor = cursor + 1  # Seen: recorded with the rest of the run on the next mismatch
+            if self._front > cursor + 1:
+                self._pass_accepted()
+        else:
+            self._flush_run()
+            verdict = self._mismatch(scanned_code, cursor)
+            self._run_start = self._cursor
+
+        if self._listeners:
+            for listener in self._listeners:
+                listener(verdict)
+        return verdict
+
+    def _read_ahead(self, cursor):
+        """Decode the next block of expected ICCIDs; returns the padded one at ``cursor``."""
+        stop = min(cursor + READ_AHEAD, self._end())
+        if cursor >= stop:
+            return None
+        self._ahead, self._ahead_width = self.sequence.iccid_block(cursor, stop)
+        self._ahead_start, self._ahead_stop = cursor, stop
+        return self._ahead[:self._ahead_width]
+
+    def _mismatch(self, scanned_code, cursor):
+        sequence = self.sequence
+        if cursor >= self._end():
+            self._cursor = cursor + 1
+            return ScanVerdict(END if sequence else NO_SEQUENCE, scanned_code, cursor)
+
+        expected = sequence.iccid(cursor)
+        if scanned_code == expected:
+            # Non-ASCII ICCIDs do not survive the latin-1 read-ahead; compare decoded
+            self._cursor = cursor + 1
+            self._seen.add(cursor)
+            return ScanVerdict(OK, scanned_code, cursor, expected)
+
+        if self.check is not None:
+            reason = self.check.reject_reason(scanned_code)
+            if reason is not None:
+                self.rejected += 1
+                return ScanVerdict(REJECTED, scanned_code, cursor, expected, reason=reason)
+
+        if self.window:
+            return self._reorder(scanned_code, cursor, expected)
+
+        held = self.unseen_position(scanned_code)
+        if held == -1 or held is None and scanned_code in self._seen.off_list:
+            self.duplicates += 1
+            return ScanVerdict(DUPLICATE, scanned_code, cursor, expected)
+
+        matched = self.find_similar(scanned_code)
+        if matched is None:
+            self._cursor = cursor + 1
+            if held is None:
+                self._seen.off_list.add(scanned_code)
+            else:
+                self._seen.add(held)  # A card behind the cursor
+            return ScanVerdict(NOT_OK, scanned_code, cursor, expected)
+        self._seen.add(matched)
+        self._cursor = matched + 1
+        return ScanVerdict(JUMPED, scanned_code, matched, expected, range(cursor, matched))
+
+    def _reorder(self, scanned_code, cursor, expected):
+        """_mismatch() with an out-of-order window: accept pending cards near the furthest one accepted."""
+        sequence = self.sequence
+        seen = self._seen
+        front = max(self._front, cursor + 1)  # One past the furthest card accepted, or the card at the cursor
+        stop = min(front + self.window, self._end())  # The window reaches K past it
+        matched = None
+        for position in range(cursor + 1, stop):
+            if position not in seen and sequence.iccid(position) == scanned_code:
+                matched = position
+                break
+
+        if matched is None:
+            held = self.unseen_position(scanned_code)
+            if held == -1 or held is None and scanned_code in seen.off_list:
+                self.duplicates += 1
+                return ScanVerdict(DUPLICATE, scanned_code, cursor, expected)
+            matched = self.find_similar(scanned_code)
+            while matched is not None and matched in seen:
+                matched = self.find_similar(scanned_code, matched + 1)
+            if matched is None:
+                # The pending cards stay pending: the scan may be a misread of any of them
+                if held is None:
+                    seen.off_list.add(scanned_code)
+                else:
+                    seen.add(held)
+                return ScanVerdict(NOT_OK, scanned_code, cursor, expected)
+
+        seen.add(matched)
+        self._front = front = max(front, matched + 1)
+        back = front - 1 - self.window  # Pending cards before it fall out of the window
+        skipped = [position for position in range(cursor, back) if position not in seen]
+        self._cursor = self._run_start = max(cursor, back)
+        self._pass_accepted()
+        return ScanVerdict(JUMPED if matched >= stop else OUT_OF_ORDER, scanned_code, matched, expected, skipped)
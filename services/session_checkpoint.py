@@ -0,0 +1,204 @@
+"""
+Checkpoint of a validation session, for resuming after a restart.
+
+A checkpoint is a small JSON state (job file identity, cursor and counters,
+and how far the audit journal had got) and the session's SeenCards bitset,
+kept in one of two bitset files. save() only copies the state on the
+caller's thread; a background writer thread writes the newest snapshot and
+drops the ones it never got to, so a busy line costs one write per
+checkpoint interval at most.
+
+Saves alternate between the two bitset files, and the JSON names the one it
+goes with, so the file the checkpoint on disk uses is never written to. The
+writer keeps a copy of what each file holds: a save rewrites only the 4 KiB
+pages of the other file that differ from its bitset, so a checkpoint of a
+5M-card job writes a few pages, not 625 KB. A file is written whole when the
+writer has no copy of it (the first two saves of a process) or it holds
+another job. The bitset is fsynced before the JSON, which is replaced
+atomically and holds the CRC-32 of every page of its bitset. A crash before
+the JSON is replaced leaves the previous checkpoint whole; load() checks the
+pages anyway, so a bitset that does not match its JSON makes the checkpoint
+unusable instead of resuming with the wrong cards seen.
+
+The audit journal is flushed before the JSON is written, so the journal
+always holds every row the checkpoint counts. It may hold more (rows logged
+after the checkpoint); they stay in the log, as scans that happened.
+"""
+import json
+import os
+import threading
+import zlib
+
+CHECKPOINT_VERSION = 3
+_PAGE = 4096
+
+
+def page_checksums(bits):
+    """CRC-32 of each 4 KiB page of a bitset."""
+    view = memoryview(bits)
+    return [zlib.crc32(view[start:start + _PAGE]) for start in range(0, len(view), _PAGE)]
+
+
+def job_identity(file_path, count):
+    """What a checkpoint's job file must still match: path, size, mtime and card count."""
+    stat = os.stat(file_path)
+    return {"path": os.path.abspath(file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "count": count}
+
+
+class SessionCheckpoint:
+    """
+    The checkpoint files of one station, written by a background thread.
+
+    Args:
+        directory (str): Where the checkpoint is kept; created if missing.
+        name (str): File name prefix.
+
+    Attributes:
+        saves (int): Checkpoints written.
+        bytes_written (int): Bitset bytes written, all checkpoints together.
+    """
+
+    def __init__(self, directory, name="session"):
+        self.directory = directory
+        self.state_path = os.path.join(directory, f"{name}.json")
+        self.bits_paths = tuple(os.path.join(directory, f"{name}.{half}.bits") for half in "ab")
+        self.saves = 0
+        self.bytes_written = 0
+        self._written = [None, None]  # (bitset, "job" of its state) each bits file holds, once written here
+        self._current = None  # Which bits file the JSON on disk names
+        self._pending = None  # Newest (state, bits, journal) not written yet
+        self._busy = False
+        self._closing = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="SessionCheckpoint", daemon=True)
+        self._thread.start()
+
+    def save(self, state, bits, journal=None):
+        """
+        Checkpoint a session; returns right away.
+
+        Args:
+            state (dict): JSON-serialisable session state.
+            bits (bytearray): The SeenCards bitset; copied here.
+            journal (AuditJournal): Journal flushed before the state is written, or None.
+        """
+        with self._condition:
+            self._pending = (state, bytes(bits), journal)
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """Wait until every save() so far is on disk. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def load(self):
+        """
+        Read the checkpoint back.
+
+        Returns:
+            tuple: (state dict, bitset bytes), or None if there is no usable
+            checkpoint, or its bitset does not match the state's page checksums.
+        """
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            with open(self.bits_paths[state["file"]], "rb") as f:
+                bits = f.read(state["bits"])
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return None
+        if state.get("version") != CHECKPOINT_VERSION or len(bits) != state["bits"]:
+            return None
+        if state.get("pages") != page_checksums(bits):
+            return None
+        return state, bits
+
+    def discard(self):
+        """Remove the checkpoint, e.g. once the operator declined to resume it."""
+        self.wait()
+        self._written = [None, None]
+        self._current = None
+        for path in (self.state_path, *self.bits_paths):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Write the last save() and stop the writer thread."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                condition.wait_for(lambda: self._pending is not None or self._closing)
+                pending, self._pending = self._pending, None
+                self._busy = pending is not None
+            if pending is not None:
+                try:
+                    self._write(*pending)
+                    self.saves += 1
+                except OSError as e:
+                    print(f"Checkpoint not written: {e}")
+            with condition:
+                self._busy = False
+                condition.notify_all()
+                if self._closing and self._pending is None:
+                    return
+
+    def _write(self, state, bits, journal):
+        os.makedirs(self.directory, exist_ok=True)
+        if self._current is None:
+            self._current = self._file_on_disk()
+        target = 1 - self._current
+        self._write_bits(target, bits, state.get("job"))
+        if journal is not None:
+            journal.flush()
+        state = dict(state, version=CHECKPOINT_VERSION, file=target, bits=len(bits), pages=page_checksums(bits))
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
+        self._current = target
+
+    def _file_on_disk(self):
+        """The bits file the JSON on disk names, or 1 if there is none, so the first save writes file 0."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return 1 if json.load(f)["file"] == 1 else 0
+        except (OSError, ValueError, KeyError, TypeError):
+            return 1
+
+    def _write_bits(self, target, bits, job):
+        written = self._written[target]
+        self._written[target] = None  # Until the file holds bits
+        path = self.bits_paths[target]
+        if written is None or len(written[0]) != len(bits) or job != written[1]:
+            with open(path, "wb") as f:
+                f.write(bits)
+                f.flush()
+                os.fsync(f.fileno())
+            self.bytes_written += len(bits)
+            self._written[target] = (bits, job)
+            return
+        import numpy as np  # Only needed on the writer thread; kept off the GUI's startup path
+
+        # Compare page by page and rewrite only the pages that changed
+        padded = -len(bits) % _PAGE
+        old = np.frombuffer(written[0] + bytes(padded), dtype=np.uint8).reshape(-1, _PAGE)
+        new = np.frombuffer(bits + bytes(padded), dtype=np.uint8).reshape(-1, _PAGE)
+        changed = np.flatnonzero((old != new).any(axis=1))
+        if len(changed):
+            with open(path, "r+b") as f:
+                for page in changed.tolist():
+                    f.seek(page * _PAGE)
+                    f.write(bits[page * _PAGE:(page + 1) * _PAGE])
+                f.flush()
+                os.fsync(f.fileno())
+            self.bytes_written += len(changed) * _PAGE
+        self._written[target] = (bits, job)
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+import pytest
+import serial
+
+from logic.com_reader import ComPortReader, ScanFramer
+
+pty = pytest.importorskip("pty")
+tty = pytest.importorskip("tty")
+
+
+def test_framer_splits_scans_across_reads():
+    framer = ScanFramer()
+    assert framer.feed(b"8991\x00871") == []
+    assert framer.feed(b"0\r\nABC\r\r\n  DEF \n") == ["89918710", "ABC", "DEF"]
+
+
+@pytest.fixture
+def port():
+    scanner, port = pty.openpty()
+    tty.setraw(port)
+    yield scanner, os.ttyname(port)
+    os.close(scanner)
+    os.close(port)
+
+
+@pytest.mark.parametrize("delay", [0, 0.3])
+def test_blocking_read_loop_stops_without_a_pending_read(port, delay, monkeypatch):
+    # The read loop used where select() cannot wait on a port (Windows), where a
+    # cancel_read() with no read pending is lost
+    monkeypatch.setattr(serial.Serial, "cancel_read", lambda self: None)
+    _, name = port
+    reader = ComPortReader(name)
+    reader.running = True
+    reader.thread = threading.Thread(target=reader.read_loop, daemon=True)
+    reader.thread.start()
+    time.sleep(delay)  # 0: stopped while the port opens; 0.3: between two reads
+    reader.stop_reading(wait=False)
+    reader.thread.join(2)
+    assert not reader.thread.is_alive()
+
+
+def test_blocking_read_loop_delivers_scans(port):
+    scanner, name = port
+    received = []
+    reader = ComPortReader(name, callback=received.append)
+    reader.running = True
+    reader.thread = threading.Thread(target=reader.read_loop, daemon=True)
+    reader.thread.start()
+    time.sleep(0.1)
+    os.write(scanner, b"89918710401084292778\r\n")
+    deadline = time.monotonic() + 2
+    while not received and time.monotonic() < deadline:
+        time.sleep(0.01)
+    reader.stop_reading(wait=False)
+    reader.thread.join(2)
+    assert received == ["89918710401084292778"]
+    assert not reader.thread.is_alive()
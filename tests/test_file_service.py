@@ -0,0 +1,92 @@
+import builtins
+import os
+
+import pytest
+
+from services import file_service
+from services.file_service import read_cpd, read_cpd_header
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "data", "sample.CPD")
+
+
+class Line(str):
+    """A line of the file that records into how many parts it is split, when the split is limited."""
+
+    splits = []
+
+    def strip(self, chars=None):
+        return Line(super().strip(chars))
+
+    def split(self, sep=None, maxsplit=-1):
+        parts = super().split(sep, maxsplit)
+        if maxsplit >= 0:
+            Line.splits.append(len(parts))
+        return parts
+
+
+class _Lines(list):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_projected_columns():
+    data = read_cpd(SAMPLE, ("NUMCARD", "ICCID", "IMSI"))
+    assert list(data.columns) == ["NUMCARD", "ICCID", "IMSI"]
+    assert len(data) == 235
+    assert data["NUMCARD"][:2] == ["1", "2"]
+    assert data["ICCID"][:2] == ["89918710401084292760", "89918710401084292778"]
+    assert data["IMSI"][:2] == ["089405871121233968", "089405871121233969"]
+
+
+def test_rows_are_split_only_up_to_the_last_requested_column(monkeypatch):
+    def open_lines(*args, **kwargs):
+        with builtins.open(*args, **kwargs) as f:
+            lines = [Line(line) for line in f]
+        return _Lines(lines)
+
+    monkeypatch.setattr(file_service, "open", open_lines, raising=False)
+    monkeypatch.setattr(Line, "splits", [])
+    read_cpd(SAMPLE, ("ICCID", "NUMCARD"))
+    assert len(Line.splits) == 235  # Every card row, and only those
+    assert set(Line.splits) == {5}  # ICCID is the fourth column: four fields and the unsplit rest
+
+
+def test_repeated_values_share_one_string():
+    data = read_cpd(SAMPLE, ("NUMCARD", "DATAFILE", "GPD_RJIL_MSN"))
+    datafiles = data["DATAFILE"]
+    assert all(value is datafiles[0] for value in datafiles)
+    assert len({id(value) for value in data["GPD_RJIL_MSN"]}) == len(set(data["GPD_RJIL_MSN"]))
+
+    iccids = read_cpd(SAMPLE, ("ICCID", "DATAFILE"), intern=("ICCID",))
+    assert len({id(value) for value in iccids["DATAFILE"]}) == len(iccids)  # Not interned when not asked for
+
+
+def test_unknown_column_is_named_in_the_error():
+    with pytest.raises(ValueError, match="no such column.*NO_SUCH_COLUMN"):
+        read_cpd(SAMPLE, ("ICCID", "NO_SUCH_COLUMN"))
+
+
+def test_file_without_card_section(tmp_path):
+    path = tmp_path / "empty.cpd"
+    path.write_text("CPDv2\nERP_WO_NBR\nO1\n")
+    with pytest.raises(ValueError, match="no NUMCARD"):
+        read_cpd(str(path))
+
+
+def test_header_fields():
+    header = read_cpd(SAMPLE).header
+    assert header.version == "CPDv2"
+    assert header.work_order == "XXXX"  # ERP_WO_NBR is empty: ERP_WO_ID
+    assert header.part == "O1201843"  # ERP_PART is empty: ERP_SO_PART
+    assert header.part_description == "Cards RJIL 128K Java LTE Trio Half Card Red"
+    assert header.sales_order == "10433988"
+    assert header.customer == "Reliance"
+    assert header.batch == "Q9986"
+    assert header.quantity == 5000
+    assert header.data_generation_date == "2024-12-10 03:42:06.95051"
+    assert header.start_date == "2024.12.13 09:59:00"
+    assert header.get("ERP_SO_REQ_DATE") is None  # Empty fields read as missing
+    assert read_cpd_header(SAMPLE).fields == header.fields
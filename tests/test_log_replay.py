@@ -0,0 +1,134 @@
+import csv
+import random
+
+import pytest
+
+from services import sequence_validator
+from services.card_sequence import CardSequence
+from services.iccid_check import IccidCheck
+from services.log_replay import read_scan_log, replay
+from services.log_store import LOG_FIELDS
+from services.sequence_index import SequenceIndex
+from services.sequence_validator import ScanVerdict, SequenceValidator, verdict_log_rows
+
+
+def luhn_digit(body):
+    total = 0
+    for i, ch in enumerate(reversed(body)):
+        d = int(ch)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+def make_job(count, repeats=False):
+    sequence = CardSequence()
+    for n in range(count):
+        body = f"8991871040{108429276 + n:09d}"
+        sequence.append(str(n + 1), body + luhn_digit(body))
+    if repeats:
+        sequence.append(str(count + 1), sequence.iccid(count // 2))  # An ICCID that occurs twice
+        sequence.append(str(count + 2), "8991871040" + "1" * 8)  # A shorter one
+    return sequence
+
+
+def make_scans(sequence, rng, count):
+    """In-order scans with cards missed, misread, truncated, repeated and read out of order."""
+    scans = []
+    i = 0
+    while len(scans) < count:
+        roll = rng.random()
+        iccid = sequence.iccid(i % len(sequence))
+        if roll < 0.05:
+            i += rng.randrange(1, 5)                   # Missing cards
+            continue
+        if roll < 0.08:
+            scans.append("00" + iccid[2:])              # Misread
+        elif roll < 0.11:
+            scans.append(iccid[2:])                     # Truncated read
+        elif roll < 0.14 and scans:
+            scans.append(rng.choice(scans))             # Repeated scan
+        elif roll < 0.17:
+            scans.append(sequence.iccid((i + 2) % len(sequence)))  # Out of order
+        elif roll < 0.18:
+            scans.append("garbage")
+        else:
+            scans.append(iccid)
+        i += 1
+    return scans
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("with_check", [False, True])
+@pytest.mark.parametrize("window", [0, 3])
+@pytest.mark.parametrize("repeats", [False, True])
+def test_replay_matches_sequence_validator(seed, with_check, window, repeats):
+    rng = random.Random(seed)
+    sequence = make_job(400, repeats)
+    index = SequenceIndex(sequence, (18,))
+    check = IccidCheck.from_sequence(sequence) if with_check else None
+    scans = make_scans(sequence, rng, 500)
+    start = rng.randrange(20)
+
+    validator = SequenceValidator(sequence, index, check, window=window)
+    validator.seek(start)
+    expected = [validator.scan(code) for code in scans]
+
+    result = replay(sequence, scans, start=start, index=index, check=check, window=window)
+    assert list(result.verdicts()) == expected
+    assert result.final_cursor == validator.cursor
+
+
+def write_log(path, verdicts, sequence):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_FIELDS)
+        index = 0
+        for verdict in verdicts:
+            for row in verdict_log_rows(verdict, sequence):
+                index += 1
+                writer.writerow((index, "12:00:00.000", *row))
+
+
+def logged_statuses(verdicts):
+    logged = {sequence_validator.END: "N/A", sequence_validator.NO_SEQUENCE: "N/A"}
+    return [logged.get(v.status, v.status) for v in verdicts]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("window", [0, 3])
+def test_logged_rows_read_back_as_the_scans(tmp_path, seed, window):
+    rng = random.Random(seed)
+    sequence = make_job(400)
+    validator = SequenceValidator(sequence, SequenceIndex(sequence), IccidCheck.from_sequence(sequence), window=window)
+    scans = make_scans(sequence, rng, 500)
+    verdicts = [validator.scan(code) for code in scans]
+
+    path = tmp_path / "log.csv"
+    write_log(path, verdicts, sequence)
+    log = read_scan_log(str(path))
+    assert log.scans == scans
+    assert log.statuses.tolist() == logged_statuses(verdicts)
+
+
+def test_window_verdicts_that_skip_nothing_read_back(tmp_path):
+    sequence = make_job(20)
+    iccid = sequence.iccid
+    verdicts = [
+        ScanVerdict(sequence_validator.OK, iccid(0), 0, iccid(0)),
+        ScanVerdict(sequence_validator.OUT_OF_ORDER, iccid(2), 2, iccid(1), []),
+        ScanVerdict(sequence_validator.JUMPED, iccid(9), 9, iccid(1), []),
+        ScanVerdict(sequence_validator.JUMPED, iccid(14), 14, iccid(10), [10, 11]),
+        ScanVerdict(sequence_validator.NOT_OK, "123", 12, iccid(12)),
+        ScanVerdict(sequence_validator.OK, iccid(12), 12, iccid(12)),
+        ScanVerdict(sequence_validator.OUT_OF_ORDER, iccid(13), 13, iccid(15), []),
+    ]
+
+    path = tmp_path / "log.csv"
+    write_log(path, verdicts, sequence)
+    log = read_scan_log(str(path))
+    assert log.scans == [v.scanned_code for v in verdicts]
+    assert log.statuses.tolist() == logged_statuses(verdicts)
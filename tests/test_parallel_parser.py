@@ -0,0 +1,47 @@
+import pytest
+
+from services import parallel_parser
+from services.file_service import parse_cpd_cards, parse_csv_file
+
+CPD_HEADER = "NUMCARD;MAXCARD;DATAFILE;ICCID;IMSI"
+
+
+def columns(sequence):
+    return [bytes(column) for column in sequence.column_buffers()]
+
+
+@pytest.fixture(autouse=True)
+def small_ranges(monkeypatch):
+    monkeypatch.setattr(parallel_parser, "MIN_RANGE_BYTES", 256)  # Split even small test files
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_cpd_parser_matches_serial(tmp_path, newline, workers):
+    lines = ["CPDv2", "ERP_WO_NBR;ERP_PART", "XXXX;TP01", CPD_HEADER]
+    for n in range(1, 400):
+        iccid = f"8991871040{108429276 + n:09d}0"
+        if n % 97 == 0:
+            iccid += "12345"  # Wider than the default record, in some ranges only
+        lines.append(f"{n};399;RILQ9986.00.IMA;{iccid};0894058711{n:08d}")
+        if n % 50 == 0:
+            lines.append("")
+    path = tmp_path / "job.cpd"
+    path.write_bytes(newline.join(lines).encode() + newline.encode())
+
+    serial = parse_cpd_cards(str(path))
+    assert len(serial) == 399
+    assert columns(parse_cpd_cards(str(path), workers)) == columns(serial)
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_csv_parser_matches_serial(tmp_path, workers):
+    lines = ["NUMCARD,ICCID,NOTE"]
+    for n in range(1, 400):
+        lines.append(f'{n},8991871040{108429276 + n:09d}0,"note, {n}"')
+    path = tmp_path / "job.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    serial = parse_csv_file(str(path))
+    assert len(serial) == 399
+    assert columns(parse_csv_file(str(path), workers)) == columns(serial)
@@ -0,0 +1,88 @@
+import os
+import time
+import types
+
+import pytest
+
+from logic import scan_hub
+from logic.scan_hub import ScanHub
+
+pty = pytest.importorskip("pty")
+tty = pytest.importorskip("tty")
+
+
+@pytest.fixture
+def ports():
+    opened = []
+
+    def make(count):
+        for _ in range(count):
+            scanner, port = pty.openpty()
+            tty.setraw(port)
+            opened.append((scanner, port))
+        return [(scanner, os.ttyname(port)) for scanner, port in opened[-count:]]
+
+    yield make
+    for scanner, port in opened:
+        os.close(scanner)
+        os.close(port)
+
+
+@pytest.fixture
+def hub():
+    hub = ScanHub()
+    yield hub
+    hub.stop()
+
+
+def wait_for(condition, timeout=3):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_sync_after_attach_does_not_attach_twice(hub, ports):
+    (_, name), = ports(1)
+    opens = []
+    open_port = hub._open
+    hub._open = lambda port: (opens.append(port), open_port(port))[1]
+    hub.attach(name)
+    added, removed = hub.sync([name])
+    assert (added, removed) == ([], [])
+    assert wait_for(lambda: hub.ports == [name])
+    assert opens == [name]
+
+
+def test_sync_attaches_and_detaches(hub, ports):
+    names = [name for _, name in ports(3)]
+    hub.sync(names[:2])
+    added, removed = hub.sync(names[1:])
+    assert (added, removed) == ([names[2]], [names[0]])
+    assert wait_for(lambda: hub.ports == sorted(names[1:]))
+
+
+@pytest.mark.parametrize("error", [ValueError("bad port name"), OSError("no such device")])
+def test_failed_open_is_reported_and_can_be_retried(hub, error):
+    errors = []
+    hub._open = lambda port: (_ for _ in ()).throw(error)
+    hub.attach("COM99", error_callback=errors.append).result(2)
+    assert errors and str(error) in errors[0]
+    assert hub.ports == []
+    hub.attach("COM99", error_callback=errors.append).result(2)
+    assert len(errors) == 2  # Tried again, not skipped as attached
+
+
+def test_unpollable_ports_are_each_read_on_their_own_thread(hub, ports, monkeypatch):
+    # More ports than the default executor has threads, read the way Windows handles are
+    monkeypatch.setattr(scan_hub, "os", types.SimpleNamespace(name="nt", read=os.read))
+    opened = ports(min(40, (os.cpu_count() or 1) + 8))
+    received = []
+    for _, name in opened:
+        hub.attach(name, lambda scan, name=name: received.append((name, scan))).result(5)
+    for scanner, name in opened:
+        os.write(scanner, f"scan {name}\r\n".encode())
+    assert wait_for(lambda: len(received) == len(opened))
+    assert sorted(received) == sorted((name, f"scan {name}") for _, name in opened)
+    hub.detach(opened[0][1]).result(2)
+    assert opened[0][1] not in hub.ports
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from services import sequence_cache
+from services.card_sequence import CardSequence
+from services.sequence_cache import cache_path_for, load_cached_sequence, store_cached_sequence
+
+ICCIDS = ["89918710401084292760", "89918710401084292778", "89918710401084292786"]
+
+
+def parse(file_path):
+    sequence = CardSequence()
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            numcard, iccid = line.split()
+            sequence.append(numcard, iccid)
+    return sequence
+
+
+class CountingParser:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, file_path):
+        self.calls += 1
+        return parse(file_path)
+
+
+def iccids(sequence):
+    return [sequence.iccid(i) for i in range(len(sequence))]
+
+
+@pytest.fixture
+def job(tmp_path):
+    path = tmp_path / "job.txt"
+    path.write_text("".join(f"{n + 1} {iccid}\n" for n, iccid in enumerate(ICCIDS)))
+    return path
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def cached(job, cache_dir):
+    """Load the job twice: once to write its cache, then with a counting parser."""
+    load_cached_sequence(str(job), parse, cache_dir)
+    parser = CountingParser()
+    return load_cached_sequence(str(job), parser, cache_dir), parser
+
+
+def flip_byte(path, offset):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0x10]))
+
+
+def test_cache_round_trip(job, cache_dir):
+    sequence, parser = cached(job, cache_dir)
+    assert parser.calls == 0
+    assert iccids(sequence) == ICCIDS
+
+
+def test_source_of_another_size_is_parsed_again(job, cache_dir):
+    load_cached_sequence(str(job), parse, cache_dir)
+    with open(job, "a") as f:
+        f.write("4 89918710401084292794\n")
+    parser = CountingParser()
+    sequence = load_cached_sequence(str(job), parser, cache_dir)
+    assert parser.calls == 1
+    assert len(sequence) == 4
+
+
+def test_source_of_the_same_size_with_other_contents_is_parsed_again(job, cache_dir):
+    load_cached_sequence(str(job), parse, cache_dir)
+    stat = os.stat(job)
+    job.write_text(job.read_text().replace("292786", "292794"))
+    os.utime(job, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    parser = CountingParser()
+    sequence = load_cached_sequence(str(job), parser, cache_dir)
+    assert parser.calls == 1
+    assert sequence.iccid(2) == "89918710401084292794"
+
+
+def test_touched_source_is_reused_and_its_header_rewritten(job, cache_dir):
+    load_cached_sequence(str(job), parse, cache_dir)
+    stat = os.stat(job)
+    mtime_ns = stat.st_mtime_ns + 1_000_000_000
+    os.utime(job, ns=(stat.st_atime_ns, mtime_ns))
+
+    sequence, parser = cached(job, cache_dir)
+    assert parser.calls == 0
+    assert iccids(sequence) == ICCIDS
+    with open(cache_path_for(str(job), cache_dir), "rb") as f:
+        header = sequence_cache._HEADER.unpack(f.read(sequence_cache._HEADER.size))
+    assert header[6] == mtime_ns
+
+
+@pytest.mark.parametrize("offset", [16, -3], ids=["header", "data"])
+def test_corrupt_cache_is_parsed_again_and_rewritten(job, cache_dir, offset):
+    load_cached_sequence(str(job), parse, cache_dir)
+    cache_path = cache_path_for(str(job), cache_dir)
+    flip_byte(cache_path, offset % os.path.getsize(cache_path))
+
+    parser = CountingParser()
+    assert iccids(load_cached_sequence(str(job), parser, cache_dir)) == ICCIDS
+    assert parser.calls == 1
+    sequence, parser = cached(job, cache_dir)
+    assert parser.calls == 0
+    assert iccids(sequence) == ICCIDS
+
+
+def test_failed_cache_write_is_returned_not_printed(job, tmp_path, capsys):
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("")  # A file where the directory should be
+
+    assert store_cached_sequence(str(job), parse(str(job)), str(cache_dir)) is False
+    assert iccids(load_cached_sequence(str(job), parse, str(cache_dir))) == ICCIDS
+    assert capsys.readouterr().out == ""
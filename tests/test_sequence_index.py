@@ -0,0 +1,107 @@
+import random
+import sys
+import threading
+
+import pytest
+
+from services.card_sequence import CardSequence
+from services.range_sequence import RangeSequence
+from services.sequence_index import SequenceIndex
+
+
+def iccids(count, first=108429276):
+    return [f"8991871040{first + n:09d}0" for n in range(count)]
+
+
+def test_lookups_see_every_indexed_card_while_loading():
+    # The loader thread appends and indexes chunks while the GUI thread looks cards up
+    cards = iccids(40_000)
+    sequence = CardSequence()
+    index = SequenceIndex(sequence)
+    errors = []
+
+    def load():
+        for start in range(0, len(cards), 250):
+            for n in range(start, start + 250):
+                sequence.append(str(n + 1), cards[n])
+            index.update()
+
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    loader = threading.Thread(target=load)
+    try:
+        loader.start()
+        lookups = 0
+        while loader.is_alive() or lookups == 0:
+            loaded = len(index)
+            for i in range(max(0, loaded - 300), loaded, 7):
+                if index.find_next(cards[i], -1) != i or index.first_exact(cards[i]) != i:
+                    errors.append(i)
+            lookups += 1
+    finally:
+        loader.join()
+        sys.setswitchinterval(switch)
+    assert not errors
+    assert index.find_next(cards[-1], -1) == len(cards) - 1
+
+
+def linear_find(sequence, scanned_code, after):
+    """The forward scan CardValidator ran before the index."""
+    for i in range(after + 1, len(sequence)):
+        expected_card_value = sequence[i][1]
+        if scanned_code in expected_card_value or expected_card_value in scanned_code:
+            return i
+    return None
+
+
+def random_job(rng, count):
+    """ICCIDs of mixed lengths with repeats, and runs of consecutive numbers."""
+    sequence = CardSequence()
+    n = 0
+    while n < count:
+        if rng.random() < 0.7:
+            first = rng.randrange(10 ** 8)
+            for k in range(min(rng.randrange(1, 50), count - n)):
+                sequence.append(str(n + 1), f"8991871040{first + k:09d}0")
+                n += 1
+        else:
+            length = rng.choice((19, 20, 22))
+            iccid = sequence.iccid(rng.randrange(n)) if n and rng.random() < 0.2 else \
+                "89" + "".join(rng.choice("0123456789") for _ in range(length - 2))
+            sequence.append(str(n + 1), iccid)
+            n += 1
+    return sequence
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("substring_lengths", [(), (12, 19)])
+def test_find_next_matches_linear_search(seed, substring_lengths):
+    rng = random.Random(seed)
+    sequence = random_job(rng, 600)
+    index = SequenceIndex(sequence, substring_lengths)
+    for _ in range(300):
+        iccid = sequence.iccid(rng.randrange(len(sequence)))
+        scan = rng.choice((
+            iccid,
+            iccid[1:],                                  # Truncated
+            iccid[8:],                                  # Truncated to 12
+            iccid[rng.randrange(5):][:rng.randrange(4, 19)],
+            "00" + iccid[2:],                           # Misread
+            "X" + iccid + "Y",                          # Read with noise around it
+            "".join(rng.choice("0123456789") for _ in range(20)),
+        ))
+        after = rng.randrange(-1, len(sequence))
+        assert index.find_next(scan, after) == linear_find(sequence, scan, after), (scan, after)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_find_next_over_range_sequence_matches_linear_search(seed):
+    rng = random.Random(seed)
+    sequence = random_job(rng, 600)
+    compressed = RangeSequence.from_sequence(sequence, min_run=4)
+    index = SequenceIndex(compressed, (12,))
+    for _ in range(300):
+        iccid = sequence.iccid(rng.randrange(len(sequence)))
+        scan = rng.choice((iccid, iccid[1:], iccid[8:], "X" + iccid))
+        after = rng.randrange(-1, len(sequence))
+        assert index.find_next(scan, after) == linear_find(sequence, scan, after), (scan, after)
@@ -0,0 +1,100 @@
+import json
+import os
+
+from services import session_checkpoint
+from services.session_checkpoint import SessionCheckpoint
+
+JOB_A = {"path": "a.cpd", "size": 1, "mtime_ns": 1, "count": 80_000}
+JOB_B = {"path": "b.cpd", "size": 2, "mtime_ns": 2, "count": 80_000}
+
+
+def save(checkpoint, job, bits, cursor=0):
+    checkpoint.save({"job": job, "validator": {"cursor": cursor}}, bits)
+    assert checkpoint.wait(5)
+
+
+def saved_bits_path(checkpoint):
+    with open(checkpoint.state_path, encoding="utf-8") as f:
+        return checkpoint.bits_paths[json.load(f)["file"]]
+
+
+def test_changed_pages_round_trip(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path))
+    bits = bytearray(10_000)
+    save(checkpoint, JOB_A, bits)
+    bits[5000] = 0xFF
+    save(checkpoint, JOB_A, bits, cursor=7)
+    bits[9000] = 0xFF
+    save(checkpoint, JOB_A, bits, cursor=8)
+    checkpoint.close()
+    # Each file whole once, then the pages that changed since the first save
+    assert checkpoint.bytes_written == 2 * len(bits) + 2 * 4096
+
+    state, loaded = SessionCheckpoint(str(tmp_path)).load()
+    assert loaded == bits
+    assert state["validator"]["cursor"] == 8
+
+
+def test_torn_page_makes_the_checkpoint_unusable(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path))
+    bits = bytearray(10_000)
+    save(checkpoint, JOB_A, bits)
+    checkpoint.close()
+    with open(saved_bits_path(checkpoint), "r+b") as f:  # Half a page rewritten, as a crash mid-write leaves it
+        f.seek(4096)
+        f.write(b"\xff" * 2048)
+    assert SessionCheckpoint(str(tmp_path)).load() is None
+
+
+def test_crash_before_the_state_is_replaced_keeps_the_previous_checkpoint(tmp_path, monkeypatch):
+    checkpoint = SessionCheckpoint(str(tmp_path))
+    bits = bytearray(10_000)
+    save(checkpoint, JOB_A, bits, cursor=1)
+    bits[100] = 0xFF
+    save(checkpoint, JOB_A, bits, cursor=2)
+    previous = bytes(bits)
+
+    def crash(source, destination):
+        raise OSError("killed before the state was replaced")
+
+    monkeypatch.setattr(session_checkpoint.os, "replace", crash)
+    bits[200] = bits[5000] = 0xFF
+    save(checkpoint, JOB_A, bits, cursor=3)
+    monkeypatch.undo()
+    checkpoint.close()
+
+    state, loaded = SessionCheckpoint(str(tmp_path)).load()
+    assert state["validator"]["cursor"] == 2
+    assert loaded == previous
+
+    restarted = SessionCheckpoint(str(tmp_path))  # The next process writes the other file first
+    save(restarted, JOB_A, bits, cursor=4)
+    restarted.close()
+    state, loaded = SessionCheckpoint(str(tmp_path)).load()
+    assert state["validator"]["cursor"] == 4
+    assert loaded == bits
+
+
+def test_new_job_rewrites_the_whole_bitset(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path))
+    bits = bytearray(b"\xff" * 10_000)
+    save(checkpoint, JOB_A, bits)
+    save(checkpoint, JOB_A, bits)
+    other = bytearray(10_000)
+    other[0] = 1
+    save(checkpoint, JOB_B, other)
+    checkpoint.close()
+    assert checkpoint.bytes_written == 3 * len(bits)
+
+    state, loaded = SessionCheckpoint(str(tmp_path)).load()
+    assert state["job"] == JOB_B
+    assert loaded == other
+
+
+def test_discard_removes_every_file(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path))
+    save(checkpoint, JOB_A, bytearray(10_000))
+    save(checkpoint, JOB_A, bytearray(10_000))
+    checkpoint.discard()
+    checkpoint.close()
+    assert os.listdir(tmp_path) == []